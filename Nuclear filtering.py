@@ -1,77 +1,65 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import Normalize, LinearSegmentedColormap
 
-# === Load input file ===
-df = pd.read_csv("nuclear_activation_results.csv")
+from plotting import render_panels
+from selection import TopK
+from table_io import read_table
+
+# === Input file (.csv or .parquet) ===
+input_file = "nuclear_activation_results.csv"
+output_file = "filtered_nuclear_alloys.csv"
 
 # === Define thresholds ===
 activation_limit = np.array([2.0, 2.0, 2.0])
 gamma_limit = np.array([10000, 0.00001])
 heat_limit = np.array([3.423e+02, 0.001])
 
-# === Apply filtering ===
-mask = (
-    (df["SpecificActivity"] < activation_limit[0]) &
-    (df["DoseRate"] < activation_limit[1]) &
-    (df["DecayHeat"] < activation_limit[2]) &
-    (df["Gamma1"] < gamma_limit[0]) &
-    (df["Gamma2"] < gamma_limit[1]) &
-    (df["Heat1"] < heat_limit[0]) &
-    (df["Heat2"] < heat_limit[1])
-)
-filtered_df = df[mask].copy()
-
 # === Sort by CombinedScore (descending) ===
-filtered_df.sort_values("CombinedScore", ascending=False, inplace=True)
-filtered_df.to_csv("filtered_nuclear_alloys.csv", index=False)
-print("Filtered CSV saved as 'filtered_nuclear_alloys.csv'")
+# Set top_k to keep only the K highest scores, selected without sorting the whole frame
+top_k = None
 
-# === Set alloy space and vertices ===
+# === Set alloy space ===
 composition_cols = ['Ti', 'Ta', 'V', 'Mo', 'Fe', 'Re', 'Nb', 'Zr', 'Cr', 'Hf', 'W']
-normalized = filtered_df[composition_cols].div(filtered_df[composition_cols].sum(axis=1), axis=0).dropna()
-num_elements = len(composition_cols)
-angles = np.linspace(0, 2 * np.pi, num_elements, endpoint=False)
-vertices = np.stack([np.cos(angles), np.sin(angles)], axis=1)
-
-def project(row):
-    return np.dot(row.values, vertices)
-
-coords = normalized.apply(project, axis=1, result_type='expand').values
 
-# === Plot function ===
-def plot_property(property_name, vmin, vmax):
-    values = filtered_df.loc[normalized.index, property_name].values
-    cmap = LinearSegmentedColormap.from_list("custom", ["blue", "yellow", "red"])
-    norm = Normalize(vmin=vmin, vmax=vmax)
 
-    fig, ax = plt.subplots(figsize=(10, 10))
-    scatter = ax.scatter(coords[:, 0], coords[:, 1], c=values, cmap=cmap, norm=norm,
-                         edgecolors='none', s=50)
+def main():
+    df = read_table(input_file)
 
-    polygon = np.append(vertices, [vertices[0]], axis=0)
-    ax.plot(polygon[:, 0], polygon[:, 1], 'k-', lw=1.5)
+    # === Apply filtering ===
+    mask = (
+        (df["SpecificActivity"] < activation_limit[0]) &
+        (df["DoseRate"] < activation_limit[1]) &
+        (df["DecayHeat"] < activation_limit[2]) &
+        (df["Gamma1"] < gamma_limit[0]) &
+        (df["Gamma2"] < gamma_limit[1]) &
+        (df["Heat1"] < heat_limit[0]) &
+        (df["Heat2"] < heat_limit[1])
+    )
+    filtered_df = df[mask].copy()
 
-    for i, el in enumerate(composition_cols):
-        x, y = vertices[i]
-        ax.text(x * 1.1, y * 1.1, el, ha='center', va='center', fontsize=11, weight='bold')
+    if top_k:
+        selector = TopK(top_k, ["CombinedScore"], largest=True)
+        selector.update(filtered_df)
+        filtered_df = selector.result()
+    else:
+        filtered_df.sort_values("CombinedScore", ascending=False, inplace=True)
+    filtered_df.to_csv(output_file, index=False)
+    print(f"Filtered CSV saved as '{output_file}'")
 
-    cbar = plt.colorbar(scatter, ax=ax)
-    cbar.set_label(property_name, fontsize=12)
+    # === Generate all four plots ===
+    # Alloys are projected and drawn once, only the colours change per panel; large result sets are
+    # rasterised by binning, and no window is opened. The panels are rendered by worker processes,
+    # which re-import this script under the spawn start method, hence the __main__ guard.
+    panels = {
+        "CombinedScore": (0, filtered_df["CombinedScore"].max(), "CombinedScore"),
+        # "CombinedScore": (0, 1, "CombinedScore"),
+        "Normalize_Activation": (0, 1, "Normalize_Activation"),
+        "Normalize_Gamma": (0, 1, "Normalize_Gamma"),
+        "Normalize_Heat": (0, 1, "Normalize_Heat"),
+    }
+    for filename in render_panels(filtered_df, composition_cols, panels, marker_size=50, alpha=1.0,
+                                  label_offset=1.1, dpi=600, suffix="_affine_filtered_projection"):
+        print(f"Saved: {filename}")
 
-    ax.set_aspect('equal')
-    ax.axis('off')
-    ax.set_title(f"{property_name}", fontsize=14)
-    filename = f"{property_name}_affine_filtered_projection.png"
-    plt.savefig(filename, dpi=600, bbox_inches='tight')
-    plt.show()
-    plt.close()
-    print(f"Saved: {filename}")
 
-# === Generate all four plots ===
-plot_property("CombinedScore", vmin=0, vmax=filtered_df["CombinedScore"].max())
-#plot_property("CombinedScore", vmin=0, vmax=1)
-plot_property("Normalize_Activation", vmin=0, vmax=1)
-plot_property("Normalize_Gamma", vmin=0, vmax=1)
-plot_property("Normalize_Heat", vmin=0, vmax=1)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lattice import multi_system_lattice  # noqa: E402
+from screening import (  # noqa: E402
+    ACTIVATION_DATA,
+    ACTIVATION_LIMIT,
+    GAMMA_DATA,
+    GAMMA_LIMIT,
+    HEAT_DATA,
+    HEAT_LIMIT,
+    PROPERTY_COLUMNS,
+    SCORE_COLUMNS,
+    ScoreKernel,
+)
+
+
+def reference_scores(compositions: np.ndarray) -> tuple:
+    """
+    Screening as done by the original unifiedAct.py: three matmuls, a 7-term mask, re-indexing and
+    a pandas row mean for CombinedScore.
+    """
+    activation = compositions @ ACTIVATION_DATA
+    gamma = compositions @ GAMMA_DATA
+    heat = compositions @ HEAT_DATA
+    mask = (
+        (activation[:, 0] < ACTIVATION_LIMIT[0]) &
+        (activation[:, 1] < ACTIVATION_LIMIT[1]) &
+        (activation[:, 2] < ACTIVATION_LIMIT[2]) &
+        (gamma[:, 0] < GAMMA_LIMIT[0]) &
+        (gamma[:, 1] < GAMMA_LIMIT[1]) &
+        (heat[:, 0] < HEAT_LIMIT[0]) &
+        (heat[:, 1] < HEAT_LIMIT[1])
+    )
+    activation, gamma, heat = activation[mask], gamma[mask], heat[mask]
+    df = pd.DataFrame(np.concatenate([activation, gamma, heat], axis=1), columns=PROPERTY_COLUMNS)
+    df["Normalize_Activation"] = (activation / ACTIVATION_LIMIT).mean(axis=1)
+    df["Normalize_Gamma"] = (gamma / GAMMA_LIMIT).mean(axis=1)
+    df["Normalize_Heat"] = (heat / HEAT_LIMIT).mean(axis=1)
+    df["CombinedScore"] = df[["Normalize_Activation", "Normalize_Gamma", "Normalize_Heat"]].mean(axis=1)
+    return mask, df[PROPERTY_COLUMNS + SCORE_COLUMNS].to_numpy()
+
+
+def main(rows: int = 10_000_000, chunksize: int = 1_000_000, seed: int = 0) -> dict:
+    """
+    Time the fused ``ScoreKernel`` against the reference code path on ``rows`` lattice compositions
+    (11 elements, quinaries, 20 divisions, sampled with replacement), chunk by chunk, and check that
+    both give bit-identical masks, properties and scores.
+
+    Returns:
+        dict: Seconds spent in each path, rows per second and the number of kept rows.
+    """
+    lattice = multi_system_lattice(11, 5, 20) / 20
+    rng = np.random.default_rng(seed)
+    kernel = ScoreKernel.from_tables(
+        ACTIVATION_DATA, GAMMA_DATA, HEAT_DATA, ACTIVATION_LIMIT, GAMMA_LIMIT, HEAT_LIMIT
+    )
+
+    reference_seconds = kernel_seconds = 0.0
+    kept = 0
+    for start in range(0, rows, chunksize):
+        compositions = lattice[rng.integers(0, len(lattice), min(chunksize, rows - start))]
+
+        tic = time.perf_counter()
+        expected_mask, expected = reference_scores(compositions)
+        reference_seconds += time.perf_counter() - tic
+
+        tic = time.perf_counter()
+        mask, properties, scores = kernel(compositions)
+        kernel_seconds += time.perf_counter() - tic
+
+        if not (np.array_equal(mask, expected_mask) and
+                np.array_equal(np.concatenate([properties, scores], axis=1), expected)):
+            raise AssertionError(f"Fused kernel differs from the reference in rows {start}-{start + chunksize}.")
+        kept += len(properties)
+
+    result = {
+        "rows": rows,
+        "kept": kept,
+        "reference_seconds": reference_seconds,
+        "kernel_seconds": kernel_seconds,
+        "reference_rows_per_sec": rows / reference_seconds,
+        "kernel_rows_per_sec": rows / kernel_seconds,
+        "speedup": reference_seconds / kernel_seconds,
+    }
+    print(f"{rows:,} rows, {kept:,} kept, identical results")
+    print(f"reference: {reference_seconds:.2f}s ({result['reference_rows_per_sec']:,.0f} rows/s)")
+    print(f"kernel:    {kernel_seconds:.2f}s ({result['kernel_rows_per_sec']:,.0f} rows/s), "
+          f"{result['speedup']:.1f}x faster")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fused nuclear scoring kernel.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Number of compositions to score")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Rows per chunk")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the sampled compositions")
+    args = parser.parse_args()
+    main(args.rows, args.chunksize, args.seed)
@@ -0,0 +1,246 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Elements of the quinary/senary lattices, as in generate_compositions.py
+ELEMENTS = ["Ti", "Ta", "V", "Mo", "Fe", "Re", "Nb", "Zr", "Cr", "Hf", "W"]
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _sampled_fractions(rows: int, seed: int = 0):
+    """
+    Blocks of at most 1M quinary lattice compositions (11 elements, 20 divisions) sampled with
+    replacement, ``rows`` in total.
+    """
+    from lattice import multi_system_lattice
+
+    lattice = multi_system_lattice(len(ELEMENTS), 5, 20) / 20
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, 1_000_000):
+        yield lattice[rng.integers(0, len(lattice), min(1_000_000, rows - start))]
+
+
+def stage_nimplex(dimension: int, num_division: int) -> dict:
+    import nimplex
+
+    component_space, neighbor_list = nimplex.simplex_graph_limited_fractional_py(
+        dim=dimension, ndiv=num_division, limit=[[0, 1]] * dimension
+    )
+    return {"rows": len(component_space), "edges": sum(map(len, neighbor_list))}
+
+
+def stage_lattice(order: int, num_division: int) -> dict:
+    from lattice import multi_system_lattice
+
+    return {"rows": len(multi_system_lattice(len(ELEMENTS), order, num_division))}
+
+
+def stage_scoring(rows: int) -> dict:
+    from screening import DATABASE, ScoreKernel
+
+    blocks = list(_sampled_fractions(rows))
+    kernel = ScoreKernel.from_database(DATABASE, ELEMENTS)
+    # ``seconds`` includes sampling the compositions, ``scoring_seconds`` only the kernel
+    tic = time.perf_counter()
+    kept = sum(len(kernel(block)[1]) for block in blocks)
+    return {"rows": rows, "kept": kept, "scoring_seconds": time.perf_counter() - tic}
+
+
+def stage_io(rows: int, file_format: str) -> dict:
+    from table_io import iter_table, write_compositions
+
+    numerators = np.concatenate([np.rint(block * 20).astype(np.uint8) for block in _sampled_fractions(rows)])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"compositions.{file_format}")
+        tic = time.perf_counter()
+        write_compositions(path, numerators, ELEMENTS, 20)
+        write_seconds = time.perf_counter() - tic
+        size = os.path.getsize(path)
+        tic = time.perf_counter()
+        read_rows = sum(len(chunk) for chunk in iter_table(path, chunksize=1_000_000))
+        read_seconds = time.perf_counter() - tic
+    return {"rows": read_rows, "bytes": size, "write_seconds": write_seconds, "read_seconds": read_seconds}
+
+
+def stage_plotting(rows: int, panels: int) -> dict:
+    import pandas as pd
+
+    from plotting import render_panels
+    from screening import DATABASE, SCORE_COLUMNS, ScoreKernel
+
+    fractions = np.concatenate(list(_sampled_fractions(rows)))
+    kernel = ScoreKernel.from_database(DATABASE, ELEMENTS)
+    _, _, scores = kernel(fractions, apply_filter=False)
+    df = pd.DataFrame(fractions, columns=ELEMENTS)
+    columns = (SCORE_COLUMNS * panels)[:panels]
+    for j, column in enumerate(columns):
+        df[f"{column}_{j}"] = scores[:, SCORE_COLUMNS.index(column)]
+    with tempfile.TemporaryDirectory() as directory:
+        tic = time.perf_counter()
+        files = render_panels(df, ELEMENTS, {f"{c}_{j}": (0, 1, None) for j, c in enumerate(columns)},
+                              directory, dpi=100, workers=1)
+        render_seconds = time.perf_counter() - tic
+    return {"rows": rows, "panels": len(files), "render_seconds": render_seconds}
+
+
+STAGES = {
+    "nimplex": stage_nimplex,
+    "lattice": stage_lattice,
+    "scoring": stage_scoring,
+    "io": stage_io,
+    "plotting": stage_plotting,
+}
+
+
+def benchmark_grid(quick: bool = False) -> list:
+    """
+    ``(stage, params)`` of every benchmark; ``quick`` uses smaller sizes for a smoke run.
+    """
+    if quick:
+        return (
+            [("nimplex", {"dimension": d, "num_division": n}) for d in (3, 4) for n in (6, 12)]
+            + [("lattice", {"order": o, "num_division": 10}) for o in (5, 6)]
+            + [("scoring", {"rows": 100_000})]
+            + [("io", {"rows": 100_000, "file_format": f}) for f in ("csv", "parquet", "npy")]
+            + [("plotting", {"rows": 20_000, "panels": 2})]
+        )
+    return (
+        [("nimplex", {"dimension": d, "num_division": n}) for d in (3, 4, 5, 6) for n in (12, 24)]
+        + [("lattice", {"order": o, "num_division": 20}) for o in (5, 6)]
+        + [("scoring", {"rows": r}) for r in (1_000_000, 10_000_000)]
+        + [("io", {"rows": 1_000_000, "file_format": f}) for f in ("csv", "parquet", "npy")]
+        + [("plotting", {"rows": r, "panels": 4}) for r in (100_000, 1_000_000)]
+    )
+
+
+def _run_stage(stage: str, params: dict, queue):
+    baseline = _rss_mb()
+    tic = time.perf_counter()
+    try:
+        result = STAGES[stage](**params)
+    except ImportError as error:
+        queue.put({"skipped": f"missing dependency: {error.name}"})
+        return
+    queue.put({"seconds": time.perf_counter() - tic, "peak_rss_mb": _rss_mb(), "baseline_rss_mb": baseline, **result})
+
+
+def measure(stage: str, params: dict) -> dict:
+    """
+    Run one benchmark in a fresh interpreter and return its wall time, peak RSS and stage metrics.
+
+    Each stage is spawned in its own process, so that its peak resident memory is not hidden by an
+    earlier, larger stage; ``baseline_rss_mb`` is the peak before the stage started (interpreter and
+    imports).
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_stage, args=(stage, params, queue))
+    process.start()
+    process.join()
+    result = queue.get() if not queue.empty() else {"error": f"exit code {process.exitcode}"}
+    return {"stage": stage, "params": params, **result}
+
+
+def environment() -> dict:
+    """
+    Commit and machine description stored with the results, so that runs can be compared.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit or None,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: list, baseline: list) -> list:
+    """
+    Time and peak memory ratios (current / baseline) of the benchmarks present in both runs.
+    """
+    previous = {(r["stage"], json.dumps(r["params"], sort_keys=True)): r for r in baseline}
+    rows = []
+    for result in results:
+        before = previous.get((result["stage"], json.dumps(result["params"], sort_keys=True)))
+        if before and "seconds" in before and "seconds" in result:
+            rows.append({
+                "stage": result["stage"],
+                "params": result["params"],
+                "time_ratio": result["seconds"] / max(before["seconds"], 1e-9),
+                "rss_ratio": result["peak_rss_mb"] / max(before["peak_rss_mb"], 1e-9),
+            })
+    return rows
+
+
+def main(stages: list = None, quick: bool = False, output: str = "benchmark_results.json", baseline: str = None) -> dict:
+    """
+    Run the benchmark suite and write the results as JSON.
+
+    Parameters:
+        stages (list): Stages to run (all if None): ``nimplex``, ``lattice``, ``scoring``, ``io``, ``plotting``.
+        quick (bool): Use smaller sizes.
+        output (str): JSON file receiving the environment and one record per benchmark.
+        baseline (str): JSON file of an earlier run to compare with.
+
+    Returns:
+        dict: The written report.
+    """
+    unknown = [s for s in stages or () if s not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stages {unknown}, expected some of {list(STAGES)}.")
+    results = []
+    for stage, params in benchmark_grid(quick):
+        if stages and stage not in stages:
+            continue
+        result = measure(stage, params)
+        results.append(result)
+        described = ", ".join(f"{k}={v}" for k, v in params.items())
+        if "seconds" in result:
+            print(f"{stage:9s} {described:40s} {result['seconds']:8.2f}s {result['peak_rss_mb']:9.0f} MB peak RSS")
+        else:
+            print(f"{stage:9s} {described:40s} {result.get('skipped') or result.get('error')}")
+
+    report = {"environment": environment(), "results": results}
+    if baseline:
+        with open(baseline) as f:
+            report["comparison"] = compare(results, json.load(f)["results"])
+        for row in report["comparison"]:
+            print(f"{row['stage']:9s} {json.dumps(row['params']):50s} time x{row['time_ratio']:.2f} "
+                  f"RSS x{row['rss_ratio']:.2f}")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved: {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and measure the peak memory of every pipeline stage.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="Stages to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Use smaller sizes for a quick run")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file (default: %(default)s)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+    main(args.stages, args.quick, args.output, args.baseline)
@@ -0,0 +1,184 @@
+import argparse
+import importlib
+import sys
+
+# Commands run by the ``main(argv, prog)`` of another module: {command: (module, description)}
+MODULE_COMMANDS = {
+    "nimplex": ("generate_nimplex", "Generate a nimplex composition space and its neighbor graph"),
+    "pipeline": ("pipeline", "Enumerate and screen the multi-system composition space in one pass"),
+    "search": ("search", "Search a composition space for low CombinedScore alloys along its neighbor graph"),
+    "refine": ("refine", "Screen a simplex lattice coarse to fine around the feasibility boundary"),
+    "regions": ("regions", "Label the connected feasible regions of a nimplex space"),
+    "rescore": ("rescoring", "Rescore stored results after a property data or limit update"),
+}
+
+# Default elements of the multi-system lattice, as in generate_compositions.py
+ELEMENTS = ["Ti", "Ta", "V", "Mo", "Fe", "Re", "Nb", "Zr", "Cr", "Hf", "W"]
+
+
+def dataset_panels(dataset: str) -> dict:
+    """
+    ``render_panels`` panels of the results of a dataset: every raw property from 0 to its limit, the
+    normalised scores from 0 to 1 and CombinedScore from 0 to 0.5 (titled as in ``unifiedAct.py`` for
+    the ``"unified"`` dataset).
+    """
+    from nuclear_data import load_database
+    from screening import SCORE_COLUMNS
+
+    database = load_database(dataset)
+    if dataset == "unified":
+        from unifiedAct import plot_properties
+        return plot_properties(*database.limit_tables())
+    panels = {column: (0, limit, None) for column, limit in zip(database.columns, database.limits)}
+    panels.update({column: (0, 1, None) for column in SCORE_COLUMNS[:3]})
+    panels["CombinedScore"] = (0, 0.5, "Combined Score (Lower is Better)")
+    return panels
+
+
+def plot_file(results_file: str, dataset: str = "unified", elements: list = None, output_dir: str = ".",
+              tiled: bool = False, dpi: int = 300, workers: int = None) -> list:
+    """
+    Render the property panels of a results file (see ``plotting.render_panels``).
+
+    Parameters:
+        results_file (str): ``.csv`` or ``.parquet`` results of a screening.
+        dataset (str): Dataset the results were screened with, giving the panel ranges.
+        elements (list): Element columns, in polygon order; None uses every master element present.
+        output_dir (str): Directory receiving the images.
+        tiled (bool): Render all the panels as tiles of a single figure.
+        dpi (int): Resolution of the saved images.
+        workers (int): Number of rendering processes; None for one per CPU.
+
+    Returns:
+        list: Paths of the saved images.
+    """
+    import profiling
+    from nuclear_data import load_database
+    from plotting import render_panels
+    from table_io import read_table
+
+    with profiling.stage("read_results") as stage:
+        df = read_table(results_file)
+        stage.rows_out = len(df)
+    if elements is None:
+        elements = [e for e in load_database(dataset).elements if e in df.columns]
+    panels = {column: panel for column, panel in dataset_panels(dataset).items() if column in df.columns}
+    return render_panels(df, elements, panels, output_dir, dpi=dpi, workers=workers, tiled=tiled)
+
+
+def _generate(argv: list, prog: str):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Write the union of all --order-element subsystem lattices of the elements."
+    )
+    parser.add_argument("elements", nargs="*", default=ELEMENTS, help="Element symbols (default: %(default)s)")
+    parser.add_argument("--order", type=int, default=5, help="Number of elements per subsystem (default: %(default)s)")
+    parser.add_argument("--ndiv", type=int, default=20, help="Number of divisions (default: %(default)s)")
+    parser.add_argument("--output", default="compositionforactivation.csv",
+                        help="Composition file, .csv, .parquet or .npy (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="Enumerate the lattice even if it is cached")
+    parser.add_argument("--constraint", action="append", metavar="EXPR",
+                        help='Linear constraint on the mole fractions, e.g. "Ta + Nb >= 0.5"; repeat for several')
+    args = parser.parse_args(argv)
+
+    from generate_compositions import generate_compositions
+
+    written = generate_compositions(args.elements, args.order, args.ndiv, args.output, not args.no_cache,
+                                    constraints=args.constraint)
+    print(f"{written} compositions saved to {args.output}")
+
+
+def _screen(argv: list, prog: str):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Screen a composition file against the activation, gamma and heat limits."
+    )
+    parser.add_argument("input_file", help="Composition file (.csv, .parquet or .npy)")
+    parser.add_argument("output_file", nargs="?", default="filtered_nuclear_alloys.csv",
+                        help="Scored rows, .csv or .parquet (default: %(default)s)")
+    parser.add_argument("--dataset", default="unified",
+                        help="Property dataset of data/nuclear_properties.json (default: %(default)s)")
+    parser.add_argument("--elements", nargs="+", help="Element columns to use (default: every master element found)")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Rows screened per chunk (default: %(default)s)")
+    parser.add_argument("--no-filter", action="store_true", help="Write every row, not only those passing every limit")
+    parser.add_argument("--sort", action="store_true",
+                        help="Sort the output by CombinedScore, best first (the scored rows must fit in memory)")
+    parser.add_argument("--top-k", type=int, default=200, help="Number of best alloys kept (default: %(default)s)")
+    parser.add_argument("--best", help="File receiving the best alloys, best first")
+    parser.add_argument("--pareto", help="File receiving the alloys not dominated in normalised activation, gamma and heat")
+    parser.add_argument("--plot", action="store_true", help="Render the property panels of the scored rows")
+    parser.add_argument("--tiled", action="store_true", help="With --plot, render all panels in one figure")
+    args = parser.parse_args(argv)
+
+    from screening import screen_and_select
+
+    stats = screen_and_select(
+        args.input_file, args.output_file, args.dataset, args.elements, args.chunksize, not args.no_filter,
+        args.top_k if args.best else None, args.best, args.pareto, sort_output=args.sort,
+    )
+    print(f"Kept {stats['rows_out']} of {stats['rows_in']} alloys in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s), elements: {stats['elements']}")
+    print(f"Results saved to {args.output_file}")
+    if args.plot and stats["rows_out"]:
+        for filename in plot_file(args.output_file, args.dataset, stats["elements"], tiled=args.tiled):
+            print(f"Saved: {filename}")
+
+
+def _plot(argv: list, prog: str):
+    parser = argparse.ArgumentParser(prog=prog, description="Render the property panels of a results file.")
+    parser.add_argument("results_file", help="Screening results (.csv or .parquet)")
+    parser.add_argument("--dataset", default="unified",
+                        help="Dataset the results were screened with, giving the ranges (default: %(default)s)")
+    parser.add_argument("--elements", nargs="+", help="Element columns in polygon order (default: master elements found)")
+    parser.add_argument("--output-dir", default=".", help="Directory receiving the images (default: %(default)s)")
+    parser.add_argument("--tiled", action="store_true", help="Render all panels as tiles of one figure")
+    parser.add_argument("--dpi", type=int, default=300, help="Resolution of the images (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="Rendering processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    for filename in plot_file(args.results_file, args.dataset, args.elements, args.output_dir, args.tiled,
+                              args.dpi, args.workers):
+        print(f"Saved: {filename}")
+
+
+# Commands defined here: {command: (function, description)}
+COMMANDS = {
+    "generate": (_generate, "Enumerate the multi-system composition lattice (generate_compositions.py)"),
+    "screen": (_screen, "Screen a composition file, keep the best and Pareto-optimal alloys (unifiedAct.py)"),
+    "plot": (_plot, "Render the property panels of screening results"),
+}
+
+
+def main(argv: list = None):
+    """
+    Run one command of the alloy design toolkit.
+
+    Only the module of the chosen command is imported, after the command line is parsed, so ``--help``
+    is instant and pandas, matplotlib and plotly are only loaded by the commands that use them.
+    """
+    commands = {name: description for name, (_, description) in {**COMMANDS, **MODULE_COMMANDS}.items()}
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Alloy composition design: generate, screen, search and plot composition spaces.",
+        epilog="commands:\n" + "\n".join(f"  {name:10s}{description}" for name, description in commands.items())
+        + "\n\nRun 'cli.py <command> --help' for the options of a command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--profile", action="store_true",
+                        help="Print the time, rows, bytes and peak memory of every stage at exit")
+    parser.add_argument("--trace", help="Also write the stages as a Chrome trace JSON to this file")
+    parser.add_argument("command", choices=list(commands), metavar="command", help="Command to run, see below")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.profile or args.trace:
+        import profiling
+        profiling.enable(args.trace)
+
+    prog = f"{parser.prog} {args.command}"
+    if args.command in COMMANDS:
+        COMMANDS[args.command][0](args.args, prog)
+    else:
+        importlib.import_module(MODULE_COMMANDS[args.command][0]).main(args.args, prog)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from lattice import numerator_dtype
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class Compositions:
+    """
+    Block of lattice compositions stored as integer numerators over a shared denominator.
+
+    A composition of ``elements`` is ``numerators[i] / num_division``. Numerators use the smallest
+    unsigned dtype holding ``num_division`` (uint8 up to 255 divisions), i.e. 8x less memory than
+    float64 fractions, and compare exactly, so deduplication and joins need no float tolerance.
+    Fractions are only computed by ``fractions()`` (for the property matmul) and ``to_frame()``
+    (for export).
+
+    Parameters:
+        numerators (np.ndarray): Integer array of shape (rows, elements); every row sums to ``num_division``.
+        num_division (int): Shared denominator.
+        elements (list): Element symbols, one per column.
+    """
+
+    __slots__ = ("numerators", "num_division", "elements")
+
+    def __init__(self, numerators: np.ndarray, num_division: int, elements: list):
+        numerators = np.asarray(numerators)
+        if numerators.ndim != 2 or numerators.shape[1] != len(elements):
+            raise ValueError(
+                f"Numerators must have shape (rows, {len(elements)}), got {numerators.shape}."
+            )
+        if not np.issubdtype(numerators.dtype, np.integer):
+            raise ValueError(f"Numerators must be integers, got {numerators.dtype}.")
+        if num_division <= 0:
+            raise ValueError("Number of divisions must be a positive integer.")
+        self.numerators = numerators
+        self.num_division = int(num_division)
+        self.elements = list(elements)
+
+    @classmethod
+    def from_fractions(cls, fractions: np.ndarray, num_division: int, elements: list) -> "Compositions":
+        """
+        Snap mole fractions to the ``num_division`` lattice.
+
+        Raises:
+            ValueError: If a fraction is not a multiple of 1 / ``num_division``.
+        """
+        scaled = np.asarray(fractions, dtype=np.float64) * num_division
+        numerators = np.rint(scaled)
+        if not np.allclose(scaled, numerators, rtol=0, atol=1e-6):
+            raise ValueError(f"Fractions are not on a lattice with {num_division} divisions.")
+        return cls(numerators.astype(numerator_dtype(num_division)), num_division, elements)
+
+    def __len__(self) -> int:
+        return len(self.numerators)
+
+    def __getitem__(self, rows) -> "Compositions":
+        return Compositions(self.numerators[rows], self.num_division, self.elements)
+
+    def __repr__(self) -> str:
+        return f"Compositions({len(self)} rows, elements={self.elements}, num_division={self.num_division})"
+
+    def fractions(self) -> np.ndarray:
+        """
+        Mole fractions as a float64 array of shape (rows, elements).
+        """
+        return self.numerators / self.num_division
+
+    def to_frame(self) -> "pd.DataFrame":
+        """
+        Mole fractions as a DataFrame with one column per element.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.fractions(), columns=self.elements)
@@ -0,0 +1,284 @@
+import re
+
+import numpy as np
+
+from lattice import bounded_lattice, limit_bounds, numerator_dtype
+
+# Relative tolerance of the comparisons, as in lattice.limit_bounds: "W <= 0.15" must keep 3 of 20
+# divisions although 0.15 * 20 is 3.0000000000000004
+TOLERANCE = 1e-9
+
+OPERATORS = ("<=", ">=", "==", "<", ">")
+
+_TOKEN = re.compile(r"(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Z][a-z]?)|(<=|>=|==|[-+*/()<>])")
+
+
+def tokenize(text: str) -> list:
+    """
+    Split a constraint into numbers (floats), element symbols and operators.
+    """
+    tokens, position = [], 0
+    while position < len(text):
+        if text[position].isspace():
+            position += 1
+            continue
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Unexpected character {text[position]!r} in constraint {text!r}.")
+        number, symbol, operator = match.groups()
+        tokens.append(float(number) if number is not None else symbol or operator)
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser of linear expressions over element fractions.
+
+    An expression is held as an array of one coefficient per element followed by a constant; a ratio
+    of two non-constant expressions is held as a ``(numerator, denominator)`` tuple, only valid as a
+    whole side of a comparison.
+    """
+
+    def __init__(self, tokens: list, elements: list, text: str):
+        self.tokens = tokens
+        self.position = 0
+        self.elements = list(elements)
+        self.text = text
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} in constraint {self.text!r}.")
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def constant(self, value: float) -> np.ndarray:
+        form = np.zeros(len(self.elements) + 1)
+        form[-1] = value
+        return form
+
+    def expression(self):
+        form = self.term()
+        while self.peek() in ("+", "-"):
+            sign = 1 if self.take() == "+" else -1
+            other = self.term()
+            if isinstance(form, tuple) or isinstance(other, tuple):
+                raise self.error("A ratio can only be compared, not added")
+            form = form + sign * other
+        return form
+
+    def term(self):
+        form = self.unary()
+        while self.peek() in ("*", "/"):
+            operator = self.take()
+            other = self.unary()
+            if isinstance(form, tuple) or isinstance(other, tuple):
+                raise self.error("A ratio can only be compared, not multiplied")
+            if operator == "*":
+                if form[:-1].any() and other[:-1].any():
+                    raise self.error("Products of elements are not linear")
+                form = form * other[-1] if not other[:-1].any() else other * form[-1]
+            elif not other[:-1].any():
+                if other[-1] == 0:
+                    raise self.error("Division by zero")
+                form = form / other[-1]
+            else:
+                form = (form, other)
+        return form
+
+    def unary(self):
+        if self.peek() in ("+", "-"):
+            sign = 1 if self.take() == "+" else -1
+            form = self.unary()
+            if isinstance(form, tuple):
+                raise self.error("A ratio can only be compared")
+            return sign * form
+        return self.primary()
+
+    def primary(self):
+        token = self.take()
+        if isinstance(token, float):
+            return self.constant(token)
+        if token == "(":
+            form = self.expression()
+            if self.take() != ")":
+                raise self.error("Missing ')'")
+            return form
+        if isinstance(token, str) and token[0].isupper():
+            if token not in self.elements:
+                raise self.error(f"Unknown element '{token}', expected one of {self.elements}")
+            form = self.constant(0.0)
+            form[self.elements.index(token)] = 1.0
+            return form
+        raise self.error("Expected a number, an element or '('" if token is not None else "Unexpected end")
+
+
+def parse_constraint(text: str, elements: list) -> list:
+    """
+    Compile one constraint on mole fractions into rows of ``coefficients @ fractions <= rhs``.
+
+    A constraint compares two linear expressions of the element symbols with ``<=``, ``>=``, ``==``,
+    ``<`` or ``>``, e.g. ``"W <= 0.15"``, ``"Ta + Nb >= 0.5"`` or ``"2 * Ti - (V + Cr) / 2 < 0.1"``.
+    One side may also be a ratio of two expressions compared with a constant, e.g. ``"Fe / Cr <= 2"``;
+    it is multiplied out (``Fe - 2 Cr <= 0``), which is equivalent wherever the denominator is positive.
+
+    Parameters:
+        text (str): Constraint.
+        elements (list): Element symbols, in column order.
+
+    Returns:
+        list: ``(coefficients, rhs, strict)`` rows, one per inequality (two for ``==``), where
+              ``coefficients`` has one float per element.
+    """
+    tokens = tokenize(text)
+    operators = [token for token in tokens if token in OPERATORS]
+    if len(operators) != 1:
+        raise ValueError(f"Constraint {text!r} must have exactly one of {list(OPERATORS)}.")
+    split = tokens.index(operators[0])
+    sides = []
+    for part in (tokens[:split], tokens[split + 1:]):
+        parser = _Parser(part, elements, text)
+        sides.append(parser.expression())
+        if parser.position != len(part):
+            raise parser.error(f"Unexpected {part[parser.position]!r}")
+    left, right = sides
+    operator = operators[0]
+
+    if isinstance(left, tuple) or isinstance(right, tuple):
+        ratio, other = (left, right) if isinstance(left, tuple) else (right, left)
+        if isinstance(other, tuple) or other[:-1].any():
+            raise ValueError(f"A ratio must be compared with a constant in constraint {text!r}.")
+        numerator, denominator = ratio
+        if numerator[-1] or denominator[-1]:
+            raise ValueError(f"Ratios of expressions with constants are not supported in constraint {text!r}.")
+        form = numerator - other[-1] * denominator
+        left, right = (form, other * 0) if isinstance(left, tuple) else (other * 0, form)
+
+    form = left - right
+    coefficients, constant = form[:-1], -form[-1]
+    if not coefficients.any():
+        raise ValueError(f"Constraint {text!r} does not depend on any element.")
+    rows = []
+    if operator in ("<=", "<", "=="):
+        rows.append((coefficients, constant, operator == "<"))
+    if operator in (">=", ">", "=="):
+        rows.append((-coefficients, -constant, operator == ">"))
+    return rows
+
+
+class LinearConstraints:
+    """
+    Linear constraints on mole fractions, compiled once into ``matrix @ fractions <= rhs``.
+
+    Per-element bounds (``"W <= 0.15"``), sums of elements (``"Ta + Nb >= 0.5"``) and ratios
+    (``"Fe / Cr <= 2"``) are all rows of the same coefficient matrix (see ``parse_constraint``). The
+    matrix is applied to integer numerators directly, by scaling the right-hand side with the number
+    of divisions, so the constraints can be pushed down into the lattice enumerator
+    (``lattice.bounded_lattice``) or checked on existing spaces without building fractions.
+
+    Parameters:
+        elements (list): Element symbols, in column order.
+        constraints (list): Constraint strings.
+    """
+
+    def __init__(self, elements: list, constraints: list = ()):
+        if isinstance(constraints, str):
+            constraints = [constraints]
+        self.elements = list(elements)
+        self.constraints = [str(text).strip() for text in constraints]
+        rows = [row for text in self.constraints for row in parse_constraint(text, self.elements)]
+        self.matrix = np.array([row[0] for row in rows], dtype=np.float64).reshape(len(rows), len(self.elements))
+        self.rhs = np.array([row[1] for row in rows], dtype=np.float64)
+        self.strict = np.array([row[2] for row in rows], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.constraints)
+
+    def __repr__(self) -> str:
+        return f"LinearConstraints({self.elements}, {self.constraints})"
+
+    def numerator_system(self, num_division: int) -> tuple:
+        """
+        The constraints on the numerators of a lattice with ``num_division`` divisions, with the
+        comparison tolerance folded into the right-hand side.
+
+        Returns:
+            tuple: ``(coefficients, rhs)`` such that a row passes if ``coefficients @ numerators <= rhs``.
+        """
+        rhs = self.rhs * num_division
+        scale = np.maximum(np.abs(self.matrix).max(axis=1, initial=0.0) * num_division, np.abs(rhs))
+        tolerance = TOLERANCE * np.maximum(scale, 1.0)
+        return self.matrix, np.where(self.strict, rhs - tolerance, rhs + tolerance)
+
+    def bounds(self, num_division: int, limits: list = None) -> tuple:
+        """
+        Integer numerator bounds implied by the single-element constraints, within ``limits``.
+
+        Returns:
+            tuple: ``(lower, upper)`` int64 arrays, as ``lattice.limit_bounds``.
+        """
+        lower, upper = limit_bounds(num_division, [[0, 1]] * len(self.elements) if limits is None else limits)
+        coefficients, rhs = self.numerator_system(num_division)
+        for row, bound in zip(coefficients, rhs):
+            used = np.flatnonzero(row)
+            if len(used) == 1:
+                j = used[0]
+                if row[j] > 0:
+                    upper[j] = min(upper[j], np.floor(bound / row[j]))
+                else:
+                    lower[j] = max(lower[j], np.ceil(bound / row[j]))
+        return lower, upper
+
+    def mask(self, numerators: np.ndarray, num_division: int = 1, chunksize: int = 1_000_000) -> np.ndarray:
+        """
+        Mask of the rows satisfying every constraint, ``chunksize`` rows at a time.
+
+        Parameters:
+            numerators (np.ndarray): Integer numerators, or mole fractions with ``num_division=1``.
+            num_division (int): Number of divisions of the numerators.
+        """
+        coefficients, rhs = self.numerator_system(num_division)
+        mask = np.ones(len(numerators), dtype=bool)
+        for start in range(0, len(numerators), chunksize):
+            block = np.asarray(numerators[start:start + chunksize], dtype=np.float64)
+            mask[start:start + len(block)] = (block @ coefficients.T <= rhs).all(axis=1)
+        return mask
+
+    def lattice(self, num_division: int, limits: list = None, columns: list = None, dtype=None) -> np.ndarray:
+        """
+        Enumerate the lattice compositions satisfying the constraints, without generating the others.
+
+        Parameters:
+            num_division (int): Number of divisions.
+            limits (list): Optional ``[min, max]`` mole fraction of each element.
+            columns (list): Indices of the elements present; the others are fixed to 0. Present
+                            elements take at least one division, as in the faces of
+                            ``lattice.multi_system_lattice``.
+            dtype: Integer dtype of the output, see ``lattice.bounded_lattice``.
+
+        Returns:
+            np.ndarray: Numerators of the present elements only, shape (rows, len(columns)).
+        """
+        dtype = numerator_dtype(num_division) if dtype is None else np.dtype(dtype)
+        lower, upper = self.bounds(num_division, limits)
+        coefficients, rhs = self.numerator_system(num_division)
+        # Single-element constraints are already in the bounds
+        keep = (coefficients != 0).sum(axis=1) > 1
+        coefficients, rhs = coefficients[keep], rhs[keep]
+        if columns is not None:
+            columns = list(columns)
+            if np.delete(lower, columns).any():
+                return np.empty((0, len(columns)), dtype=dtype)
+            lower, upper = np.maximum(lower[columns], 1), upper[columns]
+            coefficients = coefficients[:, columns]
+            # Constraints on absent elements only either always or never hold
+            absent = ~coefficients.any(axis=1)
+            if (rhs[absent] < 0).any():
+                return np.empty((0, len(columns)), dtype=dtype)
+            coefficients, rhs = coefficients[~absent], rhs[~absent]
+        return bounded_lattice(num_division, lower, upper, dtype, coefficients, rhs)
@@ -1,53 +1,95 @@
-import numpy as np
-import pandas as pd
 import time
-from itertools import combinations, compress
+from math import comb
 
-# Start timer
-tic = time.time()
+import profiling
+from constraints import LinearConstraints
+from lattice import multi_system_lattice
+from space_cache import cached_multi_system_lattice
+from table_io import write_compositions
 
 ##### USER INPUTS ###########################
 elements = ['Ti', 'Ta', 'V', 'Mo', 'Fe', 'Re', 'Nb', 'Zr', 'Cr', 'Hf', 'W']
 only_extra = False  # currently unused
-savename = 'Quinary_Compositions'
 n_comps = 20        # e.g. 100/20 = 5 at.% resolution
 sys_d = 5           # fixed at 5 for quinary
+output_file = 'compositionforactivation.csv'  # .csv, .parquet or .npy (integer numerators + JSON header)
+use_cache = True    # reuse the lattice enumerated by a previous run (see space_cache.py)
+
+# Linear constraints on mole fractions (uncomment to apply, see constraints.py). They are pruned while
+# enumerating, so the compositions violating them are never generated.
+constraints = [
+    # "W <= 0.15",
+    # "Mo <= 0.15",
+    # "V <= 0.30",
+    # "Ta + Nb >= 0.5",
+    # "Ti >= 0.05",
+]
 #############################################
 
-# Generate list of all 5-element combinations from the element list
-sys_list = [list(sys) for sys in combinations(elements, sys_d)]
-
-# Generate compositions for a 5-element system where the sum of parts = n_comps
-comps = []
-indices = np.ndindex(*[n_comps for _ in range(sys_d)])
-j = 0
-for index in indices:
-    j += 1
-    if sum(index) == n_comps:
-        comps.append(np.array(index) / n_comps)
-    if j % 100000 == 0:
-        toc = time.time()
-        print(f"{round(j / (n_comps**sys_d) * 100, 2)}% Checked | {len(comps)} Valid Comps | {round(toc - tic, 2)}s")
-
-# Build full DataFrame of all sampled quinary compositions
-results_df = pd.DataFrame(columns=elements)
-for i, s_els in enumerate(sys_list):
-    new_df = pd.DataFrame(comps, columns=s_els).fillna(0)
-    results_df = pd.concat([results_df, new_df], ignore_index=True)
-    toc = time.time()
-    print(f"{round(i / len(sys_list) * 100, 2)}% Systems Added | {round(toc - tic, 2)}s")
-
-# Remove duplicates and reset index
-results_df = results_df.fillna(0).drop_duplicates().reset_index(drop=True)
-
-# Optional filtering (uncomment to apply)
-# results_df = results_df.loc[results_df['W'] <= 0.15]
-# results_df = results_df.loc[results_df['Mo'] <= 0.15]
-# results_df = results_df.loc[results_df['V'] <= 0.30]
-# results_df = results_df.loc[results_df['Ta'] + results_df['Nb'] >= 0.5]
-# results_df = results_df.loc[results_df['Ti'] >= 0.05]
-
-# Save to CSV
-results_df.to_csv("compositionforactivation.csv", index=False)
-print(f"✅ Total valid compositions: {len(results_df)}")
-print(f"📁 File saved as: {savename}.csv")
+
+def generate_compositions(
+    elements: list,
+    order: int = 5,
+    num_division: int = 20,
+    output_file: str = "compositionforactivation.csv",
+    use_cache: bool = True,
+    select=None,
+    constraints=None,
+    verbose: bool = True,
+) -> int:
+    """
+    Write the union of all ``order``-element subsystem lattices of ``elements``.
+
+    Faces shared between subsystems (binaries, ternaries, ...) are written exactly once. With
+    ``use_cache``, the lattice is only enumerated once per (elements, order, num_division) and
+    memory-mapped afterwards (see ``space_cache.py``). ``constraints`` are pushed into the enumerator, so
+    only the compositions satisfying them are generated.
+
+    Parameters:
+        elements (list): Element symbols.
+        order (int): Number of elements per subsystem, e.g. 5 for quinary systems.
+        num_division (int): Number of divisions, e.g. 20 for 5 at.% steps.
+        output_file (str): ``.csv``, ``.parquet`` or ``.npy`` file (integer numerators + JSON header).
+        use_cache (bool): Reuse the lattice enumerated by a previous run.
+        select (callable): Receives the DataFrame of mole fractions and returns the rows to write; the
+                           DataFrame (and pandas) is only built if given.
+        constraints (list): Constraint strings, e.g. ``["W <= 0.15", "Ta + Nb >= 0.5"]``, or a
+                            ``constraints.LinearConstraints`` of ``elements``.
+        verbose (bool): Print the number of compositions and the elapsed time.
+
+    Returns:
+        int: Number of compositions written.
+    """
+    if constraints is not None and not isinstance(constraints, LinearConstraints):
+        constraints = LinearConstraints(elements, constraints)
+    if constraints is not None and not len(constraints):
+        constraints = None
+
+    tic = time.time()
+    with profiling.stage("enumerate") as stage:
+        if use_cache:
+            numerators = cached_multi_system_lattice(elements, order, num_division, constraints=constraints).numerators
+        else:
+            numerators = multi_system_lattice(len(elements), order, num_division, constraints=constraints)
+        stage.rows_out = len(numerators)
+    if verbose:
+        print(f"{len(numerators)} Unique Comps from {comb(len(elements), order)} Systems | {round(time.time() - tic, 2)}s")
+
+    if select is not None:
+        import pandas as pd
+        with profiling.stage("frame", rows_in=len(numerators)):
+            results_df = pd.DataFrame(numerators / num_division, columns=elements)
+        numerators = numerators[select(results_df).index]
+
+    # Save in the format given by the file extension
+    with profiling.stage("write", rows_in=len(numerators)) as stage:
+        write_compositions(output_file, numerators, elements, num_division)
+        stage.add_file(output_file)
+    return len(numerators)
+
+
+if __name__ == "__main__":
+    # Run with ALLOY_PROFILE=1 (or ALLOY_PROFILE=trace.json) for the time, rows, bytes and memory of every stage.
+    written = generate_compositions(elements, sys_d, n_comps, output_file, use_cache, constraints=constraints)
+    print(f"✅ Total valid compositions: {written}")
+    print(f"📁 File saved as: {output_file}")
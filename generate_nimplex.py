@@ -1,6 +1,102 @@
 import argparse
-import nimplex
-import pandas as pd
+import os
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import profiling
+from compositions import Compositions
+from constraints import LinearConstraints
+from graph import CHUNKSIZE, NeighborGraph, graph_paths, write_space
+from lattice import limit_bounds, numerator_dtype, within_limits
+from space_cache import DEFAULT_CACHE_DIR, SpaceCache, space_key
+from table_io import header_path
+
+# nimplex and pandas are imported by the code paths that need them, so that cache hits, --help and
+# workers importing this module start quickly (and cached spaces load without nimplex installed)
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def check_space_arguments(elements: list, dimension: int, num_division: int, limit: list):
+    """
+    Validate the arguments describing a nimplex space.
+
+    Raises:
+        ValueError: If the elements, limits or number of divisions are inconsistent.
+    """
+    if len(elements) != dimension:
+        raise ValueError(f"Number of elements ({len(elements)}) must match the dimension ({dimension}).")
+
+    if len(limit) != dimension or any(len(l) != 2 for l in limit):
+        raise ValueError(f"Limit must have 2 values (min and max) for each component, got {len(limit)} limits.")
+
+    if not all(isinstance(el, str) for el in elements):
+        raise ValueError("All elements must be strings representing element symbols.")
+
+    if num_division <= 0:
+        raise ValueError("Number of divisions must be a positive integer.")
+
+    if any(l[0] > l[1] for l in limit):
+        raise ValueError("Each limit's minimum must be less than or equal to its maximum.")
+
+
+def load_nimplex_space(
+    elements: list, num_division: int, limit: list, cache: SpaceCache = None, derive: bool = True, constraints=None
+) -> tuple:
+    """
+    Composition space and neighbor graph of a nimplex space, through the space cache.
+
+    nimplex is only called the first time a given (elements, num_division, limit) is requested; later
+    calls memory-map the cached arrays (see ``space_cache.SpaceCache``). With ``derive``, a limited
+    space is not generated by nimplex but derived from the cached unlimited space of the same
+    elements and divisions: its nodes are selected by a vectorised bounds filter on the integer
+    numerators (``lattice.within_limits``) and its neighbor lists are remapped through an index
+    translation array (``NeighborGraph.subgraph``), which keeps the node and neighbor order of
+    nimplex. Derived spaces are not stored, so exploring many limit boxes on one system only costs
+    one full space in the cache. Linear ``constraints``, which nimplex does not support, are applied
+    the same way, as a node mask of the limited space.
+
+    Parameters:
+        elements (list): List of element symbols.
+        num_division (int): Number of divisions for the simplex.
+        limit (list): Min and max of each component, as for ``generate_nimplex_space``.
+        cache (SpaceCache): Cache to use; the default cache directory if None.
+        derive (bool): Derive limited spaces from the unlimited one instead of calling nimplex.
+        constraints (list): Constraint strings, e.g. ``["Ta + Nb >= 0.5"]``, or a
+                            ``constraints.LinearConstraints`` of ``elements``.
+
+    Returns:
+        tuple: ``(compositions, graph)``, the ``Compositions`` of the nodes and their ``NeighborGraph``.
+    """
+    check_space_arguments(elements, len(elements), num_division, limit)
+    cache = cache or SpaceCache()
+    if constraints is not None and not isinstance(constraints, LinearConstraints):
+        constraints = LinearConstraints(elements, constraints)
+    if constraints is not None and len(constraints):
+        compositions, graph = load_nimplex_space(elements, num_division, limit, cache, derive)
+        mask = constraints.mask(compositions.numerators, num_division)
+        return compositions[mask], graph.subgraph(mask)
+
+    lower, upper = limit_bounds(num_division, limit)
+    full_limit = [[0, 1]] * len(elements)
+    if (lower == 0).all() and (upper == num_division).all():
+        limit = full_limit
+    elif derive:
+        compositions, graph = load_nimplex_space(elements, num_division, full_limit, cache)
+        mask = within_limits(compositions.numerators, num_division, limit)
+        return compositions[mask], graph.subgraph(mask)
+
+    key = space_key("nimplex", elements, num_division, limit)
+    entry = cache.get(key)
+    if entry is None:
+        import nimplex
+        component_space, neighbor_list = nimplex.simplex_graph_limited_fractional_py(
+            dim=len(elements), ndiv=num_division, limit=limit
+        )
+        numerators = np.rint(np.asarray(component_space) * num_division).astype(numerator_dtype(num_division))
+        entry = cache.put(key, numerators.reshape(-1, len(elements)), elements, num_division, neighbor_list)
+    return entry
 
 
 def generate_nimplex_space(
@@ -10,7 +106,12 @@ def generate_nimplex_space(
     limit: list,
     no_csv=False,
     plot=False,
-) -> pd.DataFrame:
+    output_format="csv",
+    chunksize: int = CHUNKSIZE,
+    return_frame: bool = True,
+    cache: SpaceCache = None,
+    constraints=None,
+) -> "pd.DataFrame":
     """
     Generate nimplex component space and neighbor list.
 
@@ -22,45 +123,85 @@ def generate_nimplex_space(
                       e.g., for a 3-dimensional simplex, the limit should be [[min1, max1], [min2, max2], [min3, max3]].
         no_csv (bool): Whether to write the output to a CSV file. If True, the output will not be saved to a CSV file.
         plot (bool): Whether to plot the nimplex space.
+        output_format (str): Format of the output file: "csv", "parquet" or "npy". "npy" stores the integer
+                             composition numerators with a JSON header (elements, ndiv) and the neighbor
+                             graph in CSR form ("_neighbors_offsets.npy" and "_neighbors_indices.npy",
+                             int32, see graph.load_graph).
+        chunksize (int): Number of nodes converted and written at a time.
+        return_frame (bool): Whether to build and return the DataFrame of the whole space. The output
+                             file is written chunk by chunk either way; without the DataFrame, memory
+                             stays bounded by the nimplex output itself.
+        cache (SpaceCache): If given, the space is read from this cache and nimplex is only called on a
+                            cache miss; limited spaces are derived from the cached unlimited space
+                            (see ``load_nimplex_space``). A cached space stays memory-mapped while
+                            the output file is written; it is only loaded for the DataFrame or plot.
+        constraints (list): Linear constraints on the mole fractions, e.g. ``["Ta + Nb >= 0.5"]`` (see
+                            ``constraints.py``). The nodes violating them are removed and the neighbor
+                            lists renumbered, as for derived spaces.
 
     Returns:
-        pd.DataFrame: DataFrame containing the component space and neighbor list.
+        pd.DataFrame: DataFrame containing the component space and neighbor list, or None if
+                      ``return_frame`` is False.
     """
-    if len(elements) != dimension:
-        raise ValueError(f"Number of elements ({len(elements)}) must match the dimension ({dimension}).")
-
-    if len(limit) != dimension or any(len(l) != 2 for l in limit):
-        raise ValueError(f"Limit must have 2 values (min and max) for each component, got {len(limit)} limits.")
+    check_space_arguments(elements, dimension, num_division, limit)
 
-    if not all(isinstance(el, str) for el in elements):
-        raise ValueError("All elements must be strings representing element symbols.")
-
-    if num_division <= 0:
-        raise ValueError("Number of divisions must be a positive integer.")
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
 
-    if any(l[0] > l[1] for l in limit):
-        raise ValueError("Each limit's minimum must be less than or equal to its maximum.")
+    if output_format not in ("csv", "parquet", "npy"):
+        raise ValueError(f"Output format must be one of 'csv', 'parquet' or 'npy', got '{output_format}'.")
 
-    component_space, neighbor_list = nimplex.simplex_graph_limited_fractional_py(
-        dim=dimension, ndiv=num_division, limit=limit
-    )
+    if constraints is not None and not isinstance(constraints, LinearConstraints):
+        constraints = LinearConstraints(elements, constraints)
 
-    dataframe = pd.DataFrame(component_space, columns=elements)
-    neighbors_df = pd.DataFrame(neighbor_list)
-    neighbors_df.columns = [f"Neighbor_{i}" for i in range(neighbors_df.shape[1])]
-    dataframe = pd.concat([neighbors_df, dataframe], axis=1)
-    dataframe.reset_index(names="Node ID", inplace=True)
+    with profiling.stage("generate") as record:
+        if cache is not None:
+            # Kept memory-mapped: write_space streams the cached arrays chunk by chunk
+            component_space, neighbor_list = load_nimplex_space(
+                elements, num_division, limit, cache, constraints=constraints
+            )
+        else:
+            import nimplex
+            component_space, neighbor_list = nimplex.simplex_graph_limited_fractional_py(
+                dim=dimension, ndiv=num_division, limit=limit
+            )
+            if constraints is not None and len(constraints):
+                component_space = np.asarray(component_space, dtype=np.float64).reshape(-1, dimension)
+                mask = constraints.mask(component_space)
+                component_space = component_space[mask]
+                neighbor_list = NeighborGraph.from_lists(neighbor_list).subgraph(mask).to_lists()
+        record.rows_out = len(component_space)
 
     if not no_csv:
-        dataframe.to_csv(f"{''.join(elements)}_ndiv_{num_division}_nimplex_space.csv", index=False)
+        filename = f"{''.join(elements)}_ndiv_{num_division}_nimplex_space.{output_format}"
+        with profiling.stage("write_space", rows_in=len(component_space)) as record:
+            write_space(filename, component_space, neighbor_list, elements, num_division, chunksize)
+            for path in [filename, header_path(filename), *graph_paths(os.path.splitext(filename)[0] + "_neighbors")]:
+                record.add_file(path)
+
+    dataframe = None
+    if return_frame:
+        import pandas as pd
+        with profiling.stage("frame", rows_in=len(component_space)):
+            if isinstance(component_space, Compositions):
+                component_space, neighbor_list = component_space.fractions(), neighbor_list.to_lists()
+            dataframe = pd.DataFrame(component_space, columns=elements)
+            neighbors_df = pd.DataFrame(neighbor_list)
+            neighbors_df.columns = [f"Neighbor_{i}" for i in range(neighbors_df.shape[1])]
+            dataframe = pd.concat([neighbors_df, dataframe], axis=1)
+            dataframe.reset_index(names="Node ID", inplace=True)
 
     if plot:
         if dimension not in [3, 4]:
             raise ValueError("Plotting is only supported for 3- and 4-component systems.")
 
+        import nimplex
+        import pandas as pd
         from utils import plotting
         import plotly.express as px
 
+        if isinstance(component_space, Compositions):
+            component_space = component_space.fractions()
         pure_component_indices = nimplex.pure_component_indexes_py(dimension, num_division)
         cartesian_grid = pd.DataFrame(
                 plotting.simplex2cartesian_py(component_space) if dimension == 4 else component_space,
@@ -89,13 +230,20 @@ def generate_nimplex_space(
                     hover_data={"x": False, "y": False, "z": False},
             )
 
-        fig.write_html(f"{''.join(elements)}_ndiv_{num_division}_plot.html")
+        plot_file = f"{''.join(elements)}_ndiv_{num_division}_plot.html"
+        with profiling.stage("write_plot", rows_in=len(cartesian_grid)) as record:
+            fig.write_html(plot_file)
+            record.add_file(plot_file)
 
     return dataframe
 
 
-if __name__ == "__main__":
+def main(argv: list = None, prog: str = None):
+    """
+    Generate a nimplex space from the command line (``python cli.py nimplex``).
+    """
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Generate nimplex component space and neighbor list."
     )
     parser.add_argument(
@@ -115,6 +263,12 @@ if __name__ == "__main__":
         nargs="+",
         help="Limits for each component as min max pairs in the order [min1 max1 min2 max2 ...], e.g. --limit 0 1 0 1 0 1 0 1 for 4 components",
     )
+    parser.add_argument(
+        "--constraint",
+        action="append",
+        metavar="EXPR",
+        help='Linear constraint on the mole fractions, e.g. "Ta + Nb >= 0.5"; repeat for several',
+    )
     parser.add_argument(
         "--no_csv",
         action="store_true",
@@ -125,7 +279,33 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to plot the nimplex space (supported for 3- and 4- component systems)."
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet", "npy"],
+        default="csv",
+        help="Output file format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        help="Reuse spaces generated before from this cache directory (default: %(const)s)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=CHUNKSIZE,
+        help="Number of nodes converted and written at a time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        help="Print the time, rows, bytes and peak memory of every stage; with a path, also write a Chrome trace there",
+    )
+    args = parser.parse_args(argv)
+    if args.profile is not None:
+        profiling.enable(args.profile or None)
 
     element_list = args.elements
     dim = len(element_list)
@@ -137,4 +317,11 @@ if __name__ == "__main__":
     else:
         lim = [[0, 1] for _ in range(dim)]
 
-    generate_nimplex_space(element_list, dim, args.ndiv, lim, args.no_csv, args.plot)
+    generate_nimplex_space(
+        element_list, dim, args.ndiv, lim, args.no_csv, args.plot, args.format, args.chunksize, return_frame=False,
+        cache=SpaceCache(args.cache) if args.cache else None, constraints=args.constraint,
+    )
+
+
+if __name__ == "__main__":
+    main()
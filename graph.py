@@ -0,0 +1,368 @@
+import itertools
+import os
+
+import numpy as np
+
+from compositions import Compositions
+from lattice import numerator_dtype
+from table_io import CompositionWriter, TableWriter, assemble_npy, file_format
+
+# Rows of the composition space converted and written at a time
+CHUNKSIZE = 100_000
+
+# Node and edge positions of the CSR arrays
+INDEX_DTYPE = np.dtype(np.int32)
+
+
+def graph_paths(path: str) -> tuple:
+    """
+    Paths of the offsets and indices ``.npy`` files of the graph stored under ``path``.
+
+    ``path`` is a file name without extension, e.g. ``"CoCrFe_ndiv_5_nimplex_space_neighbors"``.
+    """
+    return f"{path}_offsets.npy", f"{path}_indices.npy"
+
+
+def csr_block(neighbor_lists: list, first_offset: int = 0) -> tuple:
+    """
+    Convert ragged neighbor lists to CSR arrays.
+
+    Parameters:
+        neighbor_lists (list): Neighbor node IDs of each node, or a ``NeighborGraph`` whose arrays
+                               are used as they are.
+        first_offset (int): Number of edges before the first node, added to every offset.
+
+    Returns:
+        tuple: ``(offsets, indices)``, the end offset of every node's neighbors (int64, so that
+               overflows can be detected) and the concatenated neighbors (int32).
+    """
+    if isinstance(neighbor_lists, NeighborGraph):
+        offsets = first_offset + np.asarray(neighbor_lists.offsets[1:], dtype=np.int64)
+        return offsets, np.asarray(neighbor_lists.indices, dtype=INDEX_DTYPE)
+    degrees = np.fromiter(map(len, neighbor_lists), dtype=np.int64, count=len(neighbor_lists))
+    offsets = first_offset + np.cumsum(degrees)
+    indices = np.fromiter(
+        itertools.chain.from_iterable(neighbor_lists), dtype=INDEX_DTYPE, count=int(degrees.sum())
+    )
+    return offsets, indices
+
+
+class NeighborGraph:
+    """
+    Neighbor graph of a composition space in compressed sparse row (CSR) form.
+
+    The neighbors of node ``i`` are ``indices[offsets[i]:offsets[i + 1]]``; both arrays are int32,
+    so a graph takes 4 bytes per node and per edge instead of a NaN-padded float frame of
+    (nodes × maximum degree) values. Graphs loaded by ``load_graph`` are memory-mapped.
+
+    Parameters:
+        offsets (np.ndarray): Start of every node's neighbors in ``indices``, plus the total number
+                              of edges, shape (nodes + 1,).
+        indices (np.ndarray): Concatenated neighbor node IDs.
+    """
+
+    __slots__ = ("offsets", "indices")
+
+    def __init__(self, offsets: np.ndarray, indices: np.ndarray):
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(indices):
+            raise ValueError("Offsets must start at 0 and end at the number of indices.")
+        self.offsets = offsets
+        self.indices = indices
+
+    @classmethod
+    def from_lists(cls, neighbor_lists: list) -> "NeighborGraph":
+        """
+        Build a graph from ragged neighbor lists, e.g. those returned by nimplex.
+        """
+        offsets, indices = csr_block(neighbor_lists)
+        if len(indices) > np.iinfo(INDEX_DTYPE).max:
+            raise ValueError(f"Graph has {len(indices)} edges, more than int32 offsets can address.")
+        return cls(np.concatenate([[0], offsets]).astype(INDEX_DTYPE), indices)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, nodes: slice) -> "NeighborGraph":
+        """
+        Neighbor lists of a contiguous range of nodes, as a graph whose offsets start at 0.
+
+        Neighbor IDs are not renumbered, so the block is a slice of the neighbor lists, not a subgraph
+        (see ``subgraph``). Only views of the arrays are taken, so slicing a memory-mapped graph reads
+        nothing until the block is used.
+        """
+        if not isinstance(nodes, slice) or nodes.step not in (None, 1):
+            raise TypeError("Graphs can only be sliced by a contiguous range of nodes.")
+        start, stop, _ = nodes.indices(len(self))
+        stop = max(start, stop)
+        first, last = int(self.offsets[start]), int(self.offsets[stop])
+        return NeighborGraph(self.offsets[start:stop + 1] - first, self.indices[first:last])
+
+    def __repr__(self) -> str:
+        return f"NeighborGraph({len(self)} nodes, {self.num_edges} edges)"
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.offsets[-1])
+
+    def degrees(self) -> np.ndarray:
+        """
+        Number of neighbors of every node.
+        """
+        return np.diff(self.offsets)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """
+        Neighbor node IDs of ``node``.
+        """
+        return self.indices[self.offsets[node]:self.offsets[node + 1]]
+
+    def to_lists(self) -> list:
+        """
+        Neighbor lists of every node, the inverse of ``from_lists``.
+        """
+        return [self.indices[start:stop].tolist() for start, stop in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def subgraph(self, mask: np.ndarray) -> "NeighborGraph":
+        """
+        Graph induced by the nodes selected by ``mask``, renumbered in order.
+
+        Edges to unselected nodes are dropped and the remaining neighbors are remapped through an
+        index translation array (old node -> new node), keeping their order, in a few vectorised
+        passes over the edges.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self),):
+            raise ValueError(f"Mask must have one value per node ({len(self)}), got shape {mask.shape}.")
+        translation = np.cumsum(mask, dtype=np.int64) - 1
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        indices = np.asarray(self.indices)
+        keep = np.repeat(mask, np.diff(offsets)) & mask[indices]
+        kept_before = np.concatenate([[0], np.cumsum(keep, dtype=np.int64)])
+        degrees = kept_before[offsets[1:]] - kept_before[offsets[:-1]]
+        new_offsets = np.concatenate([[0], np.cumsum(degrees[mask])]).astype(INDEX_DTYPE)
+        return NeighborGraph(new_offsets, translation[indices[keep]].astype(INDEX_DTYPE))
+
+
+class GraphWriter:
+    """
+    Append blocks of neighbor lists to the CSR files of a graph, chunk by chunk.
+
+    Offsets and indices are streamed to temporary files and turned into ``.npy`` files on ``close``,
+    so only one block is ever converted in memory.
+
+    Parameters:
+        path (str): Graph path without extension, see ``graph_paths``.
+    """
+
+    def __init__(self, path: str):
+        self.offsets_path, self.indices_path = graph_paths(path)
+        self.nodes = 0
+        self.edges = 0
+        self._offsets = open(self.offsets_path + ".part", "wb")
+        self._indices = open(self.indices_path + ".part", "wb")
+        self._offsets.write(np.zeros(1, dtype=INDEX_DTYPE).tobytes())
+
+    def write(self, neighbor_lists: list):
+        offsets, indices = csr_block(neighbor_lists, self.edges)
+        if len(offsets) and offsets[-1] > np.iinfo(INDEX_DTYPE).max:
+            raise ValueError(f"Graph has more than {np.iinfo(INDEX_DTYPE).max} edges; int32 offsets overflow.")
+        self._offsets.write(offsets.astype(INDEX_DTYPE).tobytes())
+        self._indices.write(indices.tobytes())
+        self.nodes += len(offsets)
+        self.edges += len(indices)
+
+    def close(self):
+        self._offsets.close()
+        self._indices.close()
+        assemble_npy(self.offsets_path, INDEX_DTYPE, (self.nodes + 1,))
+        assemble_npy(self.indices_path, INDEX_DTYPE, (self.edges,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_graph(path: str, neighbor_lists: list, chunksize: int = CHUNKSIZE):
+    """
+    Write ragged neighbor lists, or a ``NeighborGraph``, as CSR ``.npy`` files, ``chunksize`` nodes at a time.
+    """
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    with GraphWriter(path) as writer:
+        for start in range(0, len(neighbor_lists), chunksize):
+            writer.write(neighbor_lists[start:start + chunksize])
+
+
+def load_graph(path: str, mmap: bool = True) -> NeighborGraph:
+    """
+    Load a graph written by ``GraphWriter`` or ``write_graph``.
+
+    Parameters:
+        path (str): Graph path without extension, see ``graph_paths``.
+        mmap (bool): Memory-map the arrays instead of reading them, so opening a graph is instant and
+                     only the visited nodes are paged in.
+    """
+    offsets_path, indices_path = graph_paths(path)
+    mode = "r" if mmap else None
+    return NeighborGraph(np.load(offsets_path, mmap_mode=mode), np.load(indices_path, mmap_mode=mode))
+
+
+def write_space(
+    path: str,
+    component_space: list,
+    neighbor_lists: list,
+    elements: list,
+    num_division: int,
+    chunksize: int = CHUNKSIZE,
+):
+    """
+    Write a composition space and its neighbor graph, ``chunksize`` nodes at a time.
+
+    ``.npy`` stores the integer composition numerators (see ``table_io.CompositionWriter``) and the
+    graph as CSR files under ``<name>_neighbors`` (see ``graph_paths``). ``.csv`` and ``.parquet``
+    store one table with a ``Node ID`` column, the neighbor lists padded to the maximum degree
+    (``Neighbor_<i>`` columns, float with NaN padding past the smallest degree) and the element fractions.
+    In both cases only one chunk of rows is converted at a time, so a memory-mapped ``Compositions`` and
+    ``NeighborGraph`` (e.g. a space cache entry) are written without being loaded.
+
+    Parameters:
+        path (str): Output file, ``.npy``, ``.csv`` or ``.parquet``.
+        component_space (list): Mole fractions of every node, or their ``Compositions``.
+        neighbor_lists (list): Neighbor node IDs of every node, or their ``NeighborGraph``.
+        elements (list): Element symbols, one per component.
+        num_division (int): Number of divisions of the composition grid.
+        chunksize (int): Number of nodes converted and written at a time.
+    """
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    if len(component_space) != len(neighbor_lists):
+        raise ValueError("Every node of the composition space must have a neighbor list.")
+
+    if file_format(path) == "npy":
+        dtype = numerator_dtype(num_division)
+        with CompositionWriter(path, elements, num_division) as writer:
+            for start in range(0, len(component_space), chunksize):
+                block = component_space[start:start + chunksize]
+                if isinstance(block, Compositions):
+                    writer.write(block.numerators.astype(dtype))
+                    continue
+                fractions = np.asarray(block, dtype=np.float64)
+                writer.write(np.rint(fractions * num_division).astype(dtype).reshape(-1, len(elements)))
+        write_graph(os.path.splitext(path)[0] + "_neighbors", neighbor_lists, chunksize)
+        return
+
+    import pandas as pd
+    if isinstance(neighbor_lists, NeighborGraph):
+        degrees = np.asarray(neighbor_lists.degrees(), dtype=np.int64)
+    else:
+        degrees = np.fromiter(map(len, neighbor_lists), dtype=np.int64, count=len(neighbor_lists))
+    max_degree = int(degrees.max(initial=0))
+    neighbor_columns = [f"Neighbor_{i}" for i in range(max_degree)]
+    # Same column types as a single DataFrame of the ragged lists: a column is float if it needs NaN
+    # padding, i.e. past the smallest degree
+    min_degree = int(degrees.min(initial=max_degree))
+    with TableWriter(path, ["Node ID"] + neighbor_columns + list(elements)) as writer:
+        for start in range(0, len(component_space), chunksize):
+            block = neighbor_lists[start:start + chunksize]
+            offsets, indices = csr_block(block)
+            block_degrees = degrees[start:start + len(block)]
+            starts = offsets - block_degrees
+            padded = np.full((len(block), max_degree), np.nan)
+            padded[np.repeat(np.arange(len(block)), block_degrees),
+                   np.arange(len(indices)) - np.repeat(starts, block_degrees)] = indices
+            fractions = component_space[start:start + len(block)]
+            if isinstance(fractions, Compositions):
+                fractions = fractions.fractions()
+            fractions = np.asarray(fractions, dtype=np.float64)
+            chunk = pd.concat([
+                pd.DataFrame({"Node ID": np.arange(start, start + len(block), dtype=np.int64)}),
+                pd.DataFrame(padded, columns=neighbor_columns).astype(
+                    {column: np.int64 for column in neighbor_columns[:min_degree]}
+                ),
+                pd.DataFrame(fractions.reshape(-1, len(elements)), columns=list(elements)),
+            ], axis=1)
+            writer.write(chunk)
+
+
+def _find_roots(parent: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """
+    Roots of ``nodes`` in the union-find forest ``parent``, compressing the paths of ``nodes`` only.
+    """
+    roots = parent[nodes]
+    while True:
+        up = parent[roots]
+        if np.array_equal(up, roots):
+            break
+        roots = up
+    parent[nodes] = roots
+    return roots
+
+
+def connected_components(graph: NeighborGraph, mask: np.ndarray = None, chunksize: int = CHUNKSIZE) -> np.ndarray:
+    """
+    Label the connected components of the subgraph induced by the nodes selected by ``mask``.
+
+    Vectorised union-find: the edges between selected nodes are read ``chunksize`` nodes at a time.
+    The endpoints of a batch are replaced by their roots, and the roots it touches are merged in a
+    small local forest renumbered by ``np.unique``, by hooking the larger of the two roots of every
+    edge to the smaller one (``np.minimum.at``) and pointer jumping until no edge joins two
+    components. Only the touched roots and endpoints are rewritten, so each batch costs time linear
+    in its own edges, not in the number of nodes, and memory is bounded by one chunk of edges.
+
+    Parameters:
+        graph (NeighborGraph): Undirected graph (every edge listed from both ends, as in nimplex graphs).
+        mask (np.ndarray): Boolean mask of the selected nodes; None selects every node.
+        chunksize (int): Number of nodes whose edges are merged at a time.
+
+    Returns:
+        np.ndarray: Component of every node (int32), numbered from 0 in the order of their first node;
+                    -1 for the nodes not selected.
+    """
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    nodes = len(graph)
+    mask = np.ones(nodes, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+    if mask.shape != (nodes,):
+        raise ValueError(f"Mask must have one value per node ({nodes}), got shape {mask.shape}.")
+
+    # Every root is the smallest node of its component, since roots are always hooked to smaller ones
+    parent = np.arange(nodes, dtype=np.int64)
+    for start in range(0, nodes, chunksize):
+        stop = min(start + chunksize, nodes)
+        offsets = np.asarray(graph.offsets[start:stop + 1], dtype=np.int64)
+        sources = np.repeat(np.arange(start, stop), np.diff(offsets))
+        targets = np.asarray(graph.indices[offsets[0]:offsets[-1]], dtype=np.int64)
+        # Each undirected edge once, between selected nodes only
+        keep = (sources < targets) & mask[sources] & mask[targets]
+        sources, targets = _find_roots(parent, sources[keep]), _find_roots(parent, targets[keep])
+        joining = sources != targets
+        if not joining.any():
+            continue
+        # Sorted, so the smallest local root of a component is also its smallest node
+        roots, local = np.unique(np.concatenate([sources[joining], targets[joining]]), return_inverse=True)
+        local_sources, local_targets = np.split(local, 2)
+        local_parent = np.arange(len(roots))
+        while len(local_sources):
+            low = np.minimum(local_parent[local_sources], local_parent[local_targets])
+            high = np.maximum(local_parent[local_sources], local_parent[local_targets])
+            merging = low != high
+            if not merging.any():
+                break
+            np.minimum.at(local_parent, high[merging], low[merging])
+            while True:
+                grandparent = local_parent[local_parent]
+                if np.array_equal(grandparent, local_parent):
+                    break
+                local_parent = grandparent
+            local_sources, local_targets = local_sources[merging], local_targets[merging]
+        parent[roots] = roots[local_parent]
+
+    # Roots are numbered in node order, which is the order of the first node of every component
+    selected = np.flatnonzero(mask)
+    roots = _find_roots(parent, selected)
+    numbering = np.cumsum(roots == selected, dtype=np.int32) - 1
+    labels = np.full(nodes, -1, dtype=np.int32)
+    labels[selected] = numbering[np.searchsorted(selected, roots)]
+    return labels
@@ -0,0 +1,409 @@
+from itertools import combinations, permutations
+from math import comb
+
+import numpy as np
+
+
+def numerator_dtype(num_division: int) -> np.dtype:
+    """
+    Smallest unsigned integer dtype able to hold composition numerators up to ``num_division``.
+
+    Parameters:
+        num_division (int): Number of divisions (denominator) of the composition grid.
+
+    Returns:
+        np.dtype: ``uint8``, ``uint16`` or ``uint32``.
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if num_division <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"Number of divisions ({num_division}) is too large for an integer lattice.")
+
+
+def lattice_size(dimension: int, num_division: int) -> int:
+    """
+    Number of points of the integer simplex lattice, i.e. C(ndiv + dim - 1, dim - 1).
+    """
+    return comb(num_division + dimension - 1, dimension - 1)
+
+
+def limit_bounds(num_division: int, limits: list) -> tuple:
+    """
+    Integer numerator bounds of per-element ``[min, max]`` mole fraction limits.
+
+    Limits are snapped to the lattice with a small tolerance, so that e.g. a maximum of 0.29 with 100
+    divisions allows 29 divisions despite 0.29 * 100 rounding to 28.999999999999996.
+
+    Returns:
+        tuple: ``(lower, upper)`` int64 arrays, one bound per element.
+    """
+    bounds = np.asarray(limits, dtype=np.float64) * num_division
+    if bounds.ndim != 2 or bounds.shape[1] != 2:
+        raise ValueError("Limits must be one [min, max] pair per element.")
+    lower = np.maximum(np.ceil(bounds[:, 0] - 1e-9), 0).astype(np.int64)
+    upper = np.minimum(np.floor(bounds[:, 1] + 1e-9), num_division).astype(np.int64)
+    return lower, upper
+
+
+def within_limits(numerators: np.ndarray, num_division: int, limits: list, chunksize: int = 1_000_000) -> np.ndarray:
+    """
+    Mask of the compositions whose every element lies within its ``[min, max]`` mole fraction limits.
+
+    Compares integer numerators with the bounds of ``limit_bounds`` (no float division), ``chunksize``
+    rows at a time so that memory-mapped inputs are only paged in once.
+    """
+    lower, upper = limit_bounds(num_division, limits)
+    if len(lower) != numerators.shape[1]:
+        raise ValueError(f"Expected {numerators.shape[1]} limits, got {len(lower)}.")
+    mask = np.empty(len(numerators), dtype=bool)
+    for start in range(0, len(numerators), chunksize):
+        block = np.asarray(numerators[start:start + chunksize])
+        mask[start:start + len(block)] = ((block >= lower) & (block <= upper)).all(axis=1)
+    return mask
+
+
+def bounded_lattice_size(num_division: int, lower: np.ndarray, upper: np.ndarray) -> int:
+    """
+    Number of lattice compositions whose numerators all lie within ``[lower, upper]``, counted without
+    enumerating them (one prefix-sum convolution per element).
+
+    Parameters:
+        num_division (int): Number of divisions; every composition sums to this value.
+        lower (np.ndarray): Minimum numerator of each element, e.g. from ``limit_bounds``.
+        upper (np.ndarray): Maximum numerator of each element.
+
+    Returns:
+        int: Number of compositions, exact for any size.
+    """
+    # counts[s]: number of ways the elements seen so far sum to s (Python ints, no overflow)
+    counts = [1] + [0] * num_division
+    for lo, hi in zip(np.asarray(lower).tolist(), np.asarray(upper).tolist()):
+        prefix = [0]
+        for count in counts:
+            prefix.append(prefix[-1] + count)
+        counts = [prefix[max(total - lo + 1, 0)] - prefix[max(total - hi, 0)] for total in range(num_division + 1)]
+    return counts[num_division]
+
+
+def linear_minimum(coefficients: np.ndarray, lower: np.ndarray, upper: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """
+    Smallest value of ``coefficients @ x`` over the integer rows ``x`` within ``[lower, upper]`` that sum
+    to each of ``totals``.
+
+    Starting from ``lower``, the divisions left are given to the cheapest elements first, which is
+    optimal for a single linear objective and already integral, so the minimum is a piecewise linear
+    function of the total.
+
+    Parameters:
+        coefficients (np.ndarray): Objective coefficient of each element.
+        lower (np.ndarray): Minimum numerator of each element.
+        upper (np.ndarray): Maximum numerator of each element.
+        totals (np.ndarray): Sums of the rows; totals out of reach give ``inf``.
+
+    Returns:
+        np.ndarray: float64 minimum for every total.
+    """
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    order = np.argsort(coefficients, kind="stable")
+    capacity = (upper - lower)[order]
+    breaks = np.concatenate([[0], np.cumsum(capacity)])
+    costs = np.concatenate([[0.0], np.cumsum(capacity * coefficients[order])])
+    spare = np.asarray(totals, dtype=np.int64) - lower.sum()
+    keep = np.concatenate([[True], capacity > 0])
+    minimum = coefficients @ lower + np.interp(spare, breaks[keep], costs[keep])
+    return np.where((spare < 0) | (spare > breaks[-1]), np.inf, minimum)
+
+
+def bounded_lattice(num_division: int, lower: np.ndarray, upper: np.ndarray, dtype=None,
+                    coefficients: np.ndarray = None, rhs: np.ndarray = None) -> np.ndarray:
+    """
+    Enumerate the lattice compositions whose numerators all lie within ``[lower, upper]`` and, if
+    given, satisfy the linear constraints ``coefficients @ numerators <= rhs``.
+
+    Rows are grown one element at a time, and each partial row only takes the values that still leave
+    a reachable sum for the remaining elements. With constraints, a partial row is also dropped as soon
+    as one constraint cannot hold for any completion (its smallest value over the completions, see
+    ``linear_minimum``, exceeds the right-hand side), so infeasible branches are never grown. Rows are
+    in ascending lexicographic order, like ``simplex_lattice``.
+
+    Parameters:
+        num_division (int): Number of divisions; every row sums to this value.
+        lower (np.ndarray): Minimum numerator of each element, e.g. from ``limit_bounds``.
+        upper (np.ndarray): Maximum numerator of each element.
+        dtype: Integer dtype of the output. Defaults to the smallest unsigned type holding ``num_division``.
+        coefficients (np.ndarray): Constraint matrix on the numerators, shape (constraints, elements).
+        rhs (np.ndarray): Right-hand side of each constraint, in numerator units.
+
+    Returns:
+        np.ndarray: Array of shape (rows, elements) of composition numerators; without constraints,
+                    ``bounded_lattice_size`` rows.
+    """
+    lower = np.maximum(np.asarray(lower, dtype=np.int64), 0)
+    upper = np.minimum(np.asarray(upper, dtype=np.int64), num_division)
+    if lower.shape != upper.shape or lower.ndim != 1 or not len(lower):
+        raise ValueError("Expected one lower and one upper bound per element.")
+    dtype = numerator_dtype(num_division) if dtype is None else np.dtype(dtype)
+    coefficients = np.zeros((0, len(lower))) if coefficients is None else np.asarray(coefficients, dtype=np.float64)
+    rhs = np.zeros(0) if rhs is None else np.asarray(rhs, dtype=np.float64)
+    if coefficients.shape != (len(rhs), len(lower)):
+        raise ValueError("Expected one coefficient per element and one right-hand side per constraint.")
+    # Smallest and largest sums the elements after each position can still add
+    rest_lower = np.concatenate([np.cumsum(lower[::-1])[::-1][1:], [0]])
+    rest_upper = np.concatenate([np.cumsum(upper[::-1])[::-1][1:], [0]])
+    totals = np.arange(num_division + 1)
+    # Grow a tree of partial rows, keeping the value and the parent of every node of each level
+    sums = np.zeros(1, dtype=np.int64)
+    partial = np.zeros((1, len(rhs)))
+    levels = []
+    for j in range(len(lower)):
+        first = np.maximum(lower[j], num_division - sums - rest_upper[j])
+        last = np.minimum(upper[j], num_division - sums - rest_lower[j])
+        counts = np.maximum(last - first + 1, 0)
+        parent = np.repeat(np.arange(len(sums)), counts)
+        # Position of every child among the children of its parent
+        rank = np.arange(len(parent)) - np.repeat(np.cumsum(counts) - counts, counts)
+        values = first[parent] + rank
+        sums = sums[parent] + values
+        if len(rhs):
+            partial = partial[parent] + values[:, None] * coefficients[:, j]
+            # Best completion of every constraint by the remaining elements, for each remaining sum
+            rest = slice(j + 1, len(lower))
+            best = np.stack([linear_minimum(row[rest], lower[rest], upper[rest], totals) for row in coefficients], axis=1)
+            feasible = (partial + best[num_division - sums] <= rhs).all(axis=1)
+            values, parent, sums, partial = values[feasible], parent[feasible], sums[feasible], partial[feasible]
+        levels.append((values, parent))
+
+    # Walk back from the leaves to fill the columns
+    out = np.empty((len(sums), len(lower)), dtype=dtype)
+    node = np.arange(len(sums))
+    for j in range(len(lower) - 1, -1, -1):
+        values, parent = levels[j]
+        out[:, j] = values[node]
+        node = parent[node]
+    return out
+
+
+def transfer_moves(dimension: int) -> np.ndarray:
+    """
+    Steps between neighboring lattice compositions: one division moved from element ``i`` to element
+    ``j``, for every ordered pair (the edges of nimplex graphs).
+
+    Returns:
+        np.ndarray: int64 array of shape (dimension * (dimension - 1), dimension).
+    """
+    pairs = np.array(list(permutations(range(dimension), 2)), dtype=np.int64).reshape(-1, 2)
+    moves = np.zeros((len(pairs), dimension), dtype=np.int64)
+    moves[np.arange(len(pairs)), pairs[:, 0]] = -1
+    moves[np.arange(len(pairs)), pairs[:, 1]] = 1
+    return moves
+
+
+def row_keys(numerators: np.ndarray) -> np.ndarray:
+    """
+    One fixed-size byte string (``np.void``) per numerator row, so that rows can be sorted, searched
+    and deduplicated like scalars with ``np.sort``, ``np.searchsorted``, ``np.isin`` or ``np.unique``.
+
+    Keys only compare equal for rows of the same dtype.
+    """
+    rows = np.ascontiguousarray(numerators)
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+
+def simplex_lattice(dimension: int, num_division: int, dtype=None) -> np.ndarray:
+    """
+    Enumerate every integer composition of ``num_division`` into ``dimension`` non-negative parts.
+
+    The lattice is built column by column with NumPy (stars-and-bars recursion) directly into
+    preallocated arrays, so no candidate tuples are ever generated and rejected. Rows are in
+    ascending lexicographic order, the same order nimplex uses for its grids, and include the
+    pure-element corners.
+
+    Parameters:
+        dimension (int): Number of components.
+        num_division (int): Number of divisions; every row sums to this value.
+        dtype: Integer dtype of the output. Defaults to the smallest unsigned type holding ``num_division``.
+
+    Returns:
+        np.ndarray: Array of shape (C(ndiv + dim - 1, dim - 1), dimension) of composition numerators.
+                    Divide by ``num_division`` to obtain fractions.
+    """
+    if dimension <= 0:
+        raise ValueError("Dimension must be a positive integer.")
+    if num_division < 0:
+        raise ValueError("Number of divisions must be a non-negative integer.")
+
+    dtype = numerator_dtype(num_division) if dtype is None else np.dtype(dtype)
+    out = np.empty((lattice_size(dimension, num_division), dimension), dtype=dtype)
+    if dimension == 1:
+        out[0, 0] = num_division
+        return out
+
+    # `tail` holds all (c)-tuples with sum <= ndiv, grouped by descending sum and in lexicographic
+    # order inside each group. The tuples summing to m with one more leading column are then the
+    # contiguous suffix of `tail` whose sums are <= m, prefixed with m - sum.
+    tail = np.arange(num_division, -1, -1, dtype=dtype)[:, None]
+    sums = tail[:, 0].astype(np.int64)
+    for c in range(2, dimension):
+        size = comb(num_division + c, c)
+        new_tail = np.empty((size, c), dtype=dtype)
+        new_sums = np.empty(size, dtype=np.int64)
+        row = 0
+        for m in range(num_division, -1, -1):
+            start = len(tail) - comb(m + c - 1, c - 1)
+            block = len(tail) - start
+            new_tail[row:row + block, 0] = m - sums[start:]
+            new_tail[row:row + block, 1:] = tail[start:]
+            new_sums[row:row + block] = m
+            row += block
+        tail, sums = new_tail, new_sums
+
+    out[:, 0] = num_division - sums
+    out[:, 1:] = tail
+    return out
+
+
+def simplex_lattice_fractional(dimension: int, num_division: int) -> np.ndarray:
+    """
+    Same as ``simplex_lattice`` but returns float64 fractions summing to 1.
+    """
+    return simplex_lattice(dimension, num_division) / num_division
+
+
+def interior_lattice(dimension: int, num_division: int, dtype=None) -> np.ndarray:
+    """
+    Enumerate the lattice points with every component strictly positive (the open face of the simplex).
+
+    Parameters:
+        dimension (int): Number of components.
+        num_division (int): Number of divisions; every row sums to this value.
+        dtype: Integer dtype of the output. Defaults to the smallest unsigned type holding ``num_division``.
+
+    Returns:
+        np.ndarray: Array of shape (C(ndiv - 1, dim - 1), dimension) of composition numerators.
+    """
+    dtype = numerator_dtype(num_division) if dtype is None else np.dtype(dtype)
+    if num_division < dimension:
+        return np.empty((0, dimension), dtype=dtype)
+    points = simplex_lattice(dimension, num_division - dimension, dtype=dtype)
+    points += 1
+    return points
+
+
+def subsystem_supports(num_elements: int, order: int) -> list:
+    """
+    Assign every face of the element subsystems to exactly one subsystem.
+
+    A face (set of elements with non-zero fraction) of size s <= ``order`` is contained in many
+    subsystems. It is owned by the lexicographically first subsystem containing it, which is the
+    face completed with the smallest element indices not already in it.
+
+    Parameters:
+        num_elements (int): Number of elements in the full element list.
+        order (int): Number of elements per subsystem, e.g. 5 for quinaries.
+
+    Returns:
+        list: ``(subsystem, faces)`` pairs in ``itertools.combinations`` order, where ``subsystem`` is a
+              tuple of element indices and ``faces`` the list of index tuples it owns.
+    """
+    if order <= 0 or num_elements <= 0:
+        raise ValueError("Number of elements and subsystem order must be positive integers.")
+    order = min(order, num_elements)
+
+    result = []
+    for subsystem in combinations(range(num_elements), order):
+        faces = []
+        for size in range(1, order + 1):
+            for face in combinations(subsystem, size):
+                missing = [i for i in range(num_elements) if i not in face][:order - size]
+                if tuple(sorted(face + tuple(missing))) == subsystem:
+                    faces.append(face)
+        result.append((subsystem, faces))
+    return result
+
+
+def multi_system_size(num_elements: int, order: int, num_division: int) -> int:
+    """
+    Number of unique compositions in the union of all ``order``-element subsystem lattices.
+    """
+    order = min(order, num_elements)
+    return sum(
+        comb(num_elements, size) * comb(num_division - 1, size - 1)
+        for size in range(1, min(order, num_division) + 1)
+    )
+
+
+def iter_multi_system_lattice(num_elements: int, order: int, num_division: int, chunksize: int = 1_000_000, dtype=None,
+                              constraints=None):
+    """
+    Stream the multi-system composition space subsystem by subsystem.
+
+    Each face is emitted once, by the subsystem that owns it (see ``subsystem_supports``), so the
+    stream contains no duplicates and needs no deduplication pass.
+
+    Parameters:
+        num_elements (int): Number of elements in the full element list.
+        order (int): Number of elements per subsystem.
+        num_division (int): Number of divisions of the composition grid.
+        chunksize (int): Maximum number of rows per yielded chunk.
+        dtype: Integer dtype of the numerators. Defaults to the smallest unsigned type holding ``num_division``.
+        constraints (constraints.LinearConstraints): If given, every face is enumerated by
+                                                     ``constraints.lattice``, so compositions violating
+                                                     them are never generated.
+
+    Yields:
+        tuple: ``(subsystem, numerators)`` where ``numerators`` has shape (rows, num_elements).
+    """
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    dtype = numerator_dtype(num_division) if dtype is None else np.dtype(dtype)
+    interiors = {}
+    for subsystem, faces in subsystem_supports(num_elements, order):
+        for face in faces:
+            if constraints is not None:
+                interior = constraints.lattice(num_division, columns=face, dtype=dtype)
+            else:
+                if len(face) not in interiors:
+                    interiors[len(face)] = interior_lattice(len(face), num_division, dtype=dtype)
+                interior = interiors[len(face)]
+            for start in range(0, len(interior), chunksize):
+                block = interior[start:start + chunksize]
+                chunk = np.zeros((len(block), num_elements), dtype=dtype)
+                chunk[:, face] = block
+                yield subsystem, chunk
+
+
+def multi_system_lattice(num_elements: int, order: int, num_division: int, dtype=None, constraints=None) -> np.ndarray:
+    """
+    Build the union of all ``order``-element subsystem lattices as one integer numerator matrix.
+
+    Each subsystem's faces are written into a single preallocated matrix with exactly one row per
+    unique composition, so memory and time are linear in the size of the result.
+
+    Parameters:
+        num_elements (int): Number of elements in the full element list.
+        order (int): Number of elements per subsystem, e.g. 5 for quinaries.
+        num_division (int): Number of divisions of the composition grid.
+        dtype: Integer dtype of the numerators. Defaults to the smallest unsigned type holding ``num_division``.
+        constraints (constraints.LinearConstraints): If given, only the compositions satisfying them
+                                                     are enumerated (see ``iter_multi_system_lattice``).
+
+    Returns:
+        np.ndarray: Array of shape (multi_system_size(...), num_elements) of composition numerators,
+                    grouped by owning subsystem; fewer rows with ``constraints``.
+    """
+    dtype = numerator_dtype(num_division) if dtype is None else np.dtype(dtype)
+    if constraints is not None:
+        chunks = [chunk for _, chunk in iter_multi_system_lattice(
+            num_elements, order, num_division, dtype=dtype, constraints=constraints)]
+        return np.concatenate([np.empty((0, num_elements), dtype=dtype)] + chunks)
+    out = np.zeros((multi_system_size(num_elements, order, num_division), num_elements), dtype=dtype)
+    interiors = {}
+    row = 0
+    for _, faces in subsystem_supports(num_elements, order):
+        for face in faces:
+            if len(face) not in interiors:
+                interiors[len(face)] = interior_lattice(len(face), num_division, dtype=dtype)
+            interior = interiors[len(face)]
+            out[row:row + len(interior), face] = interior
+            row += len(interior)
+    return out
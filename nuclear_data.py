@@ -0,0 +1,122 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Versioned property data file shipped with the repository
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nuclear_properties.json")
+DATA_VERSION = 1
+
+
+class PropertyDatabase:
+    """
+    Nuclear property basis of a set of elements, with cached per-subset slices.
+
+    The activation (3), gamma (2) and heat (2) metrics of every element are stored as one
+    (elements, 7) basis matrix, so the properties of a block of mole fractions are a single matmul
+    ``fractions @ basis(elements)`` and feasibility a single comparison with ``limits``. Slices for an
+    element subset are built once and reused, which matters when hundreds of subsystems are screened.
+
+    Parameters:
+        elements (list): Element symbols, one per basis row.
+        basis (np.ndarray): Property basis, shape (elements, 7).
+        limits (np.ndarray): Limit of each metric, shape (7,).
+        columns (list): Names of the 7 metrics.
+        groups (dict): Number of activation, gamma and heat metrics, in basis column order.
+        name (str): Dataset name.
+    """
+
+    def __init__(
+        self,
+        elements: list,
+        basis: np.ndarray,
+        limits: np.ndarray,
+        columns: list,
+        groups: dict = None,
+        name: str = "",
+    ):
+        basis = np.array(basis, dtype=np.float64)
+        limits = np.array(limits, dtype=np.float64)
+        groups = dict(groups or {"activation": 3, "gamma": 2, "heat": 2})
+        if basis.shape != (len(elements), len(columns)):
+            raise ValueError(f"Basis must have shape ({len(elements)}, {len(columns)}), got {basis.shape}.")
+        if limits.shape != (len(columns),) or sum(groups.values()) != len(columns):
+            raise ValueError(f"Expected {len(columns)} limits and metric groups covering every column.")
+        basis.flags.writeable = False
+        limits.flags.writeable = False
+        self.elements = list(elements)
+        self.basis_matrix = basis
+        self.limits = limits
+        self.columns = list(columns)
+        self.groups = groups
+        self.name = name
+        self._cache = {}
+
+    @classmethod
+    def load(cls, dataset: str = "unified", path: str = DATA_FILE) -> "PropertyDatabase":
+        """
+        Load one dataset of a property data file (see ``data/nuclear_properties.json``).
+
+        Raises:
+            ValueError: If the file version is not supported or the dataset does not exist.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != DATA_VERSION:
+            raise ValueError(f"Unsupported property data version {data.get('version')}, expected {DATA_VERSION}.")
+        if dataset not in data["datasets"]:
+            raise ValueError(f"Unknown property dataset '{dataset}', expected one of {list(data['datasets'])}.")
+        entry = data["datasets"][dataset]
+        elements = data["elements"]
+        basis = [entry["properties"][e] for e in elements]
+        return cls(elements, basis, entry["limits"], entry["columns"], data["groups"], dataset)
+
+    def indices(self, elements: list = None) -> list:
+        """
+        Basis rows of ``elements`` (all elements if None).
+        """
+        if elements is None:
+            return list(range(len(self.elements)))
+        missing = [e for e in elements if e not in self.elements]
+        if missing:
+            raise ValueError(f"No nuclear property data for {missing}.")
+        return [self.elements.index(e) for e in elements]
+
+    def basis(self, elements: list = None) -> np.ndarray:
+        """
+        Read-only (len(elements), 7) property basis of ``elements``, cached per subset.
+        """
+        key = None if elements is None else tuple(elements)
+        if key not in self._cache:
+            matrix = self.basis_matrix[self.indices(elements)]
+            matrix.flags.writeable = False
+            self._cache[key] = matrix
+        return self._cache[key]
+
+    def split(self, array: np.ndarray) -> tuple:
+        """
+        Split the last axis of a 7-metric array into its ``(activation, gamma, heat)`` column blocks.
+        """
+        bounds = np.cumsum(list(self.groups.values()))[:-1]
+        return tuple(np.split(array, bounds, axis=-1))
+
+    def tables(self, elements: list = None) -> tuple:
+        """
+        ``(activation, gamma, heat)`` property tables of ``elements``, as used by ``screening.py``.
+        """
+        return self.split(self.basis(elements))
+
+    def limit_tables(self) -> tuple:
+        """
+        ``(activation_limit, gamma_limit, heat_limit)`` arrays, as used by ``screening.py``.
+        """
+        return self.split(self.limits)
+
+
+@lru_cache(maxsize=None)
+def load_database(dataset: str = "unified", path: str = DATA_FILE) -> PropertyDatabase:
+    """
+    Load a property dataset once per process; later calls return the same cached ``PropertyDatabase``.
+    """
+    return PropertyDatabase.load(dataset, path)
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+from math import comb
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from compositions import Compositions
+from lattice import interior_lattice, numerator_dtype, subsystem_supports
+from pruning import iter_pruned_face
+from screening import ScoreKernel, screen_compositions
+
+# Per-process state set up once by `_init_worker`, so tasks only carry faces and prefixes
+_worker = {}
+
+
+def face_tasks(num_elements: int, order: int, num_division: int, task_rows: int = 200_000) -> list:
+    """
+    Split the multi-system composition space into independent tasks, in output order.
+
+    Faces owned by a subsystem (see ``lattice.subsystem_supports``) with more than ``task_rows``
+    compositions are split on the numerator of their first element, so large subsystems are spread
+    over several workers; consecutive small regions are grouped so that each task holds about
+    ``task_rows`` compositions. Taken in order, the tasks visit the compositions in the same order
+    as ``lattice.iter_multi_system_lattice``.
+
+    Returns:
+        list: Tasks, each a list of ``(face, prefix)`` regions, where ``prefix`` fixes the numerators
+              of the first face elements.
+    """
+    if task_rows <= 0:
+        raise ValueError("Task size must be a positive integer.")
+    regions = []
+    for _, faces in subsystem_supports(num_elements, order):
+        for face in faces:
+            size = len(face)
+            if size == 1 or comb(num_division - 1, size - 1) <= task_rows:
+                regions.append((face, (), comb(num_division - 1, size - 1)))
+            else:
+                regions.extend(
+                    (face, (value,), comb(num_division - value - 1, size - 2))
+                    for value in range(1, num_division - size + 2)
+                )
+
+    tasks, task, rows = [], [], 0
+    for face, prefix, count in regions:
+        task.append((face, prefix))
+        rows += count
+        if rows >= task_rows:
+            tasks.append(task)
+            task, rows = [], 0
+    if task:
+        tasks.append(task)
+    return tasks
+
+
+def _init_worker(shm_name: str, layout: list, settings: dict, untrack: bool):
+    shm = SharedMemory(name=shm_name)
+    if untrack:
+        # Spawned workers register the segment with their own resource tracker, which would
+        # unlink it when they exit; the parent process owns it.
+        resource_tracker.unregister(shm._name, "shared_memory")
+    buffer = np.ndarray((sum(rows * cols for rows, cols in layout),), dtype=np.float64, buffer=shm.buf)
+    arrays, offset = [], 0
+    for rows, cols in layout:
+        arrays.append(buffer[offset:offset + rows * cols].reshape(rows, cols))
+        offset += rows * cols
+    activation_used, gamma_used, heat_used, activation_limit, gamma_limit, heat_limit = arrays
+    properties = np.concatenate([activation_used, gamma_used, heat_used], axis=1)
+    _worker.update(
+        settings,
+        shm=shm,
+        kernel=ScoreKernel.from_tables(
+            activation_used, gamma_used, heat_used, activation_limit[0], gamma_limit[0], heat_limit[0]
+        ),
+        # Pruning bounds follow the lattice columns
+        properties=properties[[settings["kernel_elements"].index(e) for e in settings["elements"]]],
+        limits=np.concatenate([activation_limit[0], gamma_limit[0], heat_limit[0]]),
+    )
+
+
+def _screen_task(task: list) -> tuple:
+    elements = _worker["elements"]
+    num_division = _worker["num_division"]
+    dtype = numerator_dtype(num_division)
+
+    stats, blocks = {}, []
+    for face, prefix in task:
+        if _worker["prune"]:
+            face_blocks = list(iter_pruned_face(
+                _worker["properties"][list(face)], _worker["limits"], num_division, stats=stats, prefix=prefix
+            ))
+        else:
+            free = interior_lattice(len(face) - len(prefix), num_division - sum(prefix), dtype=dtype)
+            block = np.empty((len(free), len(face)), dtype=dtype)
+            block[:, :len(prefix)] = prefix
+            block[:, len(prefix):] = free
+            face_blocks = [block]
+        for block in face_blocks:
+            chunk = np.zeros((len(block), len(elements)), dtype=dtype)
+            chunk[:, face] = block
+            blocks.append(chunk)
+
+    numerators = np.concatenate(blocks) if blocks else np.zeros((0, len(elements)), dtype=dtype)
+    compositions = Compositions(numerators, num_division, elements)
+    screened = screen_compositions(compositions, _worker["kernel_elements"], _worker["kernel"])
+    return compositions if _worker["keep_generated"] else len(compositions), stats.get("pruned", 0), screened
+
+
+def iter_parallel_screened(
+    elements: list,
+    order: int,
+    num_division: int,
+    activation_used: np.ndarray,
+    gamma_used: np.ndarray,
+    heat_used: np.ndarray,
+    activation_limit: np.ndarray,
+    gamma_limit: np.ndarray,
+    heat_limit: np.ndarray,
+    workers: int = None,
+    prune: bool = False,
+    keep_generated: bool = False,
+    task_rows: int = 200_000,
+    kernel_elements: list = None,
+):
+    """
+    Screen the multi-system composition space on a process pool.
+
+    The property tables and limits are copied once into a shared-memory block that every worker maps
+    at start-up; tasks only carry faces and prefixes. Results are returned in task order, so writing
+    them as they arrive gives the same file as a serial run, whatever the number of workers.
+
+    Parameters:
+        elements (list): Element symbols, in lattice column order.
+        order (int): Number of elements per subsystem.
+        num_division (int): Number of divisions of the composition grid.
+        activation_used, gamma_used, heat_used (np.ndarray): Property rows of ``kernel_elements``.
+        activation_limit, gamma_limit, heat_limit (np.ndarray): Limits used for filtering and normalisation.
+        workers (int): Number of worker processes. If None, one per CPU.
+        prune (bool): Skip regions that provably fail a limit (see ``pruning.py``).
+        keep_generated (bool): Also return the numerators of every screened composition, e.g. for auditing.
+        task_rows (int): Approximate number of compositions per task.
+        kernel_elements (list): Order of the rows of the property tables, i.e. the order in which the
+                                element contributions are summed; ``elements`` if None.
+
+    Yields:
+        tuple: ``(generated, rows_pruned, screened)``, where ``generated`` is the ``Compositions`` of the
+               screened compositions if ``keep_generated`` is set and their count otherwise, and
+               ``screened`` the DataFrame of passing alloys.
+    """
+    workers = workers or os.cpu_count()
+    if workers <= 0:
+        raise ValueError("Number of workers must be a positive integer.")
+
+    arrays = [
+        np.asarray(a, dtype=np.float64).reshape(-1 if a.ndim == 2 else 1, a.shape[-1])
+        for a in (activation_used, gamma_used, heat_used, activation_limit, gamma_limit, heat_limit)
+    ]
+    layout = [a.shape for a in arrays]
+    shm = SharedMemory(create=True, size=sum(a.nbytes for a in arrays))
+    try:
+        np.ndarray((sum(a.size for a in arrays),), dtype=np.float64, buffer=shm.buf)[:] = np.concatenate(
+            [a.ravel() for a in arrays]
+        )
+        settings = {
+            "elements": list(elements),
+            "kernel_elements": list(elements if kernel_elements is None else kernel_elements),
+            "num_division": num_division,
+            "prune": prune,
+            "keep_generated": keep_generated,
+        }
+        tasks = face_tasks(len(elements), order, num_division, task_rows)
+        context = multiprocessing.get_context()
+        with context.Pool(
+            workers, _init_worker, (shm.name, layout, settings, context.get_start_method() != "fork")
+        ) as pool:
+            yield from pool.imap(_screen_task, tasks)
+    finally:
+        shm.close()
+        shm.unlink()
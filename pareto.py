@@ -0,0 +1,161 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Objectives of the nuclear screening: normalised activation, gamma and heat, all minimised
+PARETO_COLUMNS = ["Normalize_Activation", "Normalize_Gamma", "Normalize_Heat"]
+
+# Maximum number of pairwise comparisons held in memory per block
+BLOCK_ELEMENTS = 1 << 22
+
+
+def _dominated_by(candidates: np.ndarray, front: np.ndarray) -> np.ndarray:
+    """
+    Mask of ``candidates`` dominated by at least one row of ``front`` (minimisation).
+
+    ``front`` is scanned in growing blocks and only candidates not yet dominated are compared with
+    the next block, so when the strongest rows come first most candidates are settled by a few rows.
+    """
+    dominated = np.zeros(len(candidates), dtype=bool)
+    alive = np.arange(len(candidates))
+    start, step = 0, 8
+    while start < len(front) and len(alive):
+        block = front[start:start + step]
+        rest = candidates[alive]
+        # Objective by objective: reducing over a short last axis is much slower than element-wise passes
+        not_worse = block[:, :1] <= rest[:, 0]
+        better = block[:, :1] < rest[:, 0]
+        for j in range(1, candidates.shape[1]):
+            not_worse &= block[:, j:j + 1] <= rest[:, j]
+            better |= block[:, j:j + 1] < rest[:, j]
+        hit = (not_worse & better).any(axis=0)
+        dominated[alive[hit]] = True
+        alive = alive[~hit]
+        start += len(block)
+        step = max(1, min(2 * step, BLOCK_ELEMENTS // max(len(alive), 1)))
+    return dominated
+
+
+def pareto_mask(points: np.ndarray) -> np.ndarray:
+    """
+    Mask of the non-dominated rows of ``points``, every column being minimised.
+
+    A row is dominated if another row is lower or equal in every column and lower in at least one;
+    identical rows do not dominate each other. Rows are sorted first, so that a row can only be
+    dominated by rows before it: two objectives are then solved by a running minimum over the
+    lexicographic order in O(N log N), and more objectives by a sort-filter skyline over the order of
+    the objective sums, which compares each block of rows only with the front found so far and with
+    itself, never all N² pairs.
+
+    Parameters:
+        points (np.ndarray): Objective values, shape (rows, objectives).
+
+    Returns:
+        np.ndarray: Boolean mask, True for the rows on the Pareto front.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2:
+        raise ValueError(f"Objective values must have shape (rows, objectives), got {points.shape}.")
+    mask = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return mask
+    if points.shape[1] == 1:
+        return points[:, 0] == points[:, 0].min()
+
+    if points.shape[1] == 2:
+        # Sorted by the first objective, a row is on the front iff its second objective is below the
+        # minimum of every row with a lower first objective (equal rows tie)
+        order = np.lexsort(points.T[::-1])
+        ordered = points[order]
+        first, second = ordered[:, 0], ordered[:, 1]
+        best = np.minimum.accumulate(second)
+        previous = np.concatenate([[np.inf], best[:-1]])
+        # Rows sharing the first objective: only the lowest second objective can be non-dominated
+        group_start = np.concatenate([[True], first[1:] != first[:-1]])
+        group_best = np.minimum.reduceat(second, np.flatnonzero(group_start))[np.cumsum(group_start) - 1]
+        before_group = previous[np.flatnonzero(group_start)][np.cumsum(group_start) - 1]
+        mask[order] = (second == group_best) & (second < before_group)
+        return mask
+
+    # Sort-filter skyline: ordered by the sum of the objectives, a dominating row never comes after the
+    # row it dominates (rounded sums are monotonic; rows with equal sums stay in the same block and are
+    # compared with each other), and the strongest dominators are found first
+    sums = points.sum(axis=1)
+    order = np.argsort(sums, kind="stable")
+    ordered, sums = points[order], sums[order]
+    front = np.empty((0, points.shape[1]))
+    kept = []
+    start, step = 0, 128
+    while start < len(ordered):
+        # Small blocks first, while the front is still weak and blocks are compared with themselves
+        step = min(2 * step, 1 << 16)
+        stop = np.searchsorted(sums, sums[min(start + step, len(ordered)) - 1], side="right")
+        block = ordered[start:stop]
+        survivors = ~_dominated_by(block, front)
+        block_survivors = block[survivors]
+        survivors[survivors] = ~_dominated_by(block_survivors, block_survivors)
+        kept.append(start + np.flatnonzero(survivors))
+        front = np.concatenate([front, block[survivors]])
+        start = stop
+    mask[order[np.concatenate(kept)]] = True
+    return mask
+
+
+class ParetoFront:
+    """
+    Non-dominated rows of a stream of screened chunks, updated incrementally.
+
+    Each chunk is reduced to its own front, which is then merged with the front kept so far, so only
+    front rows are ever held in memory. The front is returned in arrival order.
+
+    Parameters:
+        columns (list): Objective columns.
+        maximize (list): Objective columns to maximise instead of minimise.
+    """
+
+    def __init__(self, columns: list = PARETO_COLUMNS, maximize: list = ()):
+        unknown = [c for c in maximize if c not in columns]
+        if unknown:
+            raise ValueError(f"Maximised columns {unknown} are not objectives.")
+        self.columns = list(columns)
+        self.signs = np.array([-1.0 if c in maximize else 1.0 for c in self.columns])
+        self.rows = 0
+        self._front = None
+
+    def objectives(self, df: "pd.DataFrame") -> np.ndarray:
+        """
+        Objective values of ``df``, with maximised columns negated.
+        """
+        return df[self.columns].to_numpy(dtype=np.float64) * self.signs
+
+    def update(self, df: "pd.DataFrame"):
+        """
+        Add a chunk of scored rows.
+        """
+        import pandas as pd
+        self.rows += len(df)
+        chunk = df[pareto_mask(self.objectives(df))]
+        front = chunk if self._front is None else pd.concat([self._front, chunk], ignore_index=True)
+        self._front = front[pareto_mask(self.objectives(front))].reset_index(drop=True)
+
+    def merge(self, other: "ParetoFront"):
+        """
+        Add the front of another selector, as if its chunks had arrived after this one's.
+        """
+        if other.columns != self.columns or not np.array_equal(other.signs, self.signs):
+            raise ValueError("Only fronts over the same objectives can be merged.")
+        if other._front is not None:
+            rows = self.rows
+            self.update(other._front)
+            self.rows = rows
+        self.rows += other.rows
+
+    def result(self) -> "pd.DataFrame":
+        """
+        Rows of the current Pareto front.
+        """
+        import pandas as pd
+        return pd.DataFrame(columns=self.columns) if self._front is None else self._front
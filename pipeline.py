@@ -0,0 +1,274 @@
+import argparse
+import time
+
+import numpy as np
+
+from compositions import Compositions
+from lattice import iter_multi_system_lattice, multi_system_size
+from parallel import iter_parallel_screened
+from pareto import ParetoFront
+from pruning import iter_pruned_multi_system_lattice
+from screening import (
+    ACTIVATION_DATA,
+    ACTIVATION_LIMIT,
+    GAMMA_DATA,
+    GAMMA_LIMIT,
+    HEAT_DATA,
+    HEAT_LIMIT,
+    MASTER_ELEMENTS,
+    PROPERTY_COLUMNS,
+    SCORE_COLUMNS,
+    ScoreKernel,
+    screen_compositions,
+)
+from selection import TopK
+from table_io import CompositionWriter, TableWriter, write_table
+
+
+def batched(chunks, chunksize: int):
+    """
+    Merge a stream of ``(subsystem, numerators)`` chunks into blocks of about ``chunksize`` rows.
+
+    Small faces (pure elements, binaries, ...) are merged into one block so that per-block overhead
+    is paid once per ``chunksize`` rows and not once per face.
+
+    Yields:
+        np.ndarray: Composition numerators, shape (rows, elements).
+    """
+    pending, pending_rows = [], 0
+    for _, chunk in chunks:
+        pending.append(chunk)
+        pending_rows += len(chunk)
+        if pending_rows >= chunksize:
+            yield np.concatenate(pending)
+            pending, pending_rows = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def generate_and_screen(
+    elements: list,
+    order: int,
+    num_division: int,
+    output_file: str = "filtered_nuclear_alloys.csv",
+    audit_file: str = None,
+    master_elements: list = MASTER_ELEMENTS,
+    activation_data: np.ndarray = ACTIVATION_DATA,
+    gamma_data: np.ndarray = GAMMA_DATA,
+    heat_data: np.ndarray = HEAT_DATA,
+    activation_limit: np.ndarray = ACTIVATION_LIMIT,
+    gamma_limit: np.ndarray = GAMMA_LIMIT,
+    heat_limit: np.ndarray = HEAT_LIMIT,
+    chunksize: int = 1_000_000,
+    prune: bool = False,
+    workers: int = 1,
+    top_k: int = None,
+    per_subsystem: bool = False,
+    pareto_file: str = None,
+    verbose: bool = True,
+) -> dict:
+    """
+    Enumerate the multi-system composition space and screen it in one pass.
+
+    Lattice chunks are fed straight into the property matmul and limit mask of unifiedAct.py, and only
+    the passing alloys are written, so the unfiltered composition CSV is never materialised.
+
+    Parameters:
+        elements (list): Element symbols; every element must be in ``master_elements``.
+        order (int): Number of elements per subsystem, e.g. 5 for quinaries.
+        num_division (int): Number of divisions of the composition grid, e.g. 20 for 5 at.% steps.
+        output_file (str): ``.csv`` or ``.parquet`` file receiving the passing alloys with their calculated columns.
+        audit_file (str): If given, every generated composition is also written to this ``.csv``, ``.parquet``
+                          or ``.npy`` file, as generate_compositions.py would have.
+        master_elements (list): Element order of the rows of the property tables.
+        activation_data, gamma_data, heat_data (np.ndarray): Property tables, one row per master element.
+        activation_limit, gamma_limit, heat_limit (np.ndarray): Limits used for filtering and normalisation.
+        chunksize (int): Number of compositions screened per chunk.
+        prune (bool): Skip lattice regions whose linear property bounds prove that every composition in
+                      them fails a limit (see ``pruning.py``). The output is unchanged; the audit file then
+                      only holds the compositions that were not pruned.
+        workers (int): Number of worker processes (see ``parallel.py``), or None for one per CPU. The
+                       output does not depend on it.
+        top_k (int): If given, only the ``top_k`` alloys with the lowest CombinedScore are written, best
+                     first, selected on the fly without sorting every passing alloy (see ``selection.py``).
+        per_subsystem (bool): With ``top_k``, keep the ``top_k`` best alloys of every subsystem.
+        pareto_file (str): If given, the passing alloys not dominated in normalised activation, gamma and
+                           heat are written to this ``.csv`` or ``.parquet`` file (see ``pareto.py``).
+        verbose (bool): Print throughput after every chunk.
+
+    Returns:
+        dict: ``rows_in`` (compositions screened), ``rows_pruned``, ``rows_out`` (alloys passing every limit),
+              ``seconds`` and ``rows_per_sec``.
+    """
+    if not all(isinstance(el, str) for el in elements):
+        raise ValueError("All elements must be strings representing element symbols.")
+    unknown = [el for el in elements if el not in master_elements]
+    if unknown:
+        raise ValueError(f"No nuclear property data for elements: {unknown}.")
+    if num_division <= 0:
+        raise ValueError("Number of divisions must be a positive integer.")
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    if top_k is not None and top_k <= 0:
+        raise ValueError("Number of selected alloys must be a positive integer.")
+    if workers is not None and workers <= 0:
+        raise ValueError("Number of workers must be a positive integer.")
+
+    # Scored in master element order, as by screen_file, so that both routes give the same bits
+    kernel_elements = sorted(elements, key=master_elements.index)
+    indices = [master_elements.index(e) for e in kernel_elements]
+    activation_used = activation_data[indices]
+    gamma_used = gamma_data[indices]
+    heat_used = heat_data[indices]
+
+    total = multi_system_size(len(elements), order, num_division)
+
+    tables = (activation_used, gamma_used, heat_used, activation_limit, gamma_limit, heat_limit)
+    prune_stats = {}
+    if workers != 1:
+        results = iter_parallel_screened(
+            elements, order, num_division, *tables,
+            kernel_elements=kernel_elements, workers=workers, prune=prune, keep_generated=bool(audit_file), task_rows=chunksize,
+        )
+    else:
+        if prune:
+            properties = np.concatenate([activation_used, gamma_used, heat_used], axis=1)
+            properties = properties[[kernel_elements.index(e) for e in elements]]
+            limits = np.concatenate([activation_limit, gamma_limit, heat_limit])
+            chunks = iter_pruned_multi_system_lattice(properties, limits, order, num_division, chunksize, prune_stats)
+        else:
+            chunks = iter_multi_system_lattice(len(elements), order, num_division, chunksize)
+        blocks = (Compositions(numerators, num_division, elements) for numerators in batched(chunks, chunksize))
+        kernel = ScoreKernel.from_tables(*tables)
+        results = ((block, 0, screen_compositions(block, kernel_elements, kernel)) for block in blocks)
+
+    tic = time.time()
+    rows_in = rows_out = rows_pruned = 0
+    writer = TableWriter(output_file, elements + PROPERTY_COLUMNS + SCORE_COLUMNS)
+    audit = CompositionWriter(audit_file, elements, num_division) if audit_file else None
+    selector = TopK(top_k, subsystem_columns=elements if per_subsystem else None) if top_k else None
+    front = ParetoFront() if pareto_file else None
+    try:
+        for generated, pruned, chunk in results:
+            if audit:
+                audit.write(generated)
+            if selector:
+                selector.update(chunk)
+            else:
+                writer.write(chunk)
+            if front:
+                front.update(chunk)
+
+            rows_in += generated if isinstance(generated, int) else len(generated)
+            rows_pruned += pruned
+            rows_out += len(chunk)
+            if verbose:
+                elapsed = time.time() - tic
+                done = rows_in + rows_pruned + prune_stats.get("pruned", 0)
+                print(f"{done / total * 100:.1f}% | {rows_in} generated | {rows_out} kept | "
+                      f"{rows_in / max(elapsed, 1e-9):,.0f} rows/s")
+        if selector:
+            writer.write(selector.result())
+        if front:
+            write_table(front.result(), pareto_file)
+    finally:
+        writer.close()
+        if audit:
+            audit.close()
+
+    seconds = time.time() - tic
+    return {
+        "rows_in": rows_in,
+        "rows_pruned": rows_pruned + prune_stats.get("pruned", 0),
+        "rows_out": rows_out,
+        "seconds": seconds,
+        "rows_per_sec": rows_in / max(seconds, 1e-9),
+    }
+
+
+def main(argv: list = None, prog: str = None):
+    """
+    Generate and screen a composition space from the command line (``python cli.py pipeline``).
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Generate the multi-system composition space and screen it against the nuclear limits in one pass."
+    )
+    parser.add_argument(
+        "elements",
+        nargs="+",
+        help="List of element symbols",
+    )
+    parser.add_argument(
+        "--order",
+        type=int,
+        default=5,
+        help="Number of elements per subsystem (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--ndiv",
+        type=int,
+        default=20,
+        help="Number of divisions of the composition grid (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        default="filtered_nuclear_alloys.csv",
+        help="CSV or Parquet file receiving the alloys passing every limit (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--audit",
+        default=None,
+        help="Also write every generated composition to this CSV, Parquet or NPY file",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=1_000_000,
+        help="Number of compositions screened per chunk (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Skip composition regions that provably fail a limit instead of enumerating them",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes screening subsystems in parallel (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=None,
+        help="Only write the K alloys with the lowest CombinedScore, best first",
+    )
+    parser.add_argument(
+        "--per-subsystem",
+        action="store_true",
+        help="With --top-k, keep the K best alloys of every subsystem",
+    )
+    parser.add_argument(
+        "--pareto",
+        default=None,
+        help="Also write the alloys not dominated in normalised activation, gamma and heat to this file",
+    )
+    args = parser.parse_args(argv)
+
+    stats = generate_and_screen(
+        args.elements, args.order, args.ndiv, args.output, args.audit, chunksize=args.chunksize, prune=args.prune,
+        workers=args.workers, top_k=args.top_k, per_subsystem=args.per_subsystem,
+        pareto_file=args.pareto,
+    )
+    if args.prune:
+        print(f"Pruned {stats['rows_pruned']} alloys without enumerating them")
+    print(f"Kept {stats['rows_out']} of {stats['rows_in']} alloys in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s)")
+    print(f"Results saved to {args.output}")
+    if args.pareto:
+        print(f"Pareto front saved to {args.pareto}")
+
+
+if __name__ == "__main__":
+    main()
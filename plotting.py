@@ -0,0 +1,302 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+import profiling
+
+# Above this many alloys, panels are rasterised by binning instead of drawing one marker per alloy
+MAX_SCATTER_POINTS = 200_000
+
+# Value aggregated over the alloys falling into the same pixel
+REDUCTIONS = ("mean", "min", "max", "count")
+
+
+def polygon_vertices(num_elements: int) -> np.ndarray:
+    """
+    Vertices of the regular polygon used to project compositions, one per element, shape (elements, 2).
+    """
+    angles = np.linspace(0, 2 * np.pi, num_elements, endpoint=False)
+    return np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+
+def project(compositions: np.ndarray, vertices: np.ndarray) -> tuple:
+    """
+    Project compositions onto the polygon plane with a single matmul.
+
+    Rows are normalised to sum to 1 first; rows summing to 0 cannot be projected and are dropped.
+
+    Parameters:
+        compositions (np.ndarray): Mole fractions (or any non-negative amounts), shape (rows, elements).
+        vertices (np.ndarray): Polygon vertices, shape (elements, 2).
+
+    Returns:
+        tuple: ``(coords, kept)``, the (kept rows, 2) projected coordinates and the boolean mask of the
+               rows that were projected.
+    """
+    compositions = np.asarray(compositions, dtype=np.float64)
+    totals = compositions.sum(axis=1)
+    kept = totals != 0
+    return (compositions[kept] / totals[kept, None]) @ vertices, kept
+
+
+def pixel_indices(coords: np.ndarray, bins: int = 500, extent: tuple = (-1.0, 1.0, -1.0, 1.0)) -> np.ndarray:
+    """
+    Flat index (``row * bins + column``) of the pixel of every point on a ``bins`` x ``bins`` grid.
+    """
+    xmin, xmax, ymin, ymax = extent
+    column = np.clip(((coords[:, 0] - xmin) / (xmax - xmin) * bins).astype(np.int64), 0, bins - 1)
+    row = np.clip(((coords[:, 1] - ymin) / (ymax - ymin) * bins).astype(np.int64), 0, bins - 1)
+    return row * bins + column
+
+
+def bin_values(
+    coords: np.ndarray,
+    values: np.ndarray,
+    bins: int = 500,
+    extent: tuple = (-1.0, 1.0, -1.0, 1.0),
+    reduce: str = "mean",
+    pixel: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Aggregate point values onto a ``bins`` x ``bins`` pixel grid.
+
+    Parameters:
+        coords (np.ndarray): Point coordinates, shape (points, 2).
+        values (np.ndarray): Value of every point.
+        bins (int): Number of pixels along each axis.
+        extent (tuple): ``(xmin, xmax, ymin, ymax)`` covered by the grid.
+        reduce (str): ``"mean"``, ``"min"``, ``"max"`` of the values in a pixel, or ``"count"`` of points.
+        pixel (np.ndarray): Precomputed ``pixel_indices`` of the points; ``coords`` is ignored if given.
+
+    Returns:
+        np.ndarray: Image of shape (bins, bins), row 0 at ``ymin``; empty pixels are NaN.
+    """
+    if reduce not in REDUCTIONS:
+        raise ValueError(f"Unknown reduction '{reduce}', expected one of {list(REDUCTIONS)}.")
+    if pixel is None:
+        pixel = pixel_indices(coords, bins, extent)
+
+    counts = np.bincount(pixel, minlength=bins * bins).astype(np.float64)
+    if reduce == "count":
+        image = counts
+    elif reduce == "mean":
+        image = np.bincount(pixel, weights=values, minlength=bins * bins) / np.where(counts > 0, counts, 1)
+    else:
+        image = np.full(bins * bins, np.inf if reduce == "min" else -np.inf)
+        (np.minimum if reduce == "min" else np.maximum).at(image, pixel, values)
+    image = np.where(counts > 0, image, np.nan)
+    return image.reshape(bins, bins)
+
+
+class Layout:
+    """
+    Projected point layout shared by all the property panels of a result set.
+
+    The geometry (polygon vertices, element labels, point positions and, for rasterised layouts, the
+    pixel of every point) is computed once; a panel only supplies the colour values of one property.
+
+    Parameters:
+        df (pd.DataFrame): Alloys with one column per element.
+        elements (list): Element columns, in polygon order.
+        bins (int): Pixels along each axis of rasterised layouts.
+        max_scatter_points (int): Largest number of alloys drawn as individual markers; larger result
+                                  sets are rasterised.
+    """
+
+    extent = (-1.0, 1.0, -1.0, 1.0)
+
+    def __init__(self, df, elements: list, bins: int = 500, max_scatter_points: int = MAX_SCATTER_POINTS):
+        self.elements = list(elements)
+        self.vertices = polygon_vertices(len(self.elements))
+        self.coords, self.kept = project(df[self.elements].to_numpy(), self.vertices)
+        self.bins = bins
+        self.rasterised = len(self.coords) > max_scatter_points
+        self.pixel = pixel_indices(self.coords, bins, self.extent) if self.rasterised else None
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def values(self, df, column: str, reduce: str = "mean") -> np.ndarray:
+        """
+        Colour values of ``column``: one per projected alloy, or a (bins, bins) image if rasterised.
+        """
+        values = df[column].to_numpy(dtype=np.float64)[self.kept]
+        if self.rasterised:
+            return bin_values(None, values, self.bins, self.extent, reduce, pixel=self.pixel)
+        return values
+
+
+def _draw_layout(ax, layout: Layout, style: dict):
+    """
+    Draw the points of ``layout`` (with placeholder colours), the polygon and the element labels on
+    ``ax``, and return the artist whose colour array is swapped for each property.
+    """
+    from matplotlib.colors import LinearSegmentedColormap
+
+    # Empty pixels (NaN) are transparent
+    cmap = LinearSegmentedColormap.from_list("custom", ["blue", "yellow", "red"]).with_extremes(bad=(0, 0, 0, 0))
+    if layout.rasterised:
+        mappable = ax.imshow(np.full((layout.bins, layout.bins), np.nan), origin="lower", extent=layout.extent,
+                             cmap=cmap, interpolation="nearest")
+    else:
+        mappable = ax.scatter(layout.coords[:, 0], layout.coords[:, 1], c=np.zeros(len(layout)), cmap=cmap,
+                              edgecolors="none", s=style["marker_size"], alpha=style["alpha"], rasterized=True)
+
+    vertices = layout.vertices
+    polygon = np.append(vertices, [vertices[0]], axis=0)
+    ax.plot(polygon[:, 0], polygon[:, 1], "k-", lw=1.5)
+    for (x, y), el in zip(vertices, layout.elements):
+        ax.text(x * style["label_offset"], y * style["label_offset"], el, ha="center", va="center",
+                fontsize=12, weight="bold")
+    ax.set_aspect("equal")
+    ax.axis("off")
+    return mappable
+
+
+def _set_values(mappable, values: np.ndarray, vmin: float, vmax: float):
+    # Images of rasterised layouts are replaced whole, scatter colours per point
+    if values.ndim == 2:
+        mappable.set_data(values)
+    else:
+        mappable.set_array(values)
+    mappable.set_clim(vmin, vmax)
+
+
+def _render_files(job: tuple) -> list:
+    # Figures are built without pyplot, so rendering never opens a window and is safe in worker processes
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    layout, panels, style = job
+    fig = Figure(figsize=(10, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    mappable = _draw_layout(ax, layout, style)
+    cbar = fig.colorbar(mappable, ax=ax)
+
+    # The geometry stays in place; each property only swaps the colours, the colour bar and the title
+    for panel in panels:
+        _set_values(mappable, panel["values"], panel["vmin"], panel["vmax"])
+        cbar.set_label(panel["name"], fontsize=12)
+        ax.set_title(panel["title"], fontsize=16, pad=20)
+        fig.savefig(panel["filename"], dpi=style["dpi"], bbox_inches="tight")
+    return [panel["filename"] for panel in panels]
+
+
+def _render_tiled(layout: Layout, panels: list, style: dict, filename: str) -> str:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    columns = int(np.ceil(np.sqrt(len(panels))))
+    rows = int(np.ceil(len(panels) / columns))
+    fig = Figure(figsize=(6 * columns, 6 * rows))
+    FigureCanvasAgg(fig)
+    axes = np.atleast_1d(fig.subplots(rows, columns)).ravel()
+    for ax, panel in zip(axes, panels):
+        mappable = _draw_layout(ax, layout, style)
+        _set_values(mappable, panel["values"], panel["vmin"], panel["vmax"])
+        fig.colorbar(mappable, ax=ax).set_label(panel["name"], fontsize=10)
+        ax.set_title(panel["title"], fontsize=12, pad=20)
+    for ax in axes[len(panels):]:
+        ax.axis("off")
+    fig.savefig(filename, dpi=style["dpi"], bbox_inches="tight")
+    return filename
+
+
+def _render(layout: Layout, tasks: list, style: dict, output_dir: str, suffix: str, workers: int, tiled: bool) -> list:
+    if tiled:
+        return [_render_tiled(layout, tasks, style, os.path.join(output_dir, f"properties{suffix}.png"))]
+
+    workers = workers or min(os.cpu_count(), len(tasks))
+    if workers <= 0:
+        raise ValueError("Number of workers must be a positive integer.")
+    workers = min(workers, len(tasks))
+    if workers == 1:
+        return _render_files((layout, tasks, style))
+    # Each worker draws the layout once and renders a contiguous share of the panels
+    shares = np.array_split(np.arange(len(tasks)), workers)
+    jobs = [(layout, [tasks[i] for i in share], style) for share in shares]
+    with multiprocessing.get_context().Pool(workers) as pool:
+        return [filename for filenames in pool.map(_render_files, jobs) for filename in filenames]
+
+
+def render_panels(
+    df,
+    elements: list,
+    panels: dict,
+    output_dir: str = ".",
+    bins: int = 500,
+    reduce: str = "mean",
+    max_scatter_points: int = MAX_SCATTER_POINTS,
+    marker_size: float = 50,
+    alpha: float = 0.7,
+    label_offset: float = 1.15,
+    dpi: int = 300,
+    workers: int = None,
+    suffix: str = "",
+    tiled: bool = False,
+    layout: Layout = None,
+) -> list:
+    """
+    Render the polygon-projection panels of several properties, headless and in parallel.
+
+    All alloys are projected once with a single matmul into a ``Layout``. Result sets larger than
+    ``max_scatter_points`` are rasterised: the alloys falling into each of ``bins`` x ``bins`` pixels are
+    aggregated with ``reduce`` instead of drawing one marker each, so rendering time no longer grows
+    with the number of alloys. The figure, polygon, labels and points are drawn once per worker and
+    only the colour values change from one property to the next. Panels are rendered without pyplot,
+    so no window is opened and batch jobs never block.
+
+    Parameters:
+        df (pd.DataFrame): Alloys with one column per element and the property columns.
+        elements (list): Element columns, in polygon order.
+        panels (dict): ``{column: (vmin, vmax, title)}``; a None title gives ``"<column> Distribution"``.
+        output_dir (str): Directory receiving one ``<column><suffix>.png`` per panel (``/`` and spaces
+                          replaced by ``_``), or ``properties<suffix>.png`` if ``tiled``.
+        bins (int): Pixels along each axis of rasterised panels.
+        reduce (str): Aggregation of the values in a pixel, see ``bin_values``.
+        max_scatter_points (int): Largest number of alloys drawn as individual markers.
+        marker_size, alpha (float): Marker size and opacity of scatter panels.
+        label_offset (float): Distance of the element labels from the centre, relative to the vertices.
+        dpi (int): Resolution of the saved images.
+        workers (int): Number of worker processes; None for one per CPU (at most one per panel), 1 to
+                       render in this process. Unused if ``tiled``.
+        suffix (str): Appended to every file name, e.g. ``"_affine_filtered_projection"``.
+        tiled (bool): Render all the panels as tiles of a single figure instead of one file each.
+        layout (Layout): Layout of ``df`` from a previous call, reused instead of projecting again;
+                         ``elements``, ``bins`` and ``max_scatter_points`` are then ignored.
+
+    Returns:
+        list: Paths of the saved images, in panel order.
+    """
+    missing = [column for column in panels if column not in df.columns]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in the results.")
+    if not panels:
+        return []
+    if layout is None:
+        with profiling.stage("project", rows_in=len(df)):
+            layout = Layout(df, elements, bins, max_scatter_points)
+    style = {"marker_size": marker_size, "alpha": alpha, "label_offset": label_offset, "dpi": dpi}
+
+    with profiling.stage("panel_values", rows_in=len(df) * len(panels)):
+        tasks = [
+            {
+                "name": column,
+                "title": title or f"{column} Distribution",
+                "vmin": vmin,
+                "vmax": vmax,
+                "values": layout.values(df, column, reduce),
+                "filename": os.path.join(
+                    output_dir, f"{column.replace(' ', '_').replace('/', '_')}{suffix}.png"
+                ),
+            }
+            for column, (vmin, vmax, title) in panels.items()
+        ]
+    with profiling.stage("render", rows_in=len(df)) as record:
+        filenames = _render(layout, tasks, style, output_dir, suffix, workers, tiled)
+        for filename in filenames:
+            record.add_file(filename)
+    return filenames
+
@@ -0,0 +1,265 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Environment variable enabling the profiler at import time: "1" prints the stage summary at exit,
+# any other value is also used as the path of the Chrome trace written at exit
+PROFILE_ENV = "ALLOY_PROFILE"
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident memory of this process so far, in MB (None where it cannot be measured).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class Stage:
+    """
+    One timed run of a pipeline stage. ``rows_in``, ``rows_out`` and ``bytes`` can be set while the
+    stage runs; ``seconds`` and ``peak_rss_mb`` (peak of the process when the stage ended) are set
+    when it ends.
+    """
+
+    __slots__ = ("name", "start", "seconds", "rows_in", "rows_out", "bytes", "peak_rss_mb", "thread")
+
+    def __init__(self, name: str, rows_in: int = None, rows_out: int = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = rows_out
+        self.bytes = None
+        self.start = self.seconds = self.peak_rss_mb = None
+        self.thread = threading.get_ident()
+
+    def add_file(self, path: str):
+        """
+        Count the size of a written file in ``bytes``.
+        """
+        if os.path.exists(path):
+            self.bytes = (self.bytes or 0) + os.path.getsize(path)
+
+
+class _NullStage:
+    # Shared stand-in while profiling is off: entering, setting counters and leaving cost nothing
+    rows_in = rows_out = bytes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    def add_file(self, path: str):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _StageContext:
+    __slots__ = ("profiler", "record")
+
+    def __init__(self, profiler, record: Stage):
+        self.profiler = profiler
+        self.record = record
+
+    def __enter__(self) -> Stage:
+        self.record.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record.seconds = time.perf_counter() - self.record.start
+        self.record.peak_rss_mb = peak_rss_mb()
+        self.profiler.records.append(self.record)
+        return False
+
+
+class Profiler:
+    """
+    Records the stages of a pipeline run and reports them as a summary table or a Chrome trace.
+
+    Stages may nest (e.g. the read, score and write steps of every chunk inside ``screen_file``); each
+    run of a stage is kept, so the trace shows every chunk and the summary aggregates them by name.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.records = []
+
+    def stage(self, name: str, rows_in: int = None, rows_out: int = None) -> _StageContext:
+        """
+        Context manager timing one run of stage ``name`` and yielding its ``Stage`` record.
+        """
+        return _StageContext(self, Stage(name, rows_in, rows_out))
+
+    def iterate(self, iterable, name: str):
+        """
+        Iterate ``iterable``, timing the production of every item as a run of stage ``name`` with the
+        item length as ``rows_out`` (e.g. the chunks of a reader).
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as record:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                record.rows_out = len(item)
+            yield item
+
+    def summary(self) -> list:
+        """
+        One row per stage name, in order of first use: ``stage``, ``calls``, ``seconds``, ``rows_in``,
+        ``rows_out``, ``bytes``, ``rows_per_sec`` (rows in, or out if no rows in were counted) and
+        ``peak_rss_mb``.
+        """
+        rows = {}
+        for record in sorted(self.records, key=lambda r: r.start):
+            row = rows.setdefault(record.name, {
+                "stage": record.name, "calls": 0, "seconds": 0.0,
+                "rows_in": None, "rows_out": None, "bytes": None, "peak_rss_mb": None,
+            })
+            row["calls"] += 1
+            row["seconds"] += record.seconds
+            for key in ("rows_in", "rows_out", "bytes"):
+                value = getattr(record, key)
+                if value is not None:
+                    row[key] = (row[key] or 0) + value
+            if record.peak_rss_mb is not None:
+                row["peak_rss_mb"] = max(row["peak_rss_mb"] or 0, record.peak_rss_mb)
+        for row in rows.values():
+            counted = row["rows_in"] if row["rows_in"] is not None else row["rows_out"]
+            row["rows_per_sec"] = None if counted is None else counted / max(row["seconds"], 1e-9)
+        return list(rows.values())
+
+    def format_summary(self) -> str:
+        """
+        The summary as a fixed-width text table.
+        """
+        def cell(value, width, spec):
+            return "-".rjust(width) if value is None else format(value, f"{width}{spec}")
+
+        lines = [f"{'stage':24s} {'calls':>6s} {'seconds':>9s} {'rows in':>12s} {'rows out':>12s} "
+                 f"{'MB written':>10s} {'rows/s':>12s} {'peak MB':>8s}"]
+        for row in self.summary():
+            written = None if row["bytes"] is None else row["bytes"] / (1 << 20)
+            lines.append(
+                f"{row['stage'][:24]:24s} {row['calls']:6d} {row['seconds']:9.3f} {cell(row['rows_in'], 12, ',d')} "
+                f"{cell(row['rows_out'], 12, ',d')} {cell(written, 10, '.1f')} {cell(row['rows_per_sec'], 12, ',.0f')} "
+                f"{cell(row['peak_rss_mb'], 8, '.0f')}"
+            )
+        return "\n".join(lines)
+
+    def trace(self) -> dict:
+        """
+        The recorded stages in the Chrome trace event format (``chrome://tracing``, Perfetto): one
+        complete event per stage run and a counter of the peak resident memory.
+        """
+        pid = os.getpid()
+        events = []
+        for record in sorted(self.records, key=lambda r: r.start):
+            start = (record.start - self.origin) * 1e6
+            args = {k: getattr(record, k) for k in ("rows_in", "rows_out", "bytes") if getattr(record, k) is not None}
+            events.append({"name": record.name, "cat": "alloy", "ph": "X", "ts": start,
+                           "dur": record.seconds * 1e6, "pid": pid, "tid": record.thread, "args": args})
+            if record.peak_rss_mb is not None:
+                events.append({"name": "peak_rss_mb", "ph": "C", "ts": start + record.seconds * 1e6,
+                               "pid": pid, "args": {"MB": record.peak_rss_mb}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str):
+        """
+        Write the Chrome trace JSON to ``path``.
+        """
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+
+
+_profiler = None
+
+
+def enable(trace_file: str = None, report: bool = True) -> Profiler:
+    """
+    Start recording stages (keeping the records of an active profiler).
+
+    Parameters:
+        trace_file (str): Chrome trace JSON written when the process exits.
+        report (bool): Print the summary table when the process exits.
+
+    Returns:
+        Profiler: The active profiler.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+        if report or trace_file:
+            atexit.register(_report, _profiler, trace_file, report)
+    elif trace_file:
+        atexit.register(_report, _profiler, trace_file, False)
+    return _profiler
+
+
+def disable() -> Profiler:
+    """
+    Stop recording stages and return the profiler that was active, if any.
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def active() -> Profiler:
+    """
+    The active profiler, or None if profiling is off.
+    """
+    return _profiler
+
+
+def stage(name: str, rows_in: int = None, rows_out: int = None):
+    """
+    Time one run of stage ``name`` with the active profiler; does nothing if profiling is off.
+
+    Use as ``with stage("write", rows_in=len(df)) as record: ...``; ``record.rows_out``,
+    ``record.bytes`` and ``record.add_file(path)`` can be used inside the block.
+    """
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name, rows_in, rows_out)
+
+
+def iterate(iterable, name: str):
+    """
+    ``Profiler.iterate`` with the active profiler; returns ``iterable`` itself if profiling is off.
+    """
+    if _profiler is None:
+        return iterable
+    return _profiler.iterate(iterable, name)
+
+
+def _report(profiler: Profiler, trace_file: str, report: bool):
+    if not profiler.records:
+        return
+    if report:
+        print(profiler.format_summary())
+    if trace_file:
+        profiler.write_trace(trace_file)
+        print(f"Trace saved: {trace_file}")
+
+
+if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+    enable(None if os.environ[PROFILE_ENV] == "1" else os.environ[PROFILE_ENV])
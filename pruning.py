@@ -0,0 +1,133 @@
+from math import comb
+
+import numpy as np
+
+from lattice import interior_lattice, numerator_dtype, subsystem_supports
+
+# Relative margin on the bounds, so that rounding in the bounds never prunes a row the exact mask keeps
+BOUND_RTOL = 1e-9
+
+
+def region_bounds(
+    properties: np.ndarray,
+    prefix: np.ndarray,
+    remaining: int,
+    num_division: int,
+) -> tuple:
+    """
+    Exact lower and upper bounds of linear properties over a lattice region.
+
+    The region holds the compositions of a face whose first ``len(prefix)`` numerators are fixed to
+    ``prefix`` and whose other numerators are >= 1 and sum to ``remaining``. The properties are linear
+    in composition, so their extremes are attained at the region's vertices, where one free element
+    takes everything above the minimum of 1.
+
+    Parameters:
+        properties (np.ndarray): Property rows of the face elements, shape (face size, metrics).
+        prefix (np.ndarray): Fixed numerators of the first face elements.
+        remaining (int): Sum of the free numerators.
+        num_division (int): Denominator of the composition grid.
+
+    Returns:
+        tuple: ``(lower, upper)`` arrays with one value per metric.
+    """
+    fixed = prefix @ properties[:len(prefix)]
+    free = properties[len(prefix):]
+    base = fixed + free.sum(axis=0)
+    spare = remaining - len(free)
+    lower = (base + spare * free.min(axis=0)) / num_division
+    upper = (base + spare * free.max(axis=0)) / num_division
+    return lower, upper
+
+
+def iter_pruned_face(
+    properties: np.ndarray,
+    limits: np.ndarray,
+    num_division: int,
+    max_rows: int = 1_000_000,
+    leaf_size: int = 4096,
+    stats: dict = None,
+    prefix: tuple = (),
+):
+    """
+    Enumerate the interior lattice of one face, skipping regions that provably fail a limit.
+
+    The face is split recursively on the value of its next element. A region whose lower bound
+    reaches a limit is skipped without being enumerated; a region whose upper bounds are all below
+    the limits is emitted whole without further splitting; only regions straddling a limit are split
+    down to ``leaf_size`` rows. Regions are emitted in lexicographic order, so the concatenated output
+    is the unpruned ``interior_lattice`` minus rows that would fail the mask anyway.
+
+    Parameters:
+        properties (np.ndarray): Property rows of the face elements, shape (face size, metrics).
+        limits (np.ndarray): Limits a composition must stay strictly below, one per metric.
+        num_division (int): Number of divisions of the composition grid.
+        max_rows (int): Maximum number of rows per yielded block.
+        leaf_size (int): Regions straddling a limit with at most this many rows are enumerated as is.
+        stats (dict): If given, ``enumerated`` and ``pruned`` row counts are accumulated into it.
+        prefix (tuple): Only enumerate the region whose first numerators equal ``prefix``.
+
+    Yields:
+        np.ndarray: Composition numerators of the face elements, shape (rows, face size).
+    """
+    size = len(properties)
+    dtype = numerator_dtype(num_division)
+
+    def regions(prefix, remaining):
+        free = size - len(prefix)
+        count = comb(remaining - 1, free - 1)
+        lower, upper = region_bounds(properties, np.asarray(prefix, dtype=float), remaining, num_division)
+        if np.any(lower * (1 - BOUND_RTOL) >= limits):
+            if stats is not None:
+                stats["pruned"] = stats.get("pruned", 0) + count
+            return
+        passing = np.all(upper * (1 + BOUND_RTOL) < limits)
+        if count <= (max_rows if passing else leaf_size):
+            block = np.empty((count, size), dtype=dtype)
+            block[:, :len(prefix)] = prefix
+            block[:, len(prefix):] = interior_lattice(free, remaining, dtype=dtype)
+            if stats is not None:
+                stats["enumerated"] = stats.get("enumerated", 0) + count
+            yield block
+            return
+        for value in range(1, remaining - free + 2):
+            yield from regions(prefix + [value], remaining - value)
+
+    remaining = num_division - sum(prefix)
+    if len(prefix) < size and remaining >= size - len(prefix) and all(value >= 1 for value in prefix):
+        yield from regions(list(prefix), remaining)
+
+
+def iter_pruned_multi_system_lattice(
+    properties: np.ndarray,
+    limits: np.ndarray,
+    order: int,
+    num_division: int,
+    chunksize: int = 1_000_000,
+    stats: dict = None,
+):
+    """
+    Stream the multi-system composition space like ``lattice.iter_multi_system_lattice``, skipping
+    every face region that provably fails a limit.
+
+    Parameters:
+        properties (np.ndarray): Property rows of all elements, shape (elements, metrics).
+        limits (np.ndarray): Limits a composition must stay strictly below, one per metric.
+        order (int): Number of elements per subsystem.
+        num_division (int): Number of divisions of the composition grid.
+        chunksize (int): Maximum number of rows per yielded chunk.
+        stats (dict): If given, ``enumerated`` and ``pruned`` row counts are accumulated into it.
+
+    Yields:
+        tuple: ``(subsystem, numerators)`` where ``numerators`` has shape (rows, elements).
+    """
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    num_elements = len(properties)
+    dtype = numerator_dtype(num_division)
+    for subsystem, faces in subsystem_supports(num_elements, order):
+        for face in faces:
+            for block in iter_pruned_face(properties[list(face)], limits, num_division, chunksize, stats=stats):
+                chunk = np.zeros((len(block), num_elements), dtype=dtype)
+                chunk[:, face] = block
+                yield subsystem, chunk
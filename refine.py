@@ -0,0 +1,422 @@
+import argparse
+import time
+from math import gcd, lcm
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from lattice import bounded_lattice, bounded_lattice_size, limit_bounds, numerator_dtype, row_keys, transfer_moves
+from screening import DATABASE, PROPERTY_COLUMNS, SCORE_COLUMNS, ScoreKernel
+from table_io import write_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Divisions of the successive levels, e.g. 10% -> 5% -> 2.5% -> 1% resolution
+SCHEDULE = (10, 20, 40, 100)
+
+
+def unique_rows(numerators: np.ndarray) -> np.ndarray:
+    """
+    Distinct numerator rows, in first-seen order.
+    """
+    _, first = np.unique(row_keys(numerators), return_index=True)
+    return numerators[np.sort(first)]
+
+
+def snap(numerators: np.ndarray, num_division: int, target_division: int) -> np.ndarray:
+    """
+    Nearest compositions of a lattice with ``target_division`` divisions.
+
+    Numerators are scaled and rounded down, and the divisions lost by rounding are given back to the
+    elements with the largest remainders, so every row still sums to ``target_division``. Exact if
+    ``num_division`` divides ``target_division``.
+
+    Returns:
+        np.ndarray: int64 numerators of shape ``numerators.shape``.
+    """
+    scaled, remainder = np.divmod(np.asarray(numerators, dtype=np.int64) * target_division, num_division)
+    missing = target_division - scaled.sum(axis=1)
+    order = np.argsort(-remainder, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(order.shape[1]), axis=1)
+    return scaled + (ranks < missing[:, None])
+
+
+def neighborhood(centers: np.ndarray, steps: int, lower: np.ndarray, upper: np.ndarray,
+                 chunksize: int = 1_000_000) -> np.ndarray:
+    """
+    Lattice compositions within ``steps`` transfer moves of any of ``centers`` (the union of their
+    graph balls), within ``[lower, upper]``.
+
+    The balls are grown together one move at a time from the newly reached rows only, so every
+    composition is generated a bounded number of times whatever the overlap of the balls.
+
+    Parameters:
+        centers (np.ndarray): Numerator rows; rows outside the bounds are ignored.
+        steps (int): Radius of the balls, in moves of one division.
+        lower (np.ndarray): Minimum numerator of each element.
+        upper (np.ndarray): Maximum numerator of each element.
+        chunksize (int): Maximum number of moved rows held in memory at a time.
+
+    Returns:
+        np.ndarray: Distinct int64 numerator rows, centers first.
+    """
+    moves = transfer_moves(centers.shape[1])
+    centers = np.asarray(centers, dtype=np.int64)
+    region = unique_rows(centers[((centers >= lower) & (centers <= upper)).all(axis=1)])
+    frontier = region
+    block = max(chunksize // len(moves), 1) if len(moves) else 1
+    for _ in range(steps if len(moves) else 0):
+        reached = []
+        for start in range(0, len(frontier), block):
+            moved = (frontier[start:start + block, None, :] + moves).reshape(-1, centers.shape[1])
+            reached.append(unique_rows(moved[((moved >= lower) & (moved <= upper)).all(axis=1)]))
+        reached = unique_rows(np.concatenate(reached))
+        frontier = reached[~np.isin(row_keys(reached), row_keys(region))]
+        if not len(frontier):
+            break
+        region = np.concatenate([region, frontier])
+    return region
+
+
+def cell_offsets(dimension: int, num_division: int, target_division: int, chunksize: int = 1_000_000) -> np.ndarray:
+    """
+    Offsets from ``snap(x, num_division, target_division)`` of the compositions of the finer lattice
+    that ``snap`` back to ``x``, over every composition ``x`` of the coarser lattice.
+
+    With ``target_division / num_division = p / q`` in lowest terms, moving ``p`` divisions of the finer
+    lattice from one element to another moves its snapped composition by exactly ``q`` divisions, so
+    the offset of a composition only depends on its numerators modulo ``p``: one representative of
+    every residue is enough.
+
+    Returns:
+        np.ndarray: Distinct int64 offset rows, each summing to 0.
+    """
+    period = target_division // gcd(num_division, target_division)
+    count = period ** (dimension - 1)
+    offsets = []
+    for start in range(0, count, chunksize):
+        fine = np.empty((min(chunksize, count - start), dimension), dtype=np.int64)
+        residues = np.unravel_index(np.arange(start, start + len(fine)), (period,) * (dimension - 1))
+        fine[:, :-1] = np.stack(residues, axis=1)
+        fine[:, -1] = target_division - fine[:, :-1].sum(axis=1)
+        coarse = snap(fine, target_division, num_division)
+        offsets.append(unique_rows(fine - snap(coarse, num_division, target_division)))
+    return unique_rows(np.concatenate(offsets))
+
+
+def refine_cells(centers: np.ndarray, num_division: int, target_division: int, lower: np.ndarray,
+                 upper: np.ndarray, chunksize: int = 1_000_000) -> np.ndarray:
+    """
+    Compositions of the finer lattice, within ``[lower, upper]``, whose nearest composition of the
+    coarser lattice (see ``snap``) is one of ``centers``.
+
+    These cells partition the finer lattice, so distinct centers never produce the same composition.
+
+    Parameters:
+        centers (np.ndarray): Distinct numerator rows of the coarser lattice.
+        num_division (int): Divisions of the coarser lattice.
+        target_division (int): Divisions of the finer lattice.
+        lower (np.ndarray): Minimum numerator of each element in the finer lattice.
+        upper (np.ndarray): Maximum numerator of each element in the finer lattice.
+        chunksize (int): Maximum number of candidate rows held in memory at a time.
+
+    Returns:
+        np.ndarray: int64 numerator rows of the finer lattice, grouped by center.
+    """
+    centers = np.asarray(centers, dtype=np.int64)
+    offsets = cell_offsets(centers.shape[1], num_division, target_division, chunksize)
+    block = max(chunksize // len(offsets), 1)
+    cells = [np.empty((0, centers.shape[1]), dtype=np.int64)]
+    for start in range(0, len(centers), block):
+        origin = centers[start:start + block]
+        fine = (snap(origin, num_division, target_division)[:, None, :] + offsets).reshape(-1, centers.shape[1])
+        keep = ((fine >= lower) & (fine <= upper)).all(axis=1)
+        # Offsets are shared by all cells: keep the compositions that snap back to their own center
+        owner = np.repeat(origin, len(offsets), axis=0)[keep]
+        keep[keep] = (snap(fine[keep], target_division, num_division) == owner).all(axis=1)
+        cells.append(fine[keep])
+    return np.concatenate(cells)
+
+
+def boundary_mask(kernel: ScoreKernel, numerators: np.ndarray, num_division: int, feasible: np.ndarray,
+                  lower: np.ndarray, upper: np.ndarray, chunksize: int = 1_000_000) -> np.ndarray:
+    """
+    Mask of the compositions on the feasibility boundary: one of their neighbors in the lattice (one
+    division moved from one element to another, within ``[lower, upper]``) fails a limit they pass, or
+    passes every limit they fail.
+
+    Properties are linear in composition, so the properties of a neighbor are those of the row plus the
+    change of its move; neighbors are never built, only the rows within one move of a limit are checked.
+
+    Parameters:
+        kernel (ScoreKernel): Scoring kernel of the elements.
+        numerators (np.ndarray): Numerator rows of the lattice.
+        num_division (int): Number of divisions of the lattice.
+        feasible (np.ndarray): Whether each row passes every limit.
+        lower (np.ndarray): Minimum numerator of each element.
+        upper (np.ndarray): Maximum numerator of each element.
+        chunksize (int): Maximum number of (row, move) pairs checked at a time.
+    """
+    moves = transfer_moves(numerators.shape[1])
+    mask = np.zeros(len(numerators), dtype=bool)
+    if not len(moves):
+        return mask
+    source, target = moves.argmin(axis=1), moves.argmax(axis=1)
+    change = (moves @ kernel.basis) / num_division
+    # No move changes a property by more than its spread over the elements (plus a margin for rounding)
+    reach = np.abs(change).max(axis=0) * (1 + 1e-9)
+
+    block = max(chunksize // len(moves), 1)
+    for start in range(0, len(numerators), block):
+        rows = np.asarray(numerators[start:start + block])
+        properties = kernel.properties(rows / num_division)
+        near = np.flatnonzero((np.abs(properties - kernel.limits) <= reach).any(axis=1))
+        rows, properties = rows[near], properties[near]
+        valid = (rows > lower)[:, source] & (rows < upper)[:, target]
+        passing = (properties[:, None, :] + change < kernel.limits).all(axis=2)
+        mask[start + near] = (valid & (passing != feasible[start + near, None])).any(axis=1)
+    return mask
+
+
+class AdaptiveRefinement:
+    """
+    Coarse-to-fine screening of a simplex lattice.
+
+    The first level scores the whole lattice of the coarsest resolution within the limits. Every next
+    level only scores the cells of the active nodes of the previous level, i.e. the compositions of a
+    finer lattice whose nearest coarser composition is active. Active nodes are the nodes on either
+    side of the feasibility boundary (a neighbor fails a limit the node passes, or the other way
+    round) and the ``top_k`` best nodes. Compositions scored at a coarser level lie on every finer
+    lattice whose divisions are a multiple of theirs; they are looked up instead of being scored again.
+
+    Parameters:
+        elements (list): Element symbols.
+        limits (list): Optional ``[min, max]`` mole fraction of each element.
+        kernel (ScoreKernel): Scoring kernel of ``elements``; by default built from the unified nuclear
+                              property data and limits of ``screening.py``.
+        property_columns (list): Names of the 7 raw property columns.
+    """
+
+    def __init__(self, elements: list, limits: list = None, kernel: ScoreKernel = None,
+                 property_columns: list = PROPERTY_COLUMNS):
+        limits = [[0, 1]] * len(elements) if limits is None else limits
+        if len(limits) != len(elements) or any(len(l) != 2 or l[0] > l[1] for l in limits):
+            raise ValueError("Limits must be one [min, max] pair per element.")
+        self.elements = list(elements)
+        self.limits = [list(l) for l in limits]
+        if kernel is None:
+            kernel = ScoreKernel.from_database(DATABASE, self.elements)
+        self.kernel = kernel
+        self.property_columns = list(property_columns)
+        self.levels = []
+        self.seconds = 0.0
+        self._schedule = None
+        # Scored compositions, as numerators of the common lattice of every level
+        self._dtype = np.dtype(np.uint8)
+        self._numerators = np.empty((0, len(elements)), dtype=self._dtype)
+        self._blocks = []
+        self._feasible = np.empty(0, dtype=bool)
+        self._scores = np.empty(0)
+        self._divisions = np.empty(0, dtype=np.int64)
+        self._keys = row_keys(self._numerators)
+        self._order = np.empty(0, dtype=np.int64)
+
+    def lookup(self, numerators: np.ndarray) -> np.ndarray:
+        """
+        Position of each row of the common lattice among the scored compositions, -1 if not scored.
+        """
+        if not len(self._keys):
+            return np.full(len(numerators), -1, dtype=np.int64)
+        keys = row_keys(np.asarray(numerators).astype(self._dtype))
+        position = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[position] == keys, self._order[position], -1)
+
+    def evaluate(self, numerators: np.ndarray, num_division: int, chunksize: int = 1_000_000) -> tuple:
+        """
+        Score the compositions of a level not scored yet, and return the position of every composition
+        among the scored ones.
+
+        Returns:
+            tuple: ``(positions, reused)``, the positions of the rows and the number of rows that were
+                   already scored.
+        """
+        common = np.asarray(numerators, dtype=np.int64) * (self._common_division // num_division)
+        positions = self.lookup(common)
+        new = np.flatnonzero(positions < 0)
+        start = len(self._numerators)
+        feasible, scores = [self._feasible], [self._scores]
+        for first in range(0, len(new), chunksize):
+            rows = new[first:first + chunksize]
+            fractions = common[rows] / self._common_division
+            properties = self.kernel.properties(fractions)
+            feasible.append(self.kernel.feasible(properties).copy())
+            block_scores = self.kernel.scores(properties)
+            scores.append(block_scores[:, -1].copy())
+            self._blocks.append(np.concatenate([fractions, properties, block_scores], axis=1))
+        if len(new):
+            positions[new] = start + np.arange(len(new))
+            self._numerators = np.concatenate([self._numerators, common[new].astype(self._dtype)])
+            self._feasible = np.concatenate(feasible)
+            self._scores = np.concatenate(scores)
+            self._divisions = np.concatenate([self._divisions, np.full(len(new), num_division)])
+            keys = row_keys(self._numerators)
+            self._order = np.argsort(keys, kind="stable")
+            self._keys = keys[self._order]
+        return positions, len(numerators) - len(new)
+
+    def run(self, schedule: tuple = SCHEDULE, top_k: int = 100, radius: int = 1, boundary: bool = True,
+            chunksize: int = 1_000_000) -> dict:
+        """
+        Screen the levels of ``schedule`` from coarse to fine.
+
+        Parameters:
+            schedule (tuple): Increasing numbers of divisions of the successive levels.
+            top_k (int): Number of best nodes (feasible first, then lowest CombinedScore) refined at
+                         every level, besides the boundary nodes.
+            radius (int): The active nodes and their neighbors within ``radius`` moves of their level
+                          are refined; 0 only refines the active nodes themselves.
+            boundary (bool): Refine the feasibility boundary; if False, only the ``top_k`` best nodes
+                             are refined, which keeps the cost small in many dimensions.
+            chunksize (int): Maximum number of rows scored or moved at a time.
+
+        Returns:
+            dict: See ``stats``.
+        """
+        schedule = [int(n) for n in schedule]
+        if not schedule or schedule[0] <= 0 or any(a >= b for a, b in zip(schedule, schedule[1:])):
+            raise ValueError("Schedule must be increasing positive numbers of divisions.")
+        if radius < 0 or top_k < 0:
+            raise ValueError("Radius and top_k must be non-negative.")
+        if self._schedule is not None:
+            raise ValueError("This refinement has already run; create a new one.")
+        self._schedule = schedule
+        self._common_division = lcm(*schedule)
+        self._dtype = numerator_dtype(self._common_division)
+
+        tic = time.time()
+        active, previous = None, None
+        for num_division in schedule:
+            level_tic = time.time()
+            lower, upper = limit_bounds(num_division, self.limits)
+            if previous is None:
+                candidates = bounded_lattice(num_division, lower, upper, dtype=np.int64)
+            else:
+                centers = neighborhood(active, radius, 0, previous, chunksize)
+                candidates = refine_cells(centers, previous, num_division, lower, upper, chunksize)
+            positions, reused = self.evaluate(candidates, num_division, chunksize)
+            feasible = self._feasible[positions]
+            scores = self._scores[positions]
+            selected = np.zeros(len(candidates), dtype=bool)
+            if boundary:
+                selected = boundary_mask(self.kernel, candidates, num_division, feasible, lower, upper, chunksize)
+            on_boundary = int(selected.sum())
+            selected[np.lexsort((scores, ~feasible))[:top_k]] = True
+            active, previous = candidates[selected], num_division
+            self.levels.append({
+                "ndiv": num_division,
+                "candidates": len(candidates),
+                "reused": reused,
+                "evaluated": len(candidates) - reused,
+                "feasible": int(feasible.sum()),
+                "boundary": on_boundary,
+                "active": len(active),
+                "best_score": float(scores[feasible].min()) if feasible.any() else None,
+                "seconds": time.time() - level_tic,
+            })
+        self.seconds += time.time() - tic
+        return self.stats()
+
+    def stats(self) -> dict:
+        """
+        Refinement statistics.
+
+        Returns:
+            dict: ``evaluated`` (compositions scored over all levels), ``total`` (compositions of the
+                  finest lattice within the limits), ``evaluated_fraction``, ``feasible`` (scored
+                  compositions passing every limit), ``best_score``, ``seconds`` and ``levels``, one dict
+                  per level with its ``ndiv``, ``candidates``, ``reused`` and ``evaluated`` compositions,
+                  ``feasible`` and ``boundary`` candidates, ``active`` nodes refined by the next level,
+                  ``best_score`` and ``seconds``.
+        """
+        total = 0
+        if self._schedule:
+            total = bounded_lattice_size(self._schedule[-1], *limit_bounds(self._schedule[-1], self.limits))
+        feasible = self._scores[self._feasible]
+        return {
+            "evaluated": len(self._numerators),
+            "total": total,
+            "evaluated_fraction": len(self._numerators) / max(total, 1),
+            "feasible": len(feasible),
+            "best_score": float(feasible.min()) if len(feasible) else None,
+            "seconds": self.seconds,
+            "levels": list(self.levels),
+        }
+
+    def result(self, apply_filter: bool = True) -> "pd.DataFrame":
+        """
+        Scored alloys of every level, best CombinedScore first (ties in scoring order), with their mole
+        fractions, properties, scores and the ``Divisions`` of the level that scored them; only those
+        passing every limit if ``apply_filter``.
+        """
+        import pandas as pd
+        columns = self.elements + self.property_columns + SCORE_COLUMNS
+        if not self._blocks:
+            return pd.DataFrame(columns=columns + ["Divisions"])
+        df = pd.DataFrame(np.concatenate(self._blocks), columns=columns)
+        df["Divisions"] = self._divisions
+        if apply_filter:
+            df = df[self._feasible]
+        return df.sort_values("CombinedScore", kind="stable").reset_index(drop=True)
+
+
+def main(argv: list = None, prog: str = None):
+    """
+    Refine a composition space from coarse to fine from the command line (``python cli.py refine``).
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Screen a simplex lattice coarse to fine, refining only near the feasibility boundary "
+                    "and the best alloys."
+    )
+    parser.add_argument("elements", nargs="+", help="Element symbols")
+    parser.add_argument("--schedule", type=int, nargs="+", default=list(SCHEDULE),
+                        help="Increasing divisions of the successive levels (default: %(default)s)")
+    parser.add_argument("--limit", type=float, nargs="+",
+                        help="Min and max of each element, [min1 max1 min2 max2 ...]")
+    parser.add_argument("--top-k", type=int, default=100,
+                        help="Best nodes refined at every level, besides the boundary (default: %(default)s)")
+    parser.add_argument("--radius", type=int, default=1,
+                        help="Also refine the neighbors of active nodes within this many moves (default: %(default)s)")
+    parser.add_argument("--no-boundary", action="store_true",
+                        help="Only refine around the best alloys, not along the feasibility boundary")
+    parser.add_argument("--output", default="refined_nuclear_alloys.csv",
+                        help="Feasible scored alloys, best first (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    limits = None
+    if args.limit is not None:
+        if len(args.limit) != 2 * len(args.elements):
+            parser.error("Limit must have 2 values per element (min and max).")
+        limits = [args.limit[i * 2:(i + 1) * 2] for i in range(len(args.elements))]
+
+    refinement = AdaptiveRefinement(args.elements, limits)
+    stats = refinement.run(args.schedule, args.top_k, args.radius, not args.no_boundary)
+    for level in stats["levels"]:
+        best = "-" if level["best_score"] is None else f"{level['best_score']:.6f}"
+        print(f"ndiv {level['ndiv']:>4}: {level['candidates']:>10,} candidates ({level['reused']:,} reused), "
+              f"{level['feasible']:,} feasible, {level['boundary']:,} on the boundary, best {best}, "
+              f"{level['seconds']:.2f}s")
+    print(f"Scored {stats['evaluated']:,} of {stats['total']:,} compositions of the finest lattice "
+          f"({100 * stats['evaluated_fraction']:.3g}%), {stats['feasible']:,} feasible, in {stats['seconds']:.2f}s")
+    result = refinement.result()
+    write_table(result, args.output)
+    if len(result):
+        print(f"Best CombinedScore: {stats['best_score']:.6f}")
+        print(result.head(10).to_string())
+    print(f"Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
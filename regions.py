@@ -0,0 +1,158 @@
+import argparse
+import os
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from graph import CHUNKSIZE, connected_components
+from screening import DATABASE, PROPERTY_COLUMNS, SCORE_COLUMNS, ScoreKernel, screen_compositions
+from search import GraphSpace
+from table_io import TableWriter, write_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def score_space(space: GraphSpace, kernel: ScoreKernel, chunksize: int = CHUNKSIZE) -> tuple:
+    """
+    Feasibility and CombinedScore of every node of ``space``, ``chunksize`` nodes at a time.
+
+    Returns:
+        tuple: ``(mask, scores)``, the boolean mask of the nodes passing every limit and the
+               CombinedScore of every node.
+    """
+    mask = np.empty(len(space), dtype=bool)
+    scores = np.empty(len(space))
+    for start in range(0, len(space), chunksize):
+        block = space.compositions[start:start + chunksize]
+        properties = kernel.properties(block.fractions())
+        mask[start:start + len(block)] = kernel.feasible(properties)
+        scores[start:start + len(block)] = kernel.scores(properties)[:, -1]
+    return mask, scores
+
+
+def region_summary(labels: np.ndarray, space: GraphSpace, scores: np.ndarray, chunksize: int = CHUNKSIZE) -> "pd.DataFrame":
+    """
+    Size, best CombinedScore, best node and centroid of every labelled region.
+
+    Parameters:
+        labels (np.ndarray): Region of every node of ``space``, -1 for unlabelled nodes (see
+                             ``graph.connected_components``).
+        space (GraphSpace): Labelled space.
+        scores (np.ndarray): CombinedScore of every node.
+        chunksize (int): Number of nodes whose compositions are summed at a time.
+
+    Returns:
+        "pd.DataFrame": One row per region, largest first: ``Region``, ``Size``, ``BestScore``,
+                      ``BestNode`` and the mean mole fraction of every element.
+    """
+    import pandas as pd
+    labelled = labels >= 0
+    regions = int(labels.max(initial=-1)) + 1
+    sizes = np.bincount(labels[labelled], minlength=regions)
+
+    # Best node of each region: the first node in (region, score) order
+    nodes = np.flatnonzero(labelled)
+    order = np.lexsort((scores[nodes], labels[nodes]))
+    firsts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    best_nodes = nodes[order][firsts] if regions else np.empty(0, dtype=np.int64)
+
+    sums = np.zeros((regions, len(space.elements)))
+    for start in range(0, len(space), chunksize):
+        block_labels = labels[start:start + chunksize]
+        block_labelled = block_labels >= 0
+        fractions = space.compositions[start:start + chunksize].fractions()[block_labelled]
+        for j in range(len(space.elements)):
+            sums[:, j] += np.bincount(block_labels[block_labelled], weights=fractions[:, j], minlength=regions)
+
+    summary = pd.DataFrame({
+        "Region": np.arange(regions),
+        "Size": sizes,
+        "BestScore": scores[best_nodes],
+        "BestNode": best_nodes,
+    })
+    centroids = pd.DataFrame(sums / np.maximum(sizes, 1)[:, None], columns=space.elements)
+    summary = pd.concat([summary, centroids], axis=1)
+    return summary.sort_values("Size", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def label_regions(
+    space: GraphSpace,
+    output_file: str = None,
+    kernel: ScoreKernel = None,
+    chunksize: int = CHUNKSIZE,
+    property_columns: list = PROPERTY_COLUMNS,
+) -> tuple:
+    """
+    Split the feasible nodes of a composition space into connected regions of its neighbor graph.
+
+    Nodes are scored chunk by chunk, the nodes passing every limit are labelled by
+    ``graph.connected_components``, and the regions are summarised by ``region_summary``. Only the
+    per-node mask, score and label arrays are held for the whole space.
+
+    Parameters:
+        space (GraphSpace): Space to label, e.g. ``GraphSpace.load`` of a ``.npy`` nimplex space.
+        output_file (str): If given, ``.csv`` or ``.parquet`` file receiving the feasible alloys with
+                           their ``Node ID``, properties, scores and ``Region``, in node order.
+        kernel (ScoreKernel): Scoring kernel of the elements of ``space``; by default built from the
+                              unified nuclear property data and limits of ``screening.py``.
+        chunksize (int): Number of nodes scored, labelled and written at a time.
+        property_columns (list): Names of the 7 raw property columns.
+
+    Returns:
+        tuple: ``(labels, summary)``, the region of every node (-1 if it fails a limit) and the
+               ``region_summary`` DataFrame.
+    """
+    if chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    if kernel is None:
+        kernel = ScoreKernel.from_database(DATABASE, space.elements)
+    mask, scores = score_space(space, kernel, chunksize)
+    labels = connected_components(space.graph, mask, chunksize)
+
+    if output_file is not None:
+        columns = ["Node ID"] + space.elements + property_columns + SCORE_COLUMNS + ["Region"]
+        with TableWriter(output_file, columns) as writer:
+            for start in range(0, len(space), chunksize):
+                block_labels = labels[start:start + chunksize]
+                block_mask = block_labels >= 0
+                df = screen_compositions(
+                    space.compositions[start:start + chunksize][block_mask], space.elements, kernel,
+                    apply_filter=False, property_columns=property_columns,
+                )
+                df.insert(0, "Node ID", start + np.flatnonzero(block_mask))
+                df["Region"] = block_labels[block_mask]
+                writer.write(df)
+
+    return labels, region_summary(labels, space, scores, chunksize)
+
+
+def main(argv: list = None, prog: str = None):
+    """
+    Label the feasible regions of a space from the command line (``python cli.py regions``).
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Label the connected feasible regions of a nimplex composition space."
+    )
+    parser.add_argument("space", help=".npy nimplex space with its _neighbors graph (see generate_nimplex.py)")
+    parser.add_argument("--output", help="Feasible alloys with their region (default: <space>_regions.csv)")
+    parser.add_argument("--summary", help="Per-region statistics (default: <space>_region_summary.csv)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE,
+                        help="Nodes scored and labelled at a time (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    stem = os.path.splitext(args.space)[0]
+    output_file = args.output or f"{stem}_regions.csv"
+    summary_file = args.summary or f"{stem}_region_summary.csv"
+
+    space = GraphSpace.load(args.space)
+    labels, summary = label_regions(space, output_file, chunksize=args.chunksize)
+    write_table(summary, summary_file)
+    print(f"{int((labels >= 0).sum()):,} of {len(space):,} nodes feasible, in {len(summary):,} connected regions")
+    print(summary.head(10).to_string(index=False))
+    print(f"Saved: {output_file}, {summary_file}")
+
+
+if __name__ == "__main__":
+    main()
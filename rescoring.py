@@ -0,0 +1,167 @@
+import argparse
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from nuclear_data import DATA_FILE, PropertyDatabase
+from screening import PROPERTY_COLUMNS, SCORE_COLUMNS, ScoreKernel
+from table_io import TableWriter, iter_table, read_columns
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Feasibility column of a rescoring patch
+FEASIBLE_COLUMN = "Feasible"
+
+
+def database_changes(old: PropertyDatabase, new: PropertyDatabase, elements: list) -> tuple:
+    """
+    Differences between two versions of a property dataset, restricted to ``elements``.
+
+    Returns:
+        tuple: ``(element_deltas, limits)``, the ``{element: new row - old row}`` of every changed
+               basis row and the new limits (None if they did not change).
+    """
+    if old.columns != new.columns:
+        raise ValueError("Only datasets with the same metrics can be compared.")
+    old_basis, new_basis = old.basis(elements), new.basis(elements)
+    element_deltas = {
+        element: new_basis[i] - old_basis[i]
+        for i, element in enumerate(elements)
+        if not np.array_equal(new_basis[i], old_basis[i])
+    }
+    limits = None if np.array_equal(old.limits, new.limits) else np.array(new.limits)
+    return element_deltas, limits
+
+
+def rescore_frame(
+    df: "pd.DataFrame",
+    kernel: ScoreKernel,
+    element_deltas: dict = None,
+    property_columns: list = PROPERTY_COLUMNS,
+) -> "pd.DataFrame":
+    """
+    Rescore stored results from their raw metric columns, without the full property matmul.
+
+    Properties are linear in the mole fractions, so changing the basis rows of a few elements changes
+    the properties by ``fractions[:, changed] @ deltas``: a rank-1 update per changed element that
+    only needs the mole fractions of the changed elements. Feasibility and scores only depend on the
+    properties and the limits of ``kernel``. Updated properties equal a full recomputation up to
+    rounding in the last bits.
+
+    Parameters:
+        df (pd.DataFrame): Stored rows with the raw property columns and the mole fractions of the
+                           elements of ``element_deltas``.
+        kernel (ScoreKernel): Kernel holding the (new) limits and metric groups; its basis is not used.
+        element_deltas (dict): ``{element: new basis row - old basis row}``; None if the data did not change.
+        property_columns (list): Names of the raw property columns.
+
+    Returns:
+        "pd.DataFrame": One row per row of ``df``: the property columns (only if ``element_deltas`` is
+                      given), ``Feasible`` and the score columns.
+    """
+    import pandas as pd
+    properties = df[property_columns].to_numpy(dtype=np.float64)
+    patch = {}
+    if element_deltas:
+        elements = list(element_deltas)
+        fractions = df[elements].to_numpy(dtype=np.float64)
+        deltas = np.array([element_deltas[e] for e in elements], dtype=np.float64)
+        properties = properties + fractions @ deltas
+        patch.update(zip(property_columns, properties.T))
+    patch[FEASIBLE_COLUMN] = kernel.feasible(properties).copy()
+    patch.update(zip(SCORE_COLUMNS, kernel.scores(properties).T))
+    return pd.DataFrame(patch, index=df.index)
+
+
+def rescore_file(
+    input_file: str,
+    output_file: str,
+    limits: np.ndarray,
+    element_deltas: dict = None,
+    groups: tuple = (3, 2, 2),
+    chunksize: int = 1_000_000,
+    property_columns: list = PROPERTY_COLUMNS,
+    verbose: bool = True,
+) -> dict:
+    """
+    Write the rescoring patch of a results file, chunk by chunk.
+
+    Only the raw property columns and the mole fractions of the changed elements are read (Parquet
+    files only decode those columns), and nothing is multiplied by the full property basis. The
+    output has one row per input row, in order: the updated property columns (if the data changed),
+    ``Feasible`` and the score columns, to be joined with the stored results.
+
+    Rows dropped by a filtered screening are not in the stored results, so they are not reconsidered
+    if the limits are relaxed or properties decrease; rescore unfiltered results to cover every
+    composition.
+
+    Parameters:
+        input_file (str): ``.csv`` or ``.parquet`` results written by ``screening.screen_file``.
+        output_file (str): ``.csv`` or ``.parquet`` patch file.
+        limits (np.ndarray): Limit of each metric used for feasibility and normalisation.
+        element_deltas (dict): ``{element: new basis row - old basis row}``, see ``database_changes``.
+        groups (tuple): Number of metrics of each normalised score (activation, gamma, heat).
+        chunksize (int): Number of rows read per chunk.
+        property_columns (list): Names of the raw property columns.
+        verbose (bool): Print progress after every chunk.
+
+    Returns:
+        dict: ``rows``, ``feasible`` (rows passing every limit after rescoring), ``seconds`` and
+              ``rows_per_sec``.
+    """
+    element_deltas = element_deltas or {}
+    columns = list(property_columns) + [e for e in element_deltas if e not in property_columns]
+    missing = [c for c in columns if c not in read_columns(input_file)]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in the results; rescoring needs the raw property columns.")
+    # Feasibility and scores only use the limits and groups; the basis is never multiplied
+    kernel = ScoreKernel(np.empty((0, len(property_columns))), limits, groups)
+    output_columns = (list(property_columns) if element_deltas else []) + [FEASIBLE_COLUMN] + SCORE_COLUMNS
+
+    tic = time.time()
+    rows = feasible = 0
+    with TableWriter(output_file, output_columns) as writer:
+        for chunk in iter_table(input_file, chunksize, columns):
+            patch = rescore_frame(chunk, kernel, element_deltas, property_columns)
+            writer.write(patch)
+            rows += len(patch)
+            feasible += int(patch[FEASIBLE_COLUMN].sum())
+            if verbose:
+                print(f"{rows} rows rescored | {feasible} feasible | {rows / max(time.time() - tic, 1e-9):,.0f} rows/s")
+
+    seconds = time.time() - tic
+    return {"rows": rows, "feasible": feasible, "seconds": seconds, "rows_per_sec": rows / max(seconds, 1e-9)}
+
+
+def main(argv: list = None, prog: str = None):
+    """
+    Rescore a results file from the command line (``python cli.py rescore``).
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Rescore stored screening results after a property data or limit update."
+    )
+    parser.add_argument("input_file", help="Results with raw property columns (.csv or .parquet)")
+    parser.add_argument("output_file", help="Patch file: updated properties, Feasible and scores (.csv or .parquet)")
+    parser.add_argument("--old-data", required=True, help="Property data file the results were screened with")
+    parser.add_argument("--new-data", default=DATA_FILE, help="Updated property data file (default: %(default)s)")
+    parser.add_argument("--dataset", default="unified", help="Dataset of both files (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Rows read per chunk (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    old = PropertyDatabase.load(args.dataset, args.old_data)
+    new = PropertyDatabase.load(args.dataset, args.new_data)
+    elements = [e for e in new.elements if e in read_columns(args.input_file)]
+    element_deltas, limits = database_changes(old, new, elements)
+    print(f"Changed element rows: {list(element_deltas) or 'none'} | limits changed: {limits is not None}")
+    stats = rescore_file(
+        args.input_file, args.output_file, new.limits, element_deltas, tuple(new.groups.values()),
+        args.chunksize, new.columns,
+    )
+    print(f"{stats['rows']} rows rescored in {stats['seconds']:.2f}s, {stats['feasible']} feasible")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import profiling
+from compositions import Compositions
+from nuclear_data import load_database
+from table_io import TableWriter, file_format, iter_compositions, iter_table, read_columns
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# === Nuclear Property Data ===
+# Loaded once from data/nuclear_properties.json (see nuclear_data.py), one row per master element:
+# activation (T0, 1year, 100years), gamma doses (3.7 days, 100 years) and heat output (T0, 100 years).
+DATABASE = load_database("unified")
+MASTER_ELEMENTS = DATABASE.elements
+ACTIVATION_DATA, GAMMA_DATA, HEAT_DATA = DATABASE.tables()
+
+# === Limits ===
+ACTIVATION_LIMIT, GAMMA_LIMIT, HEAT_LIMIT = DATABASE.limit_tables()  # Bq/mol, Sv/h, W/mol
+
+# Calculated columns appended to the composition columns, in output order
+PROPERTY_COLUMNS = DATABASE.columns
+SCORE_COLUMNS = ["Normalize_Activation", "Normalize_Gamma", "Normalize_Heat", "CombinedScore"]
+
+
+class ScoreKernel:
+    """
+    Fused property, feasibility and score computation for blocks of compositions.
+
+    One matmul of the fractions with the (elements, 7) property basis is written into a reusable
+    buffer, feasibility is a single comparison with the limits, and the normalised group means and
+    CombinedScore are computed in place with ``out=`` arguments. Every normalised score is the mean
+    of its metrics divided by their limits, summed in column order, and CombinedScore is the mean of
+    the three. The matmul sums the element contributions in basis row order: kernels whose rows
+    follow the same element order give identical bits (``screen_file`` and ``pipeline.py`` both use
+    the master order), other orders agree up to rounding.
+
+    Buffers are reused from one call to the next, so a kernel is meant to be created once per run
+    (or per worker) and called on every chunk; arrays returned by a call that view a buffer are only
+    valid until the next call.
+
+    Parameters:
+        basis (np.ndarray): Property rows of the used elements, shape (elements, metrics).
+        limits (np.ndarray): Limit of each metric, shape (metrics,).
+        groups (tuple): Number of metrics of each normalised score (activation, gamma, heat).
+    """
+
+    def __init__(self, basis: np.ndarray, limits: np.ndarray, groups: tuple = (3, 2, 2)):
+        self.basis = np.ascontiguousarray(basis, dtype=np.float64)
+        self.limits = np.ascontiguousarray(limits, dtype=np.float64)
+        self.groups = tuple(groups)
+        if self.basis.ndim != 2 or self.limits.shape != (self.basis.shape[1],) or sum(self.groups) != len(self.limits):
+            raise ValueError("Basis, limits and metric groups must describe the same metrics.")
+        self._buffers = {}
+
+    @classmethod
+    def from_tables(
+        cls,
+        activation_used: np.ndarray,
+        gamma_used: np.ndarray,
+        heat_used: np.ndarray,
+        activation_limit: np.ndarray,
+        gamma_limit: np.ndarray,
+        heat_limit: np.ndarray,
+    ) -> "ScoreKernel":
+        """
+        Kernel for the separate activation, gamma and heat tables used by the screening functions.
+        """
+        tables = (activation_used, gamma_used, heat_used)
+        return cls(
+            np.concatenate(tables, axis=1),
+            np.concatenate([activation_limit, gamma_limit, heat_limit]),
+            tuple(table.shape[1] for table in tables),
+        )
+
+    @classmethod
+    def from_database(cls, database, elements: list = None) -> "ScoreKernel":
+        """
+        Kernel of ``elements`` (all if None) on the cached subset basis of a ``PropertyDatabase``,
+        which is used as is, without splitting it into tables and concatenating them again.
+        """
+        return cls(database.basis(elements), database.limits, tuple(database.groups.values()))
+
+    def _buffer(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape[0] < shape[0] or buffer.shape[1:] != shape[1:]:
+            buffer = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buffer[:shape[0]]
+
+    def properties(self, fractions: np.ndarray) -> np.ndarray:
+        """
+        Raw properties of ``fractions``, shape (rows, metrics), in a reused buffer.
+        """
+        out = self._buffer("properties", (len(fractions), len(self.limits)), np.float64)
+        return np.matmul(fractions, self.basis, out=out)
+
+    def feasible(self, properties: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of the rows whose every property is strictly below its limit, in a reused buffer.
+        """
+        # Metric by metric: a row-wise reduction over 7 flags is slower than 7 element-wise passes
+        mask = self._buffer("mask", (len(properties),), np.bool_)
+        passing = self._buffer("passing", (len(properties),), np.bool_)
+        np.less(properties[:, 0], self.limits[0], out=mask)
+        for j in range(1, len(self.limits)):
+            np.logical_and(mask, np.less(properties[:, j], self.limits[j], out=passing), out=mask)
+        return mask
+
+    def scores(self, properties: np.ndarray) -> np.ndarray:
+        """
+        Normalised group means followed by CombinedScore, shape (rows, groups + 1), as a new array.
+        """
+        normalised = np.divide(
+            properties, self.limits, out=self._buffer("normalised", properties.shape, np.float64)
+        )
+        scores = np.empty((len(properties), len(self.groups) + 1))
+        start = 0
+        for j, width in enumerate(self.groups):
+            np.add.reduce(normalised[:, start:start + width], axis=1, out=scores[:, j])
+            np.divide(scores[:, j], width, out=scores[:, j])
+            start += width
+        np.add.reduce(scores[:, :-1], axis=1, out=scores[:, -1])
+        np.divide(scores[:, -1], len(self.groups), out=scores[:, -1])
+        return scores
+
+    def __call__(self, fractions: np.ndarray, apply_filter: bool = True) -> tuple:
+        """
+        Score a block of mole fractions.
+
+        Returns:
+            tuple: ``(mask, properties, scores)``, where ``mask`` selects the kept rows of ``fractions``
+                   (None if ``apply_filter`` is False) and ``properties`` and ``scores`` hold one row per
+                   kept composition.
+        """
+        properties = self.properties(fractions)
+        mask = None
+        if apply_filter:
+            mask = self.feasible(properties)
+            properties = properties[mask]
+        return mask, properties, self.scores(properties)
+
+
+def screen_frame(
+    df: "pd.DataFrame",
+    compositions: np.ndarray,
+    kernel: ScoreKernel,
+    apply_filter: bool = True,
+    property_columns: list = PROPERTY_COLUMNS,
+) -> "pd.DataFrame":
+    """
+    Score one block of compositions and, optionally, keep only the rows passing every limit.
+
+    Parameters:
+        df (pd.DataFrame): Rows to score, aligned with ``compositions``.
+        compositions (np.ndarray): Mole fractions of the used elements, shape (rows, elements).
+        kernel (ScoreKernel): Scoring kernel of the used elements.
+        apply_filter (bool): Drop the rows with any property at or above its limit.
+        property_columns (list): Names of the 7 raw property columns.
+
+    Returns:
+        pd.DataFrame: The kept rows of ``df`` with the calculated columns appended.
+    """
+    mask, properties, scores = kernel(compositions, apply_filter)
+    if apply_filter:
+        df = df[mask].copy()
+    calculated = np.concatenate([properties, scores], axis=1)
+    for j, column in enumerate(property_columns + SCORE_COLUMNS):
+        df[column] = calculated[:, j]
+    return df
+
+
+def screen_compositions(
+    compositions: Compositions,
+    elements: list,
+    kernel: ScoreKernel,
+    apply_filter: bool = True,
+    property_columns: list = PROPERTY_COLUMNS,
+) -> "pd.DataFrame":
+    """
+    Screen a block of integer lattice compositions and return the passing alloys.
+
+    Numerators are only turned into fractions for the property matmul, and a DataFrame is only built
+    for the rows that are kept.
+
+    Parameters:
+        compositions (Compositions): Compositions to screen.
+        elements (list): Elements of ``compositions`` matching the basis rows of ``kernel``.
+        kernel (ScoreKernel): Scoring kernel of ``elements``.
+        apply_filter (bool): Drop the rows with any property at or above its limit.
+        property_columns (list): Names of the 7 raw property columns.
+
+    Returns:
+        pd.DataFrame: Mole fractions of the kept alloys (all elements of ``compositions``) followed by
+                      their calculated columns.
+    """
+    positions = [compositions.elements.index(e) for e in elements]
+    fractions = compositions.numerators[:, positions] / compositions.num_division
+    mask, properties, scores = kernel(fractions, apply_filter)
+    if apply_filter:
+        compositions = compositions[mask]
+    import pandas as pd
+    return pd.DataFrame(
+        np.concatenate([compositions.fractions(), properties, scores], axis=1),
+        columns=compositions.elements + property_columns + SCORE_COLUMNS,
+    )
+
+
+def screen_file(
+    input_file: str,
+    output_file: str,
+    master_elements: list,
+    activation_data: np.ndarray,
+    gamma_data: np.ndarray,
+    heat_data: np.ndarray,
+    activation_limit: np.ndarray,
+    gamma_limit: np.ndarray,
+    heat_limit: np.ndarray,
+    elements: list = None,
+    chunksize: int = 1_000_000,
+    apply_filter: bool = True,
+    property_columns: list = PROPERTY_COLUMNS,
+    verbose: bool = True,
+    selectors: list = (),
+) -> dict:
+    """
+    Screen a composition file in fixed-size chunks and append the scored rows to ``output_file``.
+
+    Only one chunk of compositions and its properties are held in memory at a time, so memory use
+    is bounded by ``chunksize`` regardless of the size of the input file.
+
+    Parameters:
+        input_file (str): ``.csv`` or ``.parquet`` file with one column per element (mole fractions), or
+                          ``.npy`` composition file (see ``table_io.py``).
+        output_file (str): ``.csv`` or ``.parquet`` file written with the input columns followed by the
+                           calculated columns.
+        master_elements (list): Element order of the rows of the property tables.
+        activation_data, gamma_data, heat_data (np.ndarray): Property tables, one row per master element.
+        activation_limit, gamma_limit, heat_limit (np.ndarray): Limits used for filtering and normalisation.
+        elements (list): Element columns to use. If None, every master element present in the file is used.
+        chunksize (int): Number of rows read per chunk. If None, the whole file is read at once.
+        apply_filter (bool): Keep only rows with every property below its limit. If False, all rows are written.
+        property_columns (list): Names of the 7 raw property columns.
+        verbose (bool): Print throughput after every chunk.
+        selectors (list): Objects updated with every written chunk, e.g. ``selection.TopK`` to keep the
+                          best alloys or ``pareto.ParetoFront`` to keep the non-dominated ones.
+
+    Returns:
+        dict: ``rows_in``, ``rows_out``, ``seconds``, ``rows_per_sec`` and the ``elements`` used.
+    """
+    if chunksize is not None and chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+
+    columns = read_columns(input_file)
+    if elements is None:
+        elements = [e for e in master_elements if e in columns]
+    else:
+        elements = [e for e in elements if e in columns]
+    if not elements:
+        raise ValueError("No recognized element columns found in the input file.")
+
+    # The element contributions are summed in master order whatever the order of `elements`, as in
+    # pipeline.py, so a composition gets the same bits from every screening route
+    kernel_elements = sorted(elements, key=master_elements.index)
+    indices = [master_elements.index(e) for e in kernel_elements]
+    kernel = ScoreKernel.from_tables(
+        activation_data[indices], gamma_data[indices], heat_data[indices],
+        activation_limit, gamma_limit, heat_limit,
+    )
+
+    calculated_columns = property_columns + SCORE_COLUMNS
+    output_columns = columns + [c for c in calculated_columns if c not in columns]
+
+    tic = time.time()
+    rows_in = rows_out = 0
+    if file_format(input_file) == "npy":
+        # Integer lattice compositions are screened without building a DataFrame of every row
+        blocks = iter_compositions(input_file, chunksize)
+        def screen(block):
+            return screen_compositions(block, kernel_elements, kernel, apply_filter, property_columns)
+    else:
+        blocks = iter_table(input_file, chunksize)
+        def screen(chunk):
+            return screen_frame(chunk, chunk[kernel_elements].to_numpy(), kernel, apply_filter, property_columns)
+
+    with profiling.stage("screen_file") as profiled, TableWriter(output_file, output_columns) as writer:
+        for block in profiling.iterate(blocks, "read"):
+            rows_in += len(block)
+            with profiling.stage("score", rows_in=len(block)) as record:
+                chunk = screen(block)
+                record.rows_out = len(chunk)
+            with profiling.stage("write", rows_in=len(chunk)):
+                writer.write(chunk)
+            with profiling.stage("select", rows_in=len(chunk)):
+                for selector in selectors:
+                    selector.update(chunk)
+
+            rows_out += len(chunk)
+            if verbose:
+                elapsed = time.time() - tic
+                print(f"{rows_in} rows screened | {rows_out} kept | {rows_in / max(elapsed, 1e-9):,.0f} rows/s")
+        profiled.rows_in, profiled.rows_out = rows_in, rows_out
+    profiled.add_file(output_file)
+
+    seconds = time.time() - tic
+    return {
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "seconds": seconds,
+        "rows_per_sec": rows_in / max(seconds, 1e-9),
+        "elements": elements,
+    }
+
+
+def screen_and_select(
+    input_file: str,
+    output_file: str,
+    dataset: str = "unified",
+    elements: list = None,
+    chunksize: int = 1_000_000,
+    apply_filter: bool = True,
+    top_k: int = None,
+    best_file: str = None,
+    pareto_file: str = None,
+    verbose: bool = True,
+    limits: tuple = None,
+    sort_output: bool = False,
+) -> dict:
+    """
+    Screen a composition file against one property dataset and keep the best and non-dominated alloys.
+
+    The workflow of ``unifiedAct.py`` (``"unified"`` data, filtered) and ``Nuclear.py`` (``"relative"``
+    data, every row kept) as one call. The best alloys and the Pareto front are selected chunk by
+    chunk while screening, and only written if some alloy passed.
+
+    Parameters:
+        input_file (str): ``.csv``, ``.parquet`` or ``.npy`` composition file.
+        output_file (str): ``.csv`` or ``.parquet`` file receiving the scored rows.
+        dataset (str): Dataset of ``data/nuclear_properties.json`` giving the properties and limits.
+        elements (list): Element columns to use. If None, every master element present in the file is used.
+        chunksize (int): Number of rows read per chunk. If None, the whole file is read at once.
+        apply_filter (bool): Keep only rows with every property below its limit.
+        top_k (int): Number of best alloys (lowest CombinedScore) to keep; None keeps none.
+        best_file (str): ``.csv`` or ``.parquet`` file receiving the best alloys, best first.
+        pareto_file (str): ``.csv`` or ``.parquet`` file receiving the alloys not dominated in
+                           normalised activation, gamma and heat; None skips the Pareto front.
+        verbose (bool): Print throughput after every chunk.
+        limits (tuple): ``(activation_limit, gamma_limit, heat_limit)`` used for filtering and
+                        normalisation instead of the limits of the dataset.
+        sort_output (bool): Rewrite ``output_file`` sorted by CombinedScore, best first, as the original
+                            ``unifiedAct.py`` did. The scored rows must then fit in memory; otherwise
+                            they are written in input order and only ``best_file`` is sorted.
+
+    Returns:
+        dict: The statistics of ``screen_file``, with the ``best`` and ``pareto`` DataFrames (None if
+              not requested).
+    """
+    from pareto import ParetoFront
+    from selection import TopK
+    from table_io import read_table, write_table
+
+    database = load_database(dataset)
+    selector = TopK(top_k, ["CombinedScore"]) if top_k else None
+    front = ParetoFront(SCORE_COLUMNS[:3]) if pareto_file else None
+    stats = screen_file(
+        input_file, output_file, database.elements,
+        *database.tables(), *(database.limit_tables() if limits is None else limits),
+        elements=elements,
+        chunksize=chunksize,
+        apply_filter=apply_filter,
+        property_columns=database.columns,
+        verbose=verbose,
+        selectors=[s for s in (selector, front) if s is not None],
+    )
+    stats["best"] = selector.result("CombinedScore") if selector else None
+    stats["pareto"] = front.result() if front else None
+    if stats["rows_out"]:
+        if sort_output:
+            with profiling.stage("sort_output", rows_in=stats["rows_out"]) as stage:
+                results = read_table(output_file).sort_values("CombinedScore", kind="stable")
+                write_table(results, output_file)
+                stage.add_file(output_file)
+        if best_file and stats["best"] is not None:
+            with profiling.stage("write_best", rows_in=len(stats["best"])) as stage:
+                write_table(stats["best"], best_file)
+                stage.add_file(best_file)
+        if stats["pareto"] is not None:
+            with profiling.stage("write_pareto", rows_in=len(stats["pareto"])) as stage:
+                write_table(stats["pareto"], pareto_file)
+                stage.add_file(pareto_file)
+    return stats
@@ -0,0 +1,340 @@
+import argparse
+import heapq
+import itertools
+import os
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from compositions import Compositions
+from graph import load_graph
+from lattice import bounded_lattice_size, limit_bounds, numerator_dtype, transfer_moves
+from screening import DATABASE, PROPERTY_COLUMNS, SCORE_COLUMNS, ScoreKernel
+from table_io import load_compositions, write_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Search strategies of ``LocalSearch.run``
+METHODS = ("hill", "best")
+
+
+class GraphSpace:
+    """
+    Composition space given explicitly by its nodes and their neighbor graph, e.g. a nimplex space.
+
+    Nodes are identified by their row in ``compositions``.
+
+    Parameters:
+        compositions (Compositions): Composition of every node.
+        graph (graph.NeighborGraph): Neighbors of every node.
+    """
+
+    def __init__(self, compositions: Compositions, graph):
+        if len(compositions) != len(graph):
+            raise ValueError(f"Graph has {len(graph)} nodes but the space has {len(compositions)} compositions.")
+        self.compositions = compositions
+        self.graph = graph
+        self.elements = compositions.elements
+        self.num_division = compositions.num_division
+
+    @classmethod
+    def load(cls, path: str) -> "GraphSpace":
+        """
+        Memory-map a ``.npy`` space and its ``_neighbors`` graph written by ``generate_nimplex.py``.
+        """
+        return cls(load_compositions(path), load_graph(os.path.splitext(path)[0] + "_neighbors"))
+
+    def __len__(self) -> int:
+        return len(self.compositions)
+
+    def numerators(self, nodes: list) -> np.ndarray:
+        return np.asarray(self.compositions.numerators[np.asarray(nodes, dtype=np.int64)])
+
+    def neighbors(self, node) -> list:
+        return self.graph.neighbors(node).tolist()
+
+    def random_nodes(self, count: int, rng: np.random.Generator) -> list:
+        return rng.choice(len(self), size=min(count, len(self)), replace=False).tolist()
+
+
+class LatticeSpace:
+    """
+    Simplex lattice of ``elements`` with ``num_division`` divisions, never enumerated.
+
+    Nodes are identified by the bytes of their numerator row, and the neighbors of a node (one
+    division moved from one element to another, as in nimplex graphs) are generated on demand, so
+    spaces far too large to enumerate can be searched.
+
+    Parameters:
+        elements (list): Element symbols.
+        num_division (int): Number of divisions.
+        limits (list): Optional ``[min, max]`` mole fraction of each element.
+    """
+
+    def __init__(self, elements: list, num_division: int, limits: list = None):
+        if num_division <= 0:
+            raise ValueError("Number of divisions must be a positive integer.")
+        limits = [[0, 1]] * len(elements) if limits is None else limits
+        if len(limits) != len(elements) or any(len(l) != 2 or l[0] > l[1] for l in limits):
+            raise ValueError("Limits must be one [min, max] pair per element.")
+        self.elements = list(elements)
+        self.num_division = num_division
+        self.dtype = numerator_dtype(num_division)
+        self.lower, self.upper = limit_bounds(num_division, limits)
+        if self.lower.sum() > num_division or self.upper.sum() < num_division:
+            raise ValueError("No composition satisfies the limits.")
+        self._moves = transfer_moves(len(elements))
+
+    def __len__(self) -> int:
+        # Counted from the numerator bounds, so it is exact with limits too
+        return bounded_lattice_size(self.num_division, self.lower, self.upper)
+
+    def node(self, numerators) -> bytes:
+        """
+        Node of a numerator row.
+        """
+        row = np.asarray(numerators, dtype=np.int64)
+        if row.sum() != self.num_division or (row < self.lower).any() or (row > self.upper).any():
+            raise ValueError(f"{row.tolist()} is not a composition of the space.")
+        return row.astype(self.dtype).tobytes()
+
+    def numerators(self, nodes: list) -> np.ndarray:
+        return np.frombuffer(b"".join(nodes), dtype=self.dtype).reshape(len(nodes), len(self.elements))
+
+    def neighbors(self, node) -> list:
+        moved = np.frombuffer(node, dtype=self.dtype).astype(np.int64) + self._moves
+        moved = moved[((moved >= self.lower) & (moved <= self.upper)).all(axis=1)].astype(self.dtype)
+        return [row.tobytes() for row in moved]
+
+    def random_nodes(self, count: int, rng: np.random.Generator, max_tries: int = 1000) -> list:
+        """
+        Up to ``count`` distinct compositions drawn uniformly (stars and bars) within the limits.
+        """
+        dimension = len(self.elements)
+        nodes = {}
+        for _ in range(max_tries):
+            bars = np.sort(rng.random((count, self.num_division + dimension - 1)).argsort(axis=1)[:, :dimension - 1])
+            edges = np.concatenate([np.full((count, 1), -1), bars,
+                                    np.full((count, 1), self.num_division + dimension - 1)], axis=1)
+            rows = np.diff(edges, axis=1) - 1
+            rows = rows[((rows >= self.lower) & (rows <= self.upper)).all(axis=1)]
+            nodes.update(dict.fromkeys(row.astype(self.dtype).tobytes() for row in rows))
+            if len(nodes) >= count:
+                break
+        return list(nodes)[:count]
+
+
+class LocalSearch:
+    """
+    Search a composition space for low CombinedScore alloys by walking its neighbor graph.
+
+    Properties are computed lazily: a node is scored the first time it is reached, in one kernel
+    call per batch of new neighbors, and cached for the rest of the search (and later runs of the
+    same object). Nodes failing any limit are ranked after every feasible node, so searches started
+    outside the feasible region still move towards it.
+
+    Parameters:
+        space (GraphSpace or LatticeSpace): Space to search.
+        kernel (ScoreKernel): Scoring kernel of the elements of ``space``; by default built from the
+                              unified nuclear property data and limits of ``screening.py``.
+        property_columns (list): Names of the 7 raw property columns.
+    """
+
+    def __init__(self, space, kernel: ScoreKernel = None, property_columns: list = PROPERTY_COLUMNS):
+        self.space = space
+        if kernel is None:
+            kernel = ScoreKernel.from_database(DATABASE, space.elements)
+        self.kernel = kernel
+        self.property_columns = list(property_columns)
+        self.evaluations = 0
+        self.seconds = 0.0
+        # node -> (rank, position of its row in the evaluated blocks)
+        self._seen = {}
+        self._nodes = []
+        self._blocks = []
+        self._feasible = []
+
+    def rank(self, node) -> tuple:
+        """
+        ``(infeasible, CombinedScore)`` of an evaluated node; lower is better.
+        """
+        return self._seen[node][0]
+
+    def evaluate(self, nodes: list) -> list:
+        """
+        Score the nodes not evaluated yet and return the rank of every node.
+        """
+        new = list(dict.fromkeys(n for n in nodes if n not in self._seen))
+        if new:
+            fractions = self.space.numerators(new) / self.space.num_division
+            properties = self.kernel.properties(fractions)
+            feasible = self.kernel.feasible(properties).copy()
+            scores = self.kernel.scores(properties)
+            self._blocks.append(np.concatenate([fractions, properties, scores], axis=1))
+            self._feasible.append(feasible)
+            start = len(self._nodes)
+            for i, (node, ok, score) in enumerate(zip(new, feasible.tolist(), scores[:, -1].tolist())):
+                self._seen[node] = ((not ok, score), start + i)
+            self._nodes.extend(new)
+            self.evaluations += 1
+        return [self._seen[n][0] for n in nodes]
+
+    def hill_climb(self, seeds: list) -> list:
+        """
+        Steepest descent from every seed: move to the best neighbor while it improves the rank.
+
+        Returns:
+            list: The local optimum reached from each seed.
+        """
+        optima = []
+        for node in seeds:
+            rank = self.evaluate([node])[0]
+            while True:
+                neighbors = self.space.neighbors(node)
+                if not neighbors:
+                    break
+                ranks = self.evaluate(neighbors)
+                best = min(range(len(neighbors)), key=ranks.__getitem__)
+                if ranks[best] >= rank:
+                    break
+                node, rank = neighbors[best], ranks[best]
+            optima.append(node)
+        return optima
+
+    def best_first(self, seeds: list, max_nodes: int) -> list:
+        """
+        Always expand the best node reached so far, until ``max_nodes`` nodes are evaluated.
+
+        Returns:
+            list: Expanded nodes, in expansion order.
+        """
+        counter = itertools.count()
+        heap = [(rank, next(counter), node) for node, rank in zip(seeds, self.evaluate(seeds))]
+        heapq.heapify(heap)
+        expanded = set()
+        order = []
+        while heap and len(self._seen) < max_nodes:
+            _, _, node = heapq.heappop(heap)
+            if node in expanded:
+                continue
+            expanded.add(node)
+            order.append(node)
+            neighbors = [n for n in self.space.neighbors(node) if n not in self._seen]
+            for neighbor, rank in zip(neighbors, self.evaluate(neighbors)):
+                heapq.heappush(heap, (rank, next(counter), neighbor))
+        return order
+
+    def run(self, method: str = "hill", starts: int = 10, max_nodes: int = 100_000, seed: int = 0,
+            seeds: list = None) -> dict:
+        """
+        Run a multi-start search.
+
+        Parameters:
+            method (str): ``"hill"`` for multi-start hill climbing, ``"best"`` for best-first search.
+            starts (int): Number of random seed nodes, if ``seeds`` is not given.
+            max_nodes (int): Evaluation budget of best-first search.
+            seed (int): Random seed of the seed nodes.
+            seeds (list): Seed nodes (row indices of a ``GraphSpace``, ``LatticeSpace.node`` values).
+
+        Returns:
+            dict: ``visited`` (evaluated nodes), ``total`` (nodes of the space), ``visited_fraction``,
+                  ``feasible`` (evaluated nodes passing every limit), ``evaluations`` (kernel calls),
+                  ``best_score`` and ``seconds``.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown search method '{method}', expected one of {list(METHODS)}.")
+        if seeds is None:
+            seeds = self.space.random_nodes(starts, np.random.default_rng(seed))
+        if not seeds:
+            raise ValueError("No seed node to start the search from.")
+
+        tic = time.time()
+        if method == "hill":
+            self.hill_climb(seeds)
+        else:
+            self.best_first(seeds, max_nodes)
+        self.seconds += time.time() - tic
+        return self.stats()
+
+    def stats(self) -> dict:
+        """
+        Search statistics, see ``run``.
+        """
+        visited = len(self._seen)
+        feasible = [rank for rank, _ in self._seen.values() if not rank[0]]
+        return {
+            "visited": visited,
+            "total": len(self.space),
+            "visited_fraction": visited / max(len(self.space), 1),
+            "feasible": len(feasible),
+            "evaluations": self.evaluations,
+            "best_score": min(feasible)[1] if feasible else None,
+            "seconds": self.seconds,
+        }
+
+    def result(self, apply_filter: bool = True) -> "pd.DataFrame":
+        """
+        Evaluated alloys, best CombinedScore first (ties in visiting order), with their mole fractions,
+        properties and scores; only those passing every limit if ``apply_filter``.
+        """
+        import pandas as pd
+        columns = self.space.elements + self.property_columns + SCORE_COLUMNS
+        if not self._blocks:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(np.concatenate(self._blocks), columns=columns)
+        if apply_filter:
+            df = df[np.concatenate(self._feasible)]
+        return df.sort_values("CombinedScore", kind="stable").reset_index(drop=True)
+
+
+def main(argv: list = None, prog: str = None):
+    """
+    Search a composition space from the command line (``python cli.py search``).
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Search a composition space for low CombinedScore alloys by walking its neighbor graph."
+    )
+    parser.add_argument("--space", help=".npy nimplex space with its _neighbors graph (see generate_nimplex.py)")
+    parser.add_argument("--elements", nargs="+", help="Elements of an implicit simplex lattice, instead of --space")
+    parser.add_argument("--ndiv", type=int, default=100, help="Divisions of the implicit lattice (default: %(default)s)")
+    parser.add_argument("--limit", type=float, nargs="+",
+                        help="Min and max of each element of the implicit lattice, [min1 max1 min2 max2 ...]")
+    parser.add_argument("--method", choices=METHODS, default="hill",
+                        help="Multi-start hill climbing or best-first search (default: %(default)s)")
+    parser.add_argument("--starts", type=int, default=10, help="Number of random seed nodes (default: %(default)s)")
+    parser.add_argument("--max-nodes", type=int, default=100_000,
+                        help="Evaluation budget of best-first search (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: %(default)s)")
+    parser.add_argument("--output", default="searched_nuclear_alloys.csv",
+                        help="Feasible visited alloys, best first (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if (args.space is None) == (args.elements is None):
+        parser.error("Give either --space or --elements.")
+    if args.space is not None:
+        space = GraphSpace.load(args.space)
+    else:
+        limits = None
+        if args.limit is not None:
+            if len(args.limit) != 2 * len(args.elements):
+                parser.error("Limit must have 2 values per element (min and max).")
+            limits = [args.limit[i * 2:(i + 1) * 2] for i in range(len(args.elements))]
+        space = LatticeSpace(args.elements, args.ndiv, limits)
+
+    search = LocalSearch(space)
+    stats = search.run(args.method, args.starts, args.max_nodes, args.seed)
+    result = search.result()
+    write_table(result, args.output)
+    print(f"Visited {stats['visited']:,} of {stats['total']:,} nodes ({100 * stats['visited_fraction']:.3g}%), "
+          f"{stats['feasible']:,} feasible, in {stats['seconds']:.2f}s")
+    if len(result):
+        print(f"Best CombinedScore: {stats['best_score']:.6f}")
+        print(result.head(10).to_string())
+    print(f"Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
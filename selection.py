@@ -0,0 +1,144 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def smallest(scores: np.ndarray, order: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the ``k`` smallest ``scores``, sorted by score, ties broken by ``order``.
+
+    Uses ``np.argpartition``-style selection, so it runs in O(N + k log k) time; the result is the
+    same as the first ``k`` rows of a stable sort of rows in ``order`` by score. NaN scores rank last.
+
+    Parameters:
+        scores (np.ndarray): Scores of N rows.
+        order (np.ndarray): Distinct position of each row in the stream, used for ties.
+        k (int): Number of rows to keep.
+
+    Returns:
+        np.ndarray: Row indices, best first.
+    """
+    scores = np.where(np.isnan(scores), np.inf, scores)
+    candidates = np.arange(len(scores))
+    if len(scores) > k:
+        threshold = np.partition(scores, k - 1)[k - 1]
+        below = np.flatnonzero(scores < threshold)
+        ties = np.flatnonzero(scores == threshold)
+        ties = ties[np.argsort(order[ties], kind="stable")[:k - len(below)]]
+        candidates = np.concatenate([below, ties])
+    return candidates[np.lexsort((order[candidates], scores[candidates]))]
+
+
+def subsystem_keys(compositions: np.ndarray) -> np.ndarray:
+    """
+    Integer key of the subsystem of every composition: bit ``j`` is set if element ``j`` is present.
+    """
+    present = np.asarray(compositions) > 0
+    return present.astype(np.int64) @ (np.int64(1) << np.arange(present.shape[1], dtype=np.int64))
+
+
+class TopK:
+    """
+    Keep the ``k`` best rows of a stream of screened chunks, per score column and optionally per subsystem.
+
+    Each chunk is reduced to its own ``k`` best rows by partial selection and merged with the rows
+    kept so far, so a stream of N rows is processed in O(N + k log k) time per chunk and O(k) memory
+    per score (and subsystem), without sorting the whole result set. Ties are broken by arrival
+    order, so the selection equals the head of a stable sort of the concatenated chunks.
+
+    Chunks can come from any source, e.g. ``screening.screen_file`` or the process pool of
+    ``pipeline.py``; selectors filled separately (e.g. by different workers) are combined with ``merge``.
+
+    Parameters:
+        k (int): Number of rows to keep per score (and subsystem).
+        score_columns (list): Columns to rank by, each with its own selection.
+        largest (bool): Keep the highest scores instead of the lowest.
+        subsystem_columns (list): If given, element columns defining subsystems (the set of elements
+                                  present); the ``k`` best rows of every subsystem are kept.
+    """
+
+    def __init__(
+        self,
+        k: int,
+        score_columns: list = ("CombinedScore",),
+        largest: bool = False,
+        subsystem_columns: list = None,
+    ):
+        if k <= 0:
+            raise ValueError("Number of selected rows must be a positive integer.")
+        self.k = k
+        self.score_columns = list(score_columns)
+        self.largest = largest
+        self.subsystem_columns = list(subsystem_columns) if subsystem_columns else None
+        self.rows = 0
+        self.columns = None
+        # Per score column: {subsystem key: (kept rows, their positions in the stream)}
+        self._kept = {column: {} for column in self.score_columns}
+
+    def _scores(self, df: "pd.DataFrame", column: str) -> np.ndarray:
+        scores = df[column].to_numpy(dtype=np.float64)
+        return -scores if self.largest else scores
+
+    def _merge(self, column: str, key, df: "pd.DataFrame", order: np.ndarray):
+        import pandas as pd
+        if key in self._kept[column]:
+            kept, kept_order = self._kept[column][key]
+            df = pd.concat([kept, df], ignore_index=True)
+            order = np.concatenate([kept_order, order])
+        index = smallest(self._scores(df, column), order, self.k)
+        self._kept[column][key] = (df.iloc[index].reset_index(drop=True), order[index])
+
+    def update(self, df: "pd.DataFrame"):
+        """
+        Add a chunk of scored rows.
+        """
+        import pandas as pd
+        order = np.arange(self.rows, self.rows + len(df))
+        self.rows += len(df)
+        self.columns = self.columns or df.columns.tolist()
+        if len(df) == 0:
+            return
+        if self.subsystem_columns:
+            groups = pd.Series(np.arange(len(df))).groupby(
+                subsystem_keys(df[self.subsystem_columns].to_numpy()), sort=False
+            ).indices
+        else:
+            groups = {0: np.arange(len(df))}
+
+        for column in self.score_columns:
+            scores = self._scores(df, column)
+            for key, rows in groups.items():
+                best = rows[smallest(scores[rows], order[rows], self.k)]
+                self._merge(column, key, df.iloc[best].reset_index(drop=True), order[best])
+
+    def merge(self, other: "TopK"):
+        """
+        Add the rows kept by another selector, as if its chunks had arrived after this one's.
+        """
+        if (other.k, other.score_columns, other.largest, other.subsystem_columns) != \
+                (self.k, self.score_columns, self.largest, self.subsystem_columns):
+            raise ValueError("Only selectors with the same settings can be merged.")
+        for column in self.score_columns:
+            for key, (kept, kept_order) in other._kept[column].items():
+                self._merge(column, key, kept, kept_order + self.rows)
+        self.rows += other.rows
+        self.columns = self.columns or other.columns
+
+    def result(self, column: str = None) -> "pd.DataFrame":
+        """
+        Kept rows of one score column (the first if None), best first.
+
+        In per-subsystem mode, subsystems are listed in the order they were first seen, each with its
+        rows best first.
+        """
+        import pandas as pd
+        column = column or self.score_columns[0]
+        if column not in self._kept:
+            raise ValueError(f"Rows were not selected by '{column}'.")
+        kept = self._kept[column]
+        if not kept:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat([df for df, _ in kept.values()], ignore_index=True)
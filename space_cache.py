@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from compositions import Compositions
+from graph import graph_paths, load_graph, write_graph
+from lattice import multi_system_lattice
+from table_io import header_path, load_compositions, write_compositions
+
+# Cache directory, overridden by the ALLOY_SPACE_CACHE environment variable
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ALLOY_SPACE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "alloy-design", "spaces")
+)
+
+# Total size of the cached spaces above which the least recently used ones are evicted
+DEFAULT_MAX_BYTES = 4 << 30
+
+# Bumped whenever the stored layout changes, so that old entries are never read
+CACHE_VERSION = 1
+
+
+def space_key(kind: str, elements: list, num_division: int, limits: list = None, **params) -> str:
+    """
+    Content address of a composition space: the SHA-256 of its canonical description.
+
+    Parameters:
+        kind (str): Generator of the space, e.g. ``"nimplex"`` or ``"multi_system"``.
+        elements (list): Element symbols, in column order.
+        num_division (int): Number of divisions.
+        limits (list): ``[min, max]`` mole fraction of each element, if the space is limited.
+        **params: Other generator parameters, e.g. the subsystem ``order``.
+    """
+    description = {
+        "version": CACHE_VERSION,
+        "kind": kind,
+        "elements": list(elements),
+        "num_division": int(num_division),
+        "limits": None if limits is None else [[float(low), float(high)] for low, high in limits],
+        **params,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class SpaceCache:
+    """
+    Content-addressed disk cache of composition spaces with a least-recently-used size cap.
+
+    Every entry is a ``.npy`` composition file (integer numerators and JSON header, see
+    ``table_io.py``) named after its ``space_key``, optionally with its CSR neighbor graph (see
+    ``graph.py``). A hit memory-maps the stored arrays, so it takes milliseconds whatever the size of
+    the space. Entries are written to a temporary directory and moved into place header last, so a
+    partially written entry is never read. Whenever an entry is added, the least recently used
+    entries are deleted until the cache fits in ``max_bytes``.
+
+    Parameters:
+        directory (str): Cache directory, created if needed.
+        max_bytes (int): Size cap of the cache.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError("Cache size cap must be a positive number of bytes.")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """
+        Path of the ``.npy`` composition file of an entry.
+        """
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def _files(self, key: str) -> list:
+        path = self.path(key)
+        return [path, header_path(path), *graph_paths(os.path.splitext(path)[0] + "_neighbors")]
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(header_path(self.path(key)))
+
+    def get(self, key: str) -> tuple:
+        """
+        Memory-map an entry and mark it as used.
+
+        Returns:
+            tuple: ``(compositions, graph)``, the ``Compositions`` of the space and its
+                   ``NeighborGraph`` (None if the entry has no graph), or None on a miss.
+        """
+        if key not in self:
+            return None
+        path = self.path(key)
+        for filename in self._files(key):
+            if os.path.exists(filename):
+                os.utime(filename)
+        graph_path = os.path.splitext(path)[0] + "_neighbors"
+        graph = load_graph(graph_path) if os.path.exists(graph_paths(graph_path)[0]) else None
+        return load_compositions(path), graph
+
+    def put(self, key: str, numerators: np.ndarray, elements: list, num_division: int,
+            neighbor_lists: list = None) -> tuple:
+        """
+        Store a space (and its neighbor lists), evict old entries and return the entry as ``get`` does.
+        """
+        staging = tempfile.mkdtemp(dir=self.directory, prefix=".staging-")
+        try:
+            staged = os.path.join(staging, f"{key}.npy")
+            write_compositions(staged, numerators, elements, num_division)
+            if neighbor_lists is not None:
+                write_graph(os.path.splitext(staged)[0] + "_neighbors", neighbor_lists)
+            # Header last: an entry exists once its header does
+            header = header_path(self.path(key))
+            for filename in self._files(key):
+                source = os.path.join(staging, os.path.basename(filename))
+                if filename != header and os.path.exists(source):
+                    os.replace(source, filename)
+            os.replace(header_path(staged), header)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict(keep=key)
+        return self.get(key)
+
+    def entries(self) -> list:
+        """
+        ``(key, size in bytes, last use time)`` of every entry, least recently used first.
+        """
+        entries = []
+        for filename in os.listdir(self.directory):
+            key, extension = os.path.splitext(filename)
+            if extension != ".json" or key.startswith("."):
+                continue
+            files = [f for f in self._files(key) if os.path.exists(f)]
+            entries.append((key, sum(os.path.getsize(f) for f in files), max(os.path.getmtime(f) for f in files)))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self) -> int:
+        """
+        Total size of the cached entries, in bytes.
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def remove(self, key: str):
+        """
+        Delete an entry (header first, so that it is never read half-deleted).
+        """
+        header = header_path(self.path(key))
+        if os.path.exists(header):
+            os.remove(header)
+        for filename in self._files(key):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def evict(self, keep: str = None) -> list:
+        """
+        Delete least recently used entries (except ``keep``) until the cache fits in ``max_bytes``.
+
+        Returns:
+            list: Keys of the deleted entries.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total -= size
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        """
+        Delete every entry.
+        """
+        for key, _, _ in self.entries():
+            self.remove(key)
+
+
+def cached_multi_system_lattice(elements: list, order: int, num_division: int, cache: SpaceCache = None,
+                                constraints=None) -> Compositions:
+    """
+    ``lattice.multi_system_lattice`` of ``elements`` as memory-mapped ``Compositions``, enumerated
+    only on the first call for a given (elements, order, num_division, constraints).
+
+    ``constraints`` is an optional ``constraints.LinearConstraints``; the constrained space is
+    enumerated directly and cached under its own key.
+    """
+    cache = cache or SpaceCache()
+    params = {"order": int(order)}
+    if constraints is not None and len(constraints):
+        params["constraints"] = list(constraints.constraints)
+    else:
+        constraints = None
+    key = space_key("multi_system", elements, num_division, **params)
+    entry = cache.get(key)
+    if entry is None:
+        numerators = multi_system_lattice(len(elements), order, num_division, constraints=constraints)
+        entry = cache.put(key, numerators, elements, num_division)
+    return entry[0]
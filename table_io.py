@@ -0,0 +1,282 @@
+import json
+import os
+import shutil
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from compositions import Compositions
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Supported file formats, selected by file extension
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".npy": "npy"}
+
+
+def file_format(path: str) -> str:
+    """
+    Format of a composition or results file, from its extension.
+
+    Returns:
+        str: ``"csv"``, ``"parquet"`` or ``"npy"``.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported file format '{extension}', expected one of {list(FORMATS)}.")
+    return FORMATS[extension]
+
+
+def header_path(path: str) -> str:
+    """
+    Path of the JSON header stored next to a ``.npy`` composition file.
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+def read_header(path: str) -> dict:
+    """
+    Read the JSON header (``elements``, ``num_division``) of a ``.npy`` composition file.
+    """
+    with open(header_path(path)) as f:
+        return json.load(f)
+
+
+def write_header(path: str, elements: list, num_division: int, **extra):
+    """
+    Write the JSON header of a ``.npy`` composition file.
+    """
+    with open(header_path(path), "w") as f:
+        json.dump({"elements": list(elements), "num_division": int(num_division), **extra}, f, indent=2)
+
+
+def load_numerators(path: str, mmap: bool = True) -> tuple:
+    """
+    Load the integer numerators of a ``.npy`` composition file.
+
+    Parameters:
+        path (str): ``.npy`` file written by ``write_compositions`` or ``CompositionWriter``.
+        mmap (bool): Memory-map the file instead of reading it, so loading is zero-copy and rows are
+                     only paged in when accessed.
+
+    Returns:
+        tuple: ``(numerators, header)``, the (rows, elements) integer array and the header dict.
+    """
+    if file_format(path) != "npy":
+        raise ValueError(f"Integer numerators are only stored in .npy files, got '{path}'.")
+    return np.load(path, mmap_mode="r" if mmap else None), read_header(path)
+
+
+def load_compositions(path: str, mmap: bool = True) -> Compositions:
+    """
+    Load a ``.npy`` composition file as ``Compositions``, memory-mapped by default (see ``load_numerators``).
+    """
+    numerators, header = load_numerators(path, mmap)
+    return Compositions(numerators, header["num_division"], header["elements"])
+
+
+def iter_compositions(path: str, chunksize: int = None):
+    """
+    Read a ``.npy`` composition file as ``Compositions`` blocks of at most ``chunksize`` rows.
+
+    The file is memory-mapped, so each block is a zero-copy view until it is used.
+    """
+    if chunksize is not None and chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    compositions = load_compositions(path)
+    step = chunksize or max(len(compositions), 1)
+    for start in range(0, max(len(compositions), 1), step):
+        yield compositions[start:start + step]
+
+
+def assemble_npy(path: str, dtype: np.dtype, shape: tuple):
+    """
+    Turn the raw C-order rows streamed to ``path + ".part"`` into the ``.npy`` file ``path``.
+
+    Streamed writers only know the shape of the array once every row is written, so the ``.npy``
+    header is written last and the ``.part`` file is removed.
+    """
+    with open(path, "wb") as f:
+        np.lib.format.write_array_header_1_0(
+            f, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": shape}
+        )
+        with open(path + ".part", "rb") as raw:
+            shutil.copyfileobj(raw, f)
+    os.remove(path + ".part")
+
+
+def write_compositions(path: str, numerators: np.ndarray, elements: list, num_division: int):
+    """
+    Write a composition space in the format given by the extension of ``path``.
+
+    ``.npy`` stores the integer numerators as is with a JSON header; ``.csv`` and ``.parquet`` store
+    mole fractions, one column per element.
+    """
+    with CompositionWriter(path, elements, num_division) as writer:
+        writer.write(numerators)
+
+
+def read_columns(path: str) -> list:
+    """
+    Column names of a composition or results file, without reading its rows.
+    """
+    fmt = file_format(path)
+    if fmt == "npy":
+        return read_header(path)["elements"]
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    import pandas as pd
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def iter_table(path: str, chunksize: int = None, columns: list = None):
+    """
+    Read a composition or results file as DataFrames of at most ``chunksize`` rows.
+
+    ``.npy`` composition files are memory-mapped and converted to mole fractions one chunk at a time.
+
+    Parameters:
+        path (str): ``.csv``, ``.parquet`` or ``.npy`` file.
+        chunksize (int): Number of rows per chunk. If None, the whole file is returned as one chunk.
+        columns (list): Columns to read, in this order; None reads every column. Parquet files only
+                        decode the requested columns.
+
+    Yields:
+        pd.DataFrame: Consecutive rows of the file.
+    """
+    if chunksize is not None and chunksize <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+    if columns is not None:
+        columns = list(columns)
+        missing = [c for c in columns if c not in read_columns(path)]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in '{path}'.")
+    fmt = file_format(path)
+    import pandas as pd
+    if fmt == "npy":
+        for compositions in iter_compositions(path, chunksize):
+            df = compositions.to_frame()
+            yield df if columns is None else df[columns]
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        if chunksize is None:
+            yield pd.read_parquet(path, columns=columns)
+        else:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+    elif chunksize is None:
+        df = pd.read_csv(path, usecols=columns)
+        yield df if columns is None else df[columns]
+    else:
+        for df in pd.read_csv(path, chunksize=chunksize, usecols=columns):
+            yield df if columns is None else df[columns]
+
+
+def read_table(path: str) -> "pd.DataFrame":
+    """
+    Read a whole composition or results file as a DataFrame.
+    """
+    return next(iter_table(path))
+
+
+def write_table(df: "pd.DataFrame", path: str):
+    """
+    Write a results DataFrame as ``.csv`` or ``.parquet``.
+    """
+    with TableWriter(path, df.columns.tolist()) as writer:
+        writer.write(df)
+
+
+class TableWriter:
+    """
+    Append DataFrames with fixed columns to a ``.csv`` or ``.parquet`` file, chunk by chunk.
+
+    The file is created with its header (or schema) when the writer is opened, so it exists even if no
+    rows are written.
+    """
+
+    def __init__(self, path: str, columns: list):
+        self.path = path
+        self.columns = list(columns)
+        self.format = file_format(path)
+        if self.format == "npy":
+            raise ValueError("Results tables can only be written as .csv or .parquet; use CompositionWriter for .npy.")
+        self._parquet = None
+        if self.format == "csv":
+            import pandas as pd
+            pd.DataFrame(columns=self.columns).to_csv(path, index=False)
+
+    def write(self, df: "pd.DataFrame"):
+        df = df[self.columns]
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a", header=False, index=False)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+
+    def close(self):
+        if self.format == "parquet":
+            if self._parquet is None:
+                import pandas as pd
+                pd.DataFrame({c: pd.Series(dtype=float) for c in self.columns}).to_parquet(self.path, index=False)
+            else:
+                self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CompositionWriter:
+    """
+    Append blocks of integer composition numerators to a ``.npy``, ``.parquet`` or ``.csv`` file.
+
+    ``.npy`` files keep the integer numerators and get a JSON header with the element list and the
+    number of divisions; rows are streamed to a temporary file and the ``.npy`` header is written on
+    ``close``, once the row count is known. ``.csv`` and ``.parquet`` files store mole fractions.
+    """
+
+    def __init__(self, path: str, elements: list, num_division: int):
+        self.path = path
+        self.elements = list(elements)
+        self.num_division = num_division
+        self.format = file_format(path)
+        self.rows = 0
+        self.dtype = None
+        if self.format == "npy":
+            self._raw = open(path + ".part", "wb")
+        else:
+            self._table = TableWriter(path, self.elements)
+
+    def write(self, numerators):
+        if isinstance(numerators, Compositions):
+            numerators = numerators.numerators
+        if self.format != "npy":
+            import pandas as pd
+            self._table.write(pd.DataFrame(numerators / self.num_division, columns=self.elements))
+            return
+        if self.dtype is None:
+            self.dtype = numerators.dtype
+        self._raw.write(np.ascontiguousarray(numerators, dtype=self.dtype).tobytes())
+        self.rows += len(numerators)
+
+    def close(self):
+        if self.format != "npy":
+            self._table.close()
+            return
+        self._raw.close()
+        assemble_npy(self.path, self.dtype or np.dtype(np.uint8), (self.rows, len(self.elements)))
+        write_header(self.path, self.elements, self.num_division)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cli import main
+from lattice import multi_system_lattice
+from table_io import load_numerators
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_help_imports_no_heavy_module(self):
+        code = (
+            "import sys, contextlib, io\n"
+            "from cli import COMMANDS, MODULE_COMMANDS, main\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    for argv in [['--help']] + [[name, '--help'] for name in {**COMMANDS, **MODULE_COMMANDS}]:\n"
+            "        try:\n"
+            "            main(argv)\n"
+            "        except SystemExit:\n"
+            "            pass\n"
+            "print(sorted(m for m in ('pandas', 'matplotlib', 'plotly', 'nimplex') if m in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_generate_then_screen(self):
+        compositions = self.path("compositions.npy")
+        main(["generate", "Ti", "V", "Ta", "Nb", "--order", "3", "--ndiv", "10", "--output", compositions, "--no-cache"])
+        numerators, header = load_numerators(compositions)
+        np.testing.assert_array_equal(numerators, multi_system_lattice(4, 3, 10))
+        self.assertEqual(header["elements"], ["Ti", "V", "Ta", "Nb"])
+
+        results, best = self.path("results.csv"), self.path("best.csv")
+        main(["screen", compositions, results, "--no-filter", "--best", best, "--top-k", "5"])
+        df = pd.read_csv(results)
+        self.assertEqual(len(df), len(numerators))
+        pd.testing.assert_frame_equal(
+            pd.read_csv(best),
+            df.sort_values("CombinedScore", kind="stable").head(5).reset_index(drop=True),
+            check_exact=False,
+        )
+
+    def test_unknown_command_is_rejected(self):
+        with self.assertRaises(SystemExit):
+            main(["unknown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from compositions import Compositions
+from lattice import simplex_lattice, simplex_lattice_fractional
+
+ELEMENTS = ["Ti", "V", "Ta"]
+
+
+class TestCompositions(unittest.TestCase):
+    def test_fractions_and_frame(self):
+        compositions = Compositions(simplex_lattice(3, 4), 4, ELEMENTS)
+        self.assertEqual(compositions.numerators.dtype, np.uint8)
+        np.testing.assert_array_equal(compositions.fractions(), simplex_lattice_fractional(3, 4))
+        frame = compositions.to_frame()
+        self.assertEqual(frame.columns.tolist(), ELEMENTS)
+        np.testing.assert_array_equal(frame.to_numpy(), compositions.fractions())
+
+    def test_from_fractions_round_trips(self):
+        compositions = Compositions.from_fractions(simplex_lattice_fractional(3, 20), 20, ELEMENTS)
+        np.testing.assert_array_equal(compositions.numerators, simplex_lattice(3, 20))
+        with self.assertRaises(ValueError):
+            Compositions.from_fractions(np.array([[0.5, 0.25, 0.25]]), 3, ELEMENTS)
+
+    def test_indexing_keeps_denominator_and_elements(self):
+        compositions = Compositions(simplex_lattice(3, 4), 4, ELEMENTS)
+        kept = compositions[compositions.numerators[:, 0] > 2]
+        self.assertIsInstance(kept, Compositions)
+        self.assertEqual(len(kept), 3)
+        self.assertEqual((kept.num_division, kept.elements), (4, ELEMENTS))
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            Compositions(np.zeros((2, 2), dtype=np.uint8), 4, ELEMENTS)
+        with self.assertRaises(ValueError):
+            Compositions(np.zeros((2, 3)), 4, ELEMENTS)
+        with self.assertRaises(ValueError):
+            Compositions(np.zeros((2, 3), dtype=np.uint8), 0, ELEMENTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
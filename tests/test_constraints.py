@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from constraints import LinearConstraints, parse_constraint, tokenize
+from lattice import multi_system_lattice, row_keys, simplex_lattice
+
+ELEMENTS = ["Ti", "V", "Ta", "Nb", "Mo"]
+
+
+class TestParseConstraint(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Ta+Nb >= .5e0"), ["Ta", "+", "Nb", ">=", 0.5])
+        with self.assertRaises(ValueError):
+            tokenize("Ta & Nb")
+
+    def test_linear_forms_are_compiled_to_rows(self):
+        (coefficients, rhs, strict), = parse_constraint("2 * Ti - (V + Mo) / 2 < 0.1 + Nb", ELEMENTS)
+        np.testing.assert_array_equal(coefficients, [2, -0.5, 0, -1, -0.5])
+        self.assertAlmostEqual(rhs, 0.1)
+        self.assertTrue(strict)
+        (coefficients, rhs, strict), = parse_constraint("Ta + Nb >= 0.5", ELEMENTS)
+        np.testing.assert_array_equal(coefficients, [0, 0, -1, -1, 0])
+        self.assertEqual((rhs, strict), (-0.5, False))
+        self.assertEqual(len(parse_constraint("Ti == 0.2", ELEMENTS)), 2)
+
+    def test_ratios_are_multiplied_out(self):
+        (coefficients, rhs, _), = parse_constraint("Ti / (V + Mo) <= 2", ELEMENTS)
+        np.testing.assert_array_equal(coefficients, [1, -2, 0, 0, -2])
+        self.assertEqual(rhs, 0)
+        (coefficients, rhs, _), = parse_constraint("0.5 >= Ti / V", ELEMENTS)
+        np.testing.assert_array_equal(coefficients, [1, -0.5, 0, 0, 0])
+
+    def test_invalid_constraints(self):
+        for text in ["Ti", "Ti <= V <= 0.5", "Ti * V <= 0.1", "W <= 0.1", "Ti / V + Nb <= 1",
+                     "Ti / V <= Nb", "(Ti + 0.1) / V <= 1", "0.5 <= 1", "Ti <= 1 / 0", "(Ti <= 1", "Ti <="]:
+            with self.assertRaises(ValueError, msg=text):
+                parse_constraint(text, ELEMENTS)
+
+
+class TestLinearConstraints(unittest.TestCase):
+    def setUp(self):
+        self.constraints = LinearConstraints(ELEMENTS, ["Mo <= 0.15", "Ta + Nb >= 0.5", "Ti > 0.05", "V / Nb <= 1"])
+        numerators = simplex_lattice(5, 20)
+        fractions = numerators / 20
+        ti, v, ta, nb, mo = fractions.T
+        self.expected = numerators[(mo <= 0.15) & (ta + nb >= 0.5) & (ti > 0.05) & (v <= nb)]
+
+    def test_mask_on_numerators_and_fractions(self):
+        numerators = simplex_lattice(5, 20)
+        mask = self.constraints.mask(numerators, 20, chunksize=1000)
+        np.testing.assert_array_equal(numerators[mask], self.expected)
+        np.testing.assert_array_equal(self.constraints.mask(numerators / 20), mask)
+        self.assertEqual(len(self.constraints), 4)
+        self.assertEqual(len(self.constraints.rhs), 4)
+
+    def test_boundaries_are_kept(self):
+        # 0.15 * 20 and 0.05 * 20 are not exact, the tolerance must still keep 3 and reject 1 division
+        self.assertEqual(self.expected[:, 4].max(), 3)
+        self.assertEqual(self.expected[:, 0].min(), 2)
+        lower, upper = self.constraints.bounds(20)
+        np.testing.assert_array_equal(lower, [2, 0, 0, 0, 0])
+        np.testing.assert_array_equal(upper, [20, 20, 20, 20, 3])
+
+    def test_lattice_enumerates_only_satisfying_rows(self):
+        np.testing.assert_array_equal(self.constraints.lattice(20), self.expected)
+        limited = self.constraints.lattice(20, limits=[[0, 0.3]] + [[0, 1]] * 4)
+        np.testing.assert_array_equal(limited, self.expected[self.expected[:, 0] <= 6])
+        self.assertEqual(len(LinearConstraints(ELEMENTS, "Ti + V >= 1.1").lattice(20)), 0)
+
+    def test_multi_system_lattice_with_constraints(self):
+        constraints = LinearConstraints(ELEMENTS, ["Ta + Nb >= 0.5", "Ti >= 0.05", "V <= 0.3"])
+        numerators = multi_system_lattice(5, 3, 10)
+        expected = numerators[constraints.mask(numerators, 10)]
+        result = multi_system_lattice(5, 3, 10, constraints=constraints)
+        self.assertEqual(len(result), len(expected))
+        np.testing.assert_array_equal(np.sort(row_keys(result)), np.sort(row_keys(expected)))
+        # Faces lacking Ti are skipped
+        self.assertTrue((result[:, 0] > 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
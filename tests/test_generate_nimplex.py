@@ -1,8 +1,14 @@
 import os
+import tempfile
 import unittest
+from unittest import mock
+import numpy as np
 import pandas as pd
 
-from generate_nimplex import generate_nimplex_space
+from generate_nimplex import generate_nimplex_space, load_nimplex_space
+from space_cache import SpaceCache
+from graph import load_graph
+from table_io import load_numerators
 
 
 class TestGenerateNimplexSpace(unittest.TestCase):
@@ -61,6 +67,104 @@ class TestGenerateNimplexSpace(unittest.TestCase):
         result = generate_nimplex_space(elements, dimension, num_division, limit, no_csv=True)
         self.assertTrue(all(result["Node ID"] == range(len(result))))
 
+    def test_generates_parquet_file(self):
+        elements = ["Co", "Cr", "Fe"]
+        dimension = 3
+        num_division = 5
+        limit = [[0, 1], [0, 1], [0, 1]]
+        result = generate_nimplex_space(elements, dimension, num_division, limit, output_format="parquet")
+        expected_filename = "CoCrFe_ndiv_5_nimplex_space.parquet"
+        self.assertTrue(os.path.exists(expected_filename))
+        pd.testing.assert_frame_equal(pd.read_parquet(expected_filename), result)
+        os.remove(expected_filename)
+
+    def test_generates_npy_file_with_integer_numerators(self):
+        elements = ["Co", "Cr", "Fe"]
+        dimension = 3
+        num_division = 5
+        limit = [[0, 1], [0, 1], [0, 1]]
+        result = generate_nimplex_space(elements, dimension, num_division, limit, output_format="npy")
+        numerators, header = load_numerators("CoCrFe_ndiv_5_nimplex_space.npy")
+        self.assertEqual(header["elements"], elements)
+        self.assertTrue(all(numerators.sum(axis=1) == num_division))
+        self.assertTrue(np.allclose(numerators / num_division, result[elements].to_numpy()))
+        graph = load_graph("CoCrFe_ndiv_5_nimplex_space_neighbors")
+        self.assertEqual(len(graph), len(result))
+        neighbors = result.filter(like="Neighbor_").to_numpy()
+        for node in range(len(result)):
+            expected = neighbors[node][~np.isnan(neighbors[node])]
+            np.testing.assert_array_equal(graph.neighbors(node), expected)
+        del numerators, graph
+        for filename in ["CoCrFe_ndiv_5_nimplex_space.npy", "CoCrFe_ndiv_5_nimplex_space.json",
+                         "CoCrFe_ndiv_5_nimplex_space_neighbors_offsets.npy",
+                         "CoCrFe_ndiv_5_nimplex_space_neighbors_indices.npy"]:
+            self.assertTrue(os.path.exists(filename))
+            os.remove(filename)
+
+    def test_generates_csv_file_in_chunks(self):
+        elements = ["Co", "Cr", "Fe"]
+        dimension = 3
+        num_division = 5
+        limit = [[0, 1], [0, 1], [0, 1]]
+        result = generate_nimplex_space(elements, dimension, num_division, limit, chunksize=4)
+        expected_filename = "CoCrFe_ndiv_5_nimplex_space.csv"
+        pd.testing.assert_frame_equal(pd.read_csv(expected_filename), result, check_dtype=False)
+        self.assertIsNone(generate_nimplex_space(elements, dimension, num_division, limit, return_frame=False))
+        os.remove(expected_filename)
+
+    def test_cached_space_does_not_call_nimplex_again(self):
+        elements = ["Co", "Cr", "Fe"]
+        limit = [[0, 1], [0, 0.6], [0, 1]]
+        expected = generate_nimplex_space(elements, 3, 5, limit, no_csv=True)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SpaceCache(directory)
+            load_nimplex_space(elements, 5, limit, cache)
+            with mock.patch("nimplex.simplex_graph_limited_fractional_py") as generate:
+                compositions, graph = load_nimplex_space(elements, 5, limit, cache)
+                result = generate_nimplex_space(elements, 3, 5, limit, no_csv=True, cache=cache)
+                generate.assert_not_called()
+            self.assertTrue(np.allclose(compositions.fractions(), expected[elements].to_numpy()))
+            self.assertEqual(len(graph), len(expected))
+            pd.testing.assert_frame_equal(result, expected, check_exact=False)
+            del compositions, graph
+
+    def test_limited_space_derived_from_cache_matches_nimplex(self):
+        elements = ["Co", "Cr", "Fe", "Ni"]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SpaceCache(directory)
+            for limit in ([[0, 1], [0, 0.6], [0.1, 1], [0, 0.3]], [[0.2, 0.5], [0, 1], [0, 1], [0.1, 0.4]]):
+                derived, derived_graph = load_nimplex_space(elements, 10, limit, cache)
+                generated, generated_graph = load_nimplex_space(elements, 10, limit, cache, derive=False)
+                np.testing.assert_array_equal(derived.numerators, generated.numerators)
+                self.assertEqual(derived_graph.to_lists(), generated_graph.to_lists())
+                del derived, derived_graph, generated, generated_graph
+
+    def test_constraints_mask_the_space_and_its_graph(self):
+        elements = ["Co", "Cr", "Fe", "Ni"]
+        limit = [[0, 1], [0, 0.6], [0, 1], [0, 1]]
+        constraints = ["Co + Cr >= 0.4", "Fe / Ni <= 2"]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SpaceCache(directory)
+            space, graph = load_nimplex_space(elements, 10, limit, cache)
+            constrained, constrained_graph = load_nimplex_space(elements, 10, limit, cache, constraints=constraints)
+            co, cr, fe, ni = space.fractions().T
+            mask = (co + cr >= 0.4 - 1e-9) & (fe <= 2 * ni + 1e-9)
+            np.testing.assert_array_equal(constrained.numerators, space.numerators[mask])
+            self.assertEqual(constrained_graph.to_lists(), graph.subgraph(mask).to_lists())
+            result = generate_nimplex_space(elements, 4, 10, limit, no_csv=True, constraints=constraints)
+            cached = generate_nimplex_space(elements, 4, 10, limit, no_csv=True, cache=cache, constraints=constraints)
+            pd.testing.assert_frame_equal(result, cached, check_exact=False)
+            self.assertEqual(len(result), mask.sum())
+            del space, graph, constrained, constrained_graph
+
+    def test_raises_error_for_unknown_output_format(self):
+        elements = ["Co", "Cr", "Fe"]
+        dimension = 3
+        num_division = 5
+        limit = [[0, 1], [0, 1], [0, 1]]
+        with self.assertRaises(ValueError):
+            generate_nimplex_space(elements, dimension, num_division, limit, output_format="xlsx")
+
     def test_raises_error_for_negative_num_division(self):
         elements = ["Co", "Cr", "Fe"]
         dimension = 3
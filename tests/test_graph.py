@@ -0,0 +1,124 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from compositions import Compositions
+from graph import NeighborGraph, graph_paths, load_graph, write_graph, write_space
+from lattice import simplex_lattice
+from table_io import load_numerators
+
+ELEMENTS = ["Co", "Cr", "Fe"]
+
+
+def lattice_neighbors(numerators: np.ndarray) -> list:
+    """
+    Neighbor lists of a simplex lattice: compositions one unit of one element away.
+    """
+    index = {tuple(row): i for i, row in enumerate(numerators.tolist())}
+    neighbors = []
+    for row in numerators.tolist():
+        found = []
+        for source, target in itertools.permutations(range(len(row)), 2):
+            moved = list(row)
+            moved[source] -= 1
+            moved[target] += 1
+            if moved[source] >= 0:
+                found.append(index[tuple(moved)])
+        neighbors.append(found)
+    return neighbors
+
+
+class TestNeighborGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.numerators = simplex_lattice(3, 5)
+        self.neighbors = lattice_neighbors(self.numerators)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_from_lists(self):
+        graph = NeighborGraph.from_lists(self.neighbors)
+        self.assertEqual(len(graph), len(self.neighbors))
+        self.assertEqual(graph.num_edges, sum(map(len, self.neighbors)))
+        self.assertEqual(graph.offsets.dtype, np.int32)
+        self.assertEqual(graph.indices.dtype, np.int32)
+        self.assertEqual(graph.to_lists(), self.neighbors)
+        np.testing.assert_array_equal(graph.degrees(), [len(n) for n in self.neighbors])
+        with self.assertRaises(ValueError):
+            NeighborGraph(np.array([0, 2]), np.array([1]))
+
+    def test_subgraph_remaps_neighbors(self):
+        graph = NeighborGraph.from_lists(self.neighbors)
+        mask = (self.numerators[:, 0] <= 3) & (self.numerators[:, 2] >= 1)
+        translation = np.cumsum(mask) - 1
+        expected = [[int(translation[n]) for n in neighbors if mask[n]]
+                    for neighbors, selected in zip(self.neighbors, mask) if selected]
+        self.assertEqual(graph.subgraph(mask).to_lists(), expected)
+        self.assertEqual(len(graph.subgraph(np.zeros(len(graph), dtype=bool))), 0)
+
+    def test_write_and_load_in_chunks(self):
+        path = os.path.join(self.tmpdir.name, "space_neighbors")
+        write_graph(path, self.neighbors, chunksize=4)
+        graph = load_graph(path)
+        self.assertIsInstance(graph.indices, np.memmap)
+        self.assertEqual(graph.to_lists(), self.neighbors)
+        self.assertTrue(all(os.path.exists(p) for p in graph_paths(path)))
+        self.assertFalse(any(f.endswith(".part") for f in os.listdir(self.tmpdir.name)))
+
+    def test_write_space_matches_single_frame(self):
+        fractions = (self.numerators / 5).tolist()
+        expected = pd.DataFrame(fractions, columns=ELEMENTS)
+        neighbors_df = pd.DataFrame(self.neighbors)
+        neighbors_df.columns = [f"Neighbor_{i}" for i in range(neighbors_df.shape[1])]
+        expected = pd.concat([neighbors_df, expected], axis=1).reset_index(names="Node ID")
+
+        csv_path = os.path.join(self.tmpdir.name, "space.csv")
+        expected_path = os.path.join(self.tmpdir.name, "expected.csv")
+        write_space(csv_path, fractions, self.neighbors, ELEMENTS, 5, chunksize=4)
+        expected.to_csv(expected_path, index=False)
+        with open(csv_path) as f, open(expected_path) as g:
+            self.assertEqual(f.read(), g.read())
+
+        npy_path = os.path.join(self.tmpdir.name, "space.npy")
+        write_space(npy_path, fractions, self.neighbors, ELEMENTS, 5, chunksize=4)
+        numerators, header = load_numerators(npy_path)
+        np.testing.assert_array_equal(numerators, self.numerators)
+        self.assertEqual(load_graph(os.path.join(self.tmpdir.name, "space_neighbors")).to_lists(), self.neighbors)
+
+    def test_slicing_keeps_neighbor_ids(self):
+        graph = NeighborGraph.from_lists(self.neighbors)
+        self.assertEqual(graph[3:9].to_lists(), self.neighbors[3:9])
+        self.assertEqual(graph[18:].to_lists(), self.neighbors[18:])
+        self.assertEqual(len(graph[5:2]), 0)
+        with self.assertRaises(TypeError):
+            graph[::2]
+
+    def test_write_space_from_memory_mapped_arrays(self):
+        # A space cache entry: memory-mapped numerators and graph, written without converting to lists
+        graph_path = os.path.join(self.tmpdir.name, "cached_neighbors")
+        write_graph(graph_path, self.neighbors)
+        numerators_path = os.path.join(self.tmpdir.name, "cached_numerators.npy")
+        np.save(numerators_path, self.numerators)
+        compositions = Compositions(np.load(numerators_path, mmap_mode="r"), 5, ELEMENTS)
+        graph = load_graph(graph_path)
+
+        fractions = (self.numerators / 5).tolist()
+        for name in ["space.csv", "space.npy"]:
+            lists_path = os.path.join(self.tmpdir.name, "lists_" + name)
+            arrays_path = os.path.join(self.tmpdir.name, "arrays_" + name)
+            write_space(lists_path, fractions, self.neighbors, ELEMENTS, 5, chunksize=4)
+            write_space(arrays_path, compositions, graph, ELEMENTS, 5, chunksize=4)
+            with open(lists_path, "rb") as f, open(arrays_path, "rb") as g:
+                self.assertEqual(f.read(), g.read())
+        for lists_path, arrays_path in zip(graph_paths(os.path.join(self.tmpdir.name, "lists_space_neighbors")),
+                                           graph_paths(os.path.join(self.tmpdir.name, "arrays_space_neighbors"))):
+            np.testing.assert_array_equal(np.load(lists_path), np.load(arrays_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import itertools
+import unittest
+
+import numpy as np
+
+from lattice import (
+    bounded_lattice,
+    bounded_lattice_size,
+    interior_lattice,
+    iter_multi_system_lattice,
+    lattice_size,
+    limit_bounds,
+    linear_minimum,
+    multi_system_lattice,
+    multi_system_size,
+    numerator_dtype,
+    simplex_lattice,
+    simplex_lattice_fractional,
+    row_keys,
+    subsystem_supports,
+    transfer_moves,
+    within_limits,
+)
+
+
+class TestSimplexLattice(unittest.TestCase):
+    def test_matches_brute_force_enumeration(self):
+        for dimension in range(1, 5):
+            for num_division in range(0, 6):
+                expected = sorted(
+                    t for t in itertools.product(range(num_division + 1), repeat=dimension)
+                    if sum(t) == num_division
+                )
+                result = simplex_lattice(dimension, num_division)
+                self.assertEqual([tuple(row) for row in result.tolist()], expected)
+
+    def test_rows_sum_to_num_division(self):
+        result = simplex_lattice(6, 12)
+        self.assertEqual(len(result), lattice_size(6, 12))
+        self.assertTrue(np.all(result.sum(axis=1, dtype=np.int64) == 12))
+
+    def test_includes_pure_element_corners(self):
+        result = simplex_lattice(5, 20)
+        for i in range(5):
+            corner = np.zeros(5, dtype=result.dtype)
+            corner[i] = 20
+            self.assertTrue(np.any(np.all(result == corner, axis=1)))
+
+    def test_uses_compact_dtype(self):
+        self.assertEqual(simplex_lattice(3, 10).dtype, np.uint8)
+        self.assertEqual(simplex_lattice(3, 300).dtype, np.uint16)
+        self.assertEqual(numerator_dtype(255), np.uint8)
+        self.assertEqual(numerator_dtype(256), np.uint16)
+
+    def test_fractional_rows_sum_to_one(self):
+        result = simplex_lattice_fractional(4, 7)
+        self.assertTrue(np.allclose(result.sum(axis=1), 1.0))
+
+    def test_raises_error_for_invalid_dimension(self):
+        with self.assertRaises(ValueError):
+            simplex_lattice(0, 10)
+
+    def test_raises_error_for_negative_num_division(self):
+        with self.assertRaises(ValueError):
+            simplex_lattice(3, -1)
+
+
+class TestMultiSystemLattice(unittest.TestCase):
+    def brute_force_union(self, num_elements, order, num_division):
+        rows = set()
+        for subsystem in itertools.combinations(range(num_elements), order):
+            for point in simplex_lattice(order, num_division):
+                row = [0] * num_elements
+                for i, v in zip(subsystem, point):
+                    row[i] = int(v)
+                rows.add(tuple(row))
+        return rows
+
+    def test_matches_deduplicated_union_of_subsystems(self):
+        for num_elements, order, num_division in [(5, 3, 4), (6, 4, 5), (4, 4, 6), (7, 2, 3)]:
+            result = multi_system_lattice(num_elements, order, num_division)
+            rows = [tuple(row) for row in result.tolist()]
+            self.assertEqual(len(rows), len(set(rows)))
+            self.assertEqual(set(rows), self.brute_force_union(num_elements, order, num_division))
+            self.assertEqual(len(rows), multi_system_size(num_elements, order, num_division))
+
+    def test_each_face_owned_by_exactly_one_subsystem(self):
+        faces = [face for _, owned in subsystem_supports(6, 3) for face in owned]
+        self.assertEqual(len(faces), len(set(faces)))
+        self.assertEqual(len(faces), 6 + 15 + 20)
+        for subsystem, owned in subsystem_supports(6, 3):
+            self.assertTrue(all(set(face) <= set(subsystem) for face in owned))
+
+    def test_stream_matches_dense_matrix(self):
+        dense = multi_system_lattice(6, 4, 8)
+        chunks = [chunk for _, chunk in iter_multi_system_lattice(6, 4, 8, chunksize=7)]
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+        np.testing.assert_array_equal(np.concatenate(chunks), dense)
+
+    def test_interior_lattice_is_strictly_positive(self):
+        result = interior_lattice(4, 10)
+        self.assertEqual(len(result), lattice_size(4, 6))
+        self.assertTrue(np.all(result >= 1))
+        self.assertEqual(len(interior_lattice(5, 3)), 0)
+
+
+class TestLimits(unittest.TestCase):
+    def test_bounds_are_snapped_to_the_lattice(self):
+        lower, upper = limit_bounds(100, [[0.07, 0.29], [0, 1], [0.5, 2]])
+        np.testing.assert_array_equal(lower, [7, 0, 50])
+        np.testing.assert_array_equal(upper, [29, 100, 100])
+        with self.assertRaises(ValueError):
+            limit_bounds(100, [0, 1])
+
+    def test_within_limits_matches_fraction_comparison(self):
+        numerators = simplex_lattice(4, 10)
+        limits = [[0.1, 0.6], [0, 0.3], [0, 1], [0.2, 1]]
+        fractions = numerators / 10
+        expected = np.all([(fractions[:, j] >= lo - 1e-9) & (fractions[:, j] <= hi + 1e-9)
+                           for j, (lo, hi) in enumerate(limits)], axis=0)
+        np.testing.assert_array_equal(within_limits(numerators, 10, limits, chunksize=7), expected)
+        with self.assertRaises(ValueError):
+            within_limits(numerators, 10, limits[:3])
+
+    def test_bounded_lattice_matches_filtered_lattice(self):
+        for lower, upper in [([0, 1, 0, 2], [12, 5, 3, 12]), ([3, 3, 3, 3], [3, 3, 3, 3]), ([0] * 4, [12] * 4)]:
+            numerators = simplex_lattice(4, 12)
+            expected = numerators[((numerators >= lower) & (numerators <= upper)).all(axis=1)]
+            np.testing.assert_array_equal(bounded_lattice(12, lower, upper), expected)
+            self.assertEqual(bounded_lattice_size(12, lower, upper), len(expected))
+        self.assertEqual(len(bounded_lattice(12, [4] * 4, [12] * 4)), 0)
+
+    def test_bounded_lattice_with_linear_constraints_matches_filtered_lattice(self):
+        rng = np.random.default_rng(0)
+        numerators = simplex_lattice(4, 12).astype(np.int64)
+        for _ in range(20):
+            lower, upper = rng.integers(0, 3, 4), rng.integers(6, 13, 4)
+            coefficients, rhs = rng.normal(size=(2, 4)), rng.normal(size=2) * 6
+            expected = numerators[((numerators >= lower) & (numerators <= upper)).all(axis=1)]
+            expected = expected[(expected @ coefficients.T <= rhs).all(axis=1)]
+            result = bounded_lattice(12, lower, upper, np.int64, coefficients, rhs)
+            np.testing.assert_array_equal(result, expected)
+
+    def test_linear_minimum_matches_brute_force(self):
+        lower, upper, coefficients = np.array([1, 0, 0, 2]), np.array([3, 5, 4, 6]), np.array([0.5, -1, 2, 0])
+        rows = np.array(list(itertools.product(*(range(lo, hi + 1) for lo, hi in zip(lower, upper)))))
+        totals = np.arange(20)
+        expected = [(rows[rows.sum(axis=1) == total] @ coefficients).min(initial=np.inf) for total in totals]
+        np.testing.assert_allclose(linear_minimum(coefficients, lower, upper, totals), expected)
+
+
+class TestRows(unittest.TestCase):
+    def test_transfer_moves_link_lattice_neighbors(self):
+        moves = transfer_moves(4)
+        self.assertEqual(len(moves), 12)
+        np.testing.assert_array_equal(moves.sum(axis=1), 0)
+        np.testing.assert_array_equal(np.abs(moves).sum(axis=1), 2)
+        self.assertEqual(len({tuple(move) for move in moves}), 12)
+
+    def test_row_keys_sort_and_compare_rows(self):
+        numerators = simplex_lattice(3, 5)
+        keys = row_keys(numerators)
+        self.assertEqual(len(np.unique(keys)), len(numerators))
+        self.assertTrue(np.isin(row_keys(numerators[::2].copy()), keys).all())
+        self.assertFalse(np.isin(row_keys(np.array([[6, 0, 0]], dtype=numerators.dtype)), keys).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from nuclear_data import DATA_FILE, PropertyDatabase, load_database
+
+
+class TestPropertyDatabase(unittest.TestCase):
+    def setUp(self):
+        self.database = load_database("unified")
+
+    def test_datasets_cover_master_elements(self):
+        for dataset in ("unified", "relative"):
+            database = load_database(dataset)
+            self.assertEqual(database.basis().shape, (11, 7))
+            self.assertEqual(len(database.columns), 7)
+            self.assertEqual(database.limits.shape, (7,))
+        self.assertIs(load_database("unified"), self.database)
+
+    def test_subset_basis_is_cached_and_read_only(self):
+        elements = ["W", "Ti", "Cr"]
+        basis = self.database.basis(elements)
+        self.assertIs(self.database.basis(elements), basis)
+        np.testing.assert_array_equal(basis, self.database.basis()[[10, 0, 6]])
+        with self.assertRaises(ValueError):
+            basis[0, 0] = 1.0
+
+    def test_tables_split_metric_groups(self):
+        activation, gamma, heat = self.database.tables(["Ti", "W"])
+        self.assertEqual((activation.shape, gamma.shape, heat.shape), ((2, 3), (2, 2), (2, 2)))
+        activation_limit, gamma_limit, heat_limit = self.database.limit_tables()
+        np.testing.assert_array_equal(gamma_limit, [10000, 0.00001])
+
+    def test_single_matmul_matches_per_table_matmuls(self):
+        rng = np.random.default_rng(0)
+        fractions = rng.dirichlet(np.ones(11), size=1000)
+        properties = fractions @ self.database.basis()
+        activation, gamma, heat = self.database.tables()
+        np.testing.assert_array_equal(
+            properties, np.concatenate([fractions @ activation, fractions @ gamma, fractions @ heat], axis=1)
+        )
+
+    def test_rejects_unknown_elements_datasets_and_versions(self):
+        with self.assertRaises(ValueError):
+            self.database.basis(["Ti", "Xx"])
+        with self.assertRaises(ValueError):
+            PropertyDatabase.load("missing")
+        with open(DATA_FILE) as f:
+            data = json.load(f)
+        data["version"] = 0
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "properties.json")
+            with open(path, "w") as f:
+                json.dump(data, f)
+            with self.assertRaises(ValueError):
+                PropertyDatabase.load("unified", path)
+
+
+if __name__ == "__main__":
+    unittest.main()
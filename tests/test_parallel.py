@@ -0,0 +1,66 @@
+import filecmp
+import os
+import tempfile
+import unittest
+from math import comb
+
+from lattice import multi_system_size
+from parallel import face_tasks
+from pipeline import generate_and_screen
+from screening import ACTIVATION_LIMIT, HEAT_LIMIT
+
+ELEMENTS = ["Ti", "Ta", "V", "Mo", "Fe", "W"]
+
+
+class TestFaceTasks(unittest.TestCase):
+    def test_tasks_cover_every_composition_once(self):
+        tasks = face_tasks(6, 4, 12, task_rows=50)
+        rows = 0
+        for task in tasks:
+            for face, prefix in task:
+                rows += comb(12 - sum(prefix) - 1, len(face) - len(prefix) - 1)
+        self.assertEqual(rows, multi_system_size(6, 4, 12))
+        self.assertGreater(len(tasks), 1)
+
+    def test_raises_error_for_invalid_task_rows(self):
+        with self.assertRaises(ValueError):
+            face_tasks(6, 4, 12, task_rows=0)
+
+
+class TestParallelScreening(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_pipeline(self, name, **kwargs):
+        output_file = os.path.join(self.tmpdir.name, f"{name}.csv")
+        audit_file = os.path.join(self.tmpdir.name, f"{name}_audit.csv")
+        stats = generate_and_screen(
+            ELEMENTS, 4, 10, output_file, audit_file, chunksize=60, verbose=False,
+            activation_limit=ACTIVATION_LIMIT / 10, heat_limit=HEAT_LIMIT / 5, **kwargs,
+        )
+        return stats, output_file, audit_file
+
+    def test_output_is_identical_to_serial_run(self):
+        serial, serial_file, serial_audit = self.run_pipeline("serial")
+        parallel, parallel_file, parallel_audit = self.run_pipeline("parallel", workers=2)
+        self.assertTrue(filecmp.cmp(serial_file, parallel_file, shallow=False))
+        self.assertTrue(filecmp.cmp(serial_audit, parallel_audit, shallow=False))
+        self.assertEqual(serial["rows_out"], parallel["rows_out"])
+        self.assertEqual(serial["rows_in"], parallel["rows_in"])
+
+    def test_pruned_output_is_identical_to_serial_run(self):
+        _, serial_file, _ = self.run_pipeline("serial")
+        stats, parallel_file, _ = self.run_pipeline("parallel", workers=2, prune=True)
+        self.assertTrue(filecmp.cmp(serial_file, parallel_file, shallow=False))
+        self.assertGreater(stats["rows_pruned"], 0)
+
+    def test_raises_error_for_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            self.run_pipeline("invalid", workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pareto import ParetoFront, pareto_mask
+
+
+def brute_force_mask(points):
+    not_worse = (points[:, None, :] <= points[None, :, :]).all(axis=2)
+    better = (points[:, None, :] < points[None, :, :]).any(axis=2)
+    return ~(not_worse & better).any(axis=0)
+
+
+class TestParetoMask(unittest.TestCase):
+    def test_matches_pairwise_comparison(self):
+        rng = np.random.default_rng(0)
+        for objectives in (1, 2, 3, 5):
+            for _ in range(20):
+                points = rng.integers(0, 6, (rng.integers(1, 400), objectives)).astype(float)
+                np.testing.assert_array_equal(pareto_mask(points), brute_force_mask(points))
+
+    def test_continuous_values(self):
+        points = np.random.default_rng(1).random((3000, 3))
+        np.testing.assert_array_equal(pareto_mask(points), brute_force_mask(points))
+
+    def test_identical_rows_are_kept(self):
+        points = np.array([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [2.0, 2.0, 3.0]])
+        np.testing.assert_array_equal(pareto_mask(points), [True, True, False])
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(len(pareto_mask(np.empty((0, 3)))), 0)
+        with self.assertRaises(ValueError):
+            pareto_mask(np.ones(3))
+
+
+class TestParetoFront(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.df = pd.DataFrame(rng.random((2000, 3)), columns=["a", "b", "c"])
+        self.df["id"] = np.arange(len(self.df))
+
+    def test_incremental_front_matches_batch_front(self):
+        front = ParetoFront(["a", "b", "c"])
+        for start in range(0, len(self.df), 150):
+            front.update(self.df.iloc[start:start + 150])
+        expected = self.df[brute_force_mask(self.df[["a", "b", "c"]].to_numpy())]
+        self.assertEqual(sorted(front.result()["id"]), sorted(expected["id"]))
+        self.assertEqual(front.rows, len(self.df))
+
+    def test_maximize_and_merge(self):
+        first, second = ParetoFront(["a", "b"], maximize=["b"]), ParetoFront(["a", "b"], maximize=["b"])
+        first.update(self.df.iloc[:1000])
+        second.update(self.df.iloc[1000:])
+        first.merge(second)
+        points = self.df[["a", "b"]].to_numpy() * [1, -1]
+        self.assertEqual(sorted(first.result()["id"]), sorted(self.df["id"][brute_force_mask(points)]))
+        with self.assertRaises(ValueError):
+            ParetoFront(["a"], maximize=["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pipeline import generate_and_screen
+from screening import (
+    ACTIVATION_DATA,
+    ACTIVATION_LIMIT,
+    GAMMA_DATA,
+    GAMMA_LIMIT,
+    HEAT_DATA,
+    HEAT_LIMIT,
+    MASTER_ELEMENTS,
+    screen_and_select,
+    screen_file,
+)
+
+ELEMENTS = ["Ti", "Ta", "V", "Mo", "Fe", "W"]
+
+
+class TestGenerateAndScreen(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.tmpdir.name, "filtered.csv")
+        self.audit_file = os.path.join(self.tmpdir.name, "compositions.csv")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_matches_two_step_workflow(self):
+        stats = generate_and_screen(
+            ELEMENTS, 3, 10, self.output_file, self.audit_file, chunksize=100, verbose=False
+        )
+        fused = pd.read_csv(self.output_file)
+
+        two_step_file = os.path.join(self.tmpdir.name, "two_step.csv")
+        screen_file(
+            self.audit_file, two_step_file, MASTER_ELEMENTS,
+            ACTIVATION_DATA, GAMMA_DATA, HEAT_DATA,
+            ACTIVATION_LIMIT, GAMMA_LIMIT, HEAT_LIMIT,
+            elements=ELEMENTS, verbose=False,
+        )
+        # screen_file orders element columns by the master list, the pipeline by the requested list
+        two_step = pd.read_csv(two_step_file)
+        pd.testing.assert_frame_equal(fused, two_step[fused.columns])
+        self.assertEqual(stats["rows_out"], len(fused))
+        self.assertEqual(stats["rows_in"], len(pd.read_csv(self.audit_file)))
+
+    def test_bit_identical_to_screening_the_generated_file(self):
+        # Not in master order; both routes must still sum the element contributions in the same order
+        elements = ["W", "Fe", "V", "Ti"]
+        for workers in (1, 2):
+            generate_and_screen(
+                elements, 4, 10, self.output_file, self.audit_file, chunksize=500, workers=workers, verbose=False
+            )
+            fused = pd.read_csv(self.output_file)
+            two_step_file = os.path.join(self.tmpdir.name, "two_step.csv")
+            screen_and_select(self.audit_file, two_step_file, verbose=False)
+            pd.testing.assert_frame_equal(fused, pd.read_csv(two_step_file)[fused.columns], check_exact=True)
+
+    def test_does_not_write_audit_file_by_default(self):
+        generate_and_screen(ELEMENTS, 2, 5, self.output_file, verbose=False)
+        self.assertTrue(os.path.exists(self.output_file))
+        self.assertFalse(os.path.exists(self.audit_file))
+
+    def test_chunksize_does_not_change_output(self):
+        generate_and_screen(ELEMENTS, 3, 8, self.output_file, chunksize=7, verbose=False)
+        small = pd.read_csv(self.output_file)
+        generate_and_screen(ELEMENTS, 3, 8, self.output_file, chunksize=100_000, verbose=False)
+        pd.testing.assert_frame_equal(pd.read_csv(self.output_file), small)
+
+    def test_pruning_does_not_change_output(self):
+        limits = dict(activation_limit=ACTIVATION_LIMIT / 20, heat_limit=HEAT_LIMIT / 5)
+        generate_and_screen(ELEMENTS, 4, 12, self.output_file, verbose=False, **limits)
+        unpruned = pd.read_csv(self.output_file)
+        stats = generate_and_screen(ELEMENTS, 4, 12, self.output_file, prune=True, verbose=False, **limits)
+        pd.testing.assert_frame_equal(pd.read_csv(self.output_file), unpruned)
+        self.assertGreater(stats["rows_pruned"], 0)
+
+    def test_top_k_matches_sorted_output(self):
+        generate_and_screen(ELEMENTS, 3, 10, self.output_file, chunksize=50, verbose=False)
+        expected = pd.read_csv(self.output_file).sort_values("CombinedScore", kind="stable").head(25)
+        generate_and_screen(ELEMENTS, 3, 10, self.output_file, chunksize=50, top_k=25, verbose=False)
+        pd.testing.assert_frame_equal(pd.read_csv(self.output_file), expected.reset_index(drop=True))
+
+    def test_raises_error_for_unknown_element(self):
+        with self.assertRaises(ValueError):
+            generate_and_screen(["Ti", "Co"], 2, 5, self.output_file, verbose=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lattice import multi_system_lattice
+from plotting import Layout, bin_values, pixel_indices, polygon_vertices, project, render_panels
+
+try:
+    import matplotlib  # noqa: F401
+    HAS_MATPLOTLIB = True
+except ImportError:
+    HAS_MATPLOTLIB = False
+
+ELEMENTS = ["Ti", "V", "Ta", "Nb", "Mo"]
+
+
+class TestProjection(unittest.TestCase):
+    def test_matches_row_by_row_projection(self):
+        df = pd.DataFrame(multi_system_lattice(5, 3, 6) / 6, columns=ELEMENTS)
+        df.loc[3] = 0.0
+        vertices = polygon_vertices(len(ELEMENTS))
+        normalized = df.div(df.sum(axis=1), axis=0).dropna()
+        expected = normalized.apply(lambda row: np.dot(row.values, vertices), axis=1, result_type="expand").values
+        coords, kept = project(df.to_numpy(), vertices)
+        np.testing.assert_allclose(coords, expected)
+        np.testing.assert_array_equal(np.flatnonzero(kept), normalized.index)
+
+    def test_bin_values(self):
+        coords = np.array([[-0.9, -0.9], [-0.8, -0.8], [0.9, 0.9]])
+        values = np.array([1.0, 3.0, 5.0])
+        image = bin_values(coords, values, bins=2, reduce="mean")
+        np.testing.assert_array_equal(image, [[2.0, np.nan], [np.nan, 5.0]])
+        np.testing.assert_array_equal(bin_values(coords, values, 2, reduce="max")[0, 0], 3.0)
+        np.testing.assert_array_equal(bin_values(coords, values, 2, reduce="count")[0, 0], 2.0)
+        with self.assertRaises(ValueError):
+            bin_values(coords, values, 2, reduce="median")
+        pixel = pixel_indices(coords, bins=2)
+        np.testing.assert_array_equal(bin_values(None, values, 2, pixel=pixel), image)
+
+
+@unittest.skipUnless(HAS_MATPLOTLIB, "matplotlib is not installed")
+class TestRenderPanels(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame(multi_system_lattice(5, 3, 10) / 10, columns=ELEMENTS)
+        self.df["CombinedScore"] = self.df.to_numpy() @ np.arange(5.0)
+        self.df["Heat/mol"] = self.df["Ti"]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_scatter_and_rasterised_panels(self):
+        panels = {"CombinedScore": (0, 4, None), "Heat/mol": (0, 1, "Heat")}
+        scatter = render_panels(self.df, ELEMENTS, panels, self.tmpdir.name, dpi=20, workers=1)
+        self.assertEqual([os.path.basename(f) for f in scatter], ["CombinedScore.png", "Heat_mol.png"])
+        rasterised = render_panels(self.df, ELEMENTS, panels, self.tmpdir.name, dpi=20, workers=2,
+                                   max_scatter_points=10, suffix="_binned")
+        for filename in scatter + rasterised:
+            self.assertGreater(os.path.getsize(filename), 0)
+
+    def test_tiled_and_shared_layout(self):
+        panels = {"CombinedScore": (0, 4, None), "Ti": (0, 1, None), "Heat/mol": (0, 1, None)}
+        layout = Layout(self.df, ELEMENTS, bins=50, max_scatter_points=10)
+        self.assertTrue(layout.rasterised)
+        self.assertEqual(layout.values(self.df, "Ti").shape, (50, 50))
+        tiled = render_panels(self.df, ELEMENTS, panels, self.tmpdir.name, dpi=20, tiled=True, layout=layout)
+        self.assertEqual([os.path.basename(f) for f in tiled], ["properties.png"])
+        files = render_panels(self.df, ELEMENTS, panels, self.tmpdir.name, dpi=20, workers=2, layout=layout)
+        self.assertEqual(len(files), 3)
+        for filename in tiled + files:
+            self.assertGreater(os.path.getsize(filename), 0)
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            render_panels(self.df, ELEMENTS, {"Gamma": (0, 1, None)}, self.tmpdir.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
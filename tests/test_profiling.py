@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+
+import profiling
+from profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_summary_aggregates_runs_by_stage(self):
+        profiler = Profiler()
+        with profiler.stage("screen") as outer:
+            for rows in (10, 5):
+                with profiler.stage("score", rows_in=rows) as record:
+                    record.rows_out = rows // 2
+            outer.bytes = 2048
+        summary = {row["stage"]: row for row in profiler.summary()}
+        self.assertEqual(list(summary), ["screen", "score"])
+        self.assertEqual(summary["score"]["calls"], 2)
+        self.assertEqual(summary["score"]["rows_in"], 15)
+        self.assertEqual(summary["score"]["rows_out"], 7)
+        self.assertIsNone(summary["score"]["bytes"])
+        self.assertEqual(summary["screen"]["bytes"], 2048)
+        self.assertGreaterEqual(summary["screen"]["seconds"], summary["score"]["seconds"])
+        self.assertIn("score", profiler.format_summary())
+
+    def test_iterate_times_every_item(self):
+        profiler = Profiler()
+        chunks = list(profiler.iterate([[1, 2, 3], [4]], "read"))
+        self.assertEqual(chunks, [[1, 2, 3], [4]])
+        # The last, empty call to the iterator is timed too
+        self.assertEqual([r.rows_out for r in profiler.records], [3, 1, None])
+
+    def test_chrome_trace(self):
+        profiler = Profiler()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.bin")
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+            with profiler.stage("write", rows_in=4) as record:
+                record.add_file(path)
+                record.add_file(os.path.join(directory, "missing.bin"))
+            trace_file = os.path.join(directory, "trace.json")
+            profiler.write_trace(trace_file)
+            with open(trace_file) as f:
+                events = json.load(f)["traceEvents"]
+        complete = [e for e in events if e["ph"] == "X"]
+        self.assertEqual(len(complete), 1)
+        self.assertEqual(complete[0]["name"], "write")
+        self.assertEqual(complete[0]["args"], {"rows_in": 4, "bytes": 100})
+        self.assertGreaterEqual(complete[0]["dur"], 0)
+
+
+class TestModuleSwitch(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_stages_record_nothing(self):
+        self.assertIsNone(profiling.active())
+        with profiling.stage("write", rows_in=3) as record:
+            record.rows_out = 3
+            record.add_file(__file__)
+        items = [1, 2]
+        self.assertIs(profiling.iterate(items, "read"), items)
+
+    def test_enabled_stages_are_recorded(self):
+        profiler = profiling.enable(report=False)
+        with profiling.stage("write", rows_in=3):
+            pass
+        self.assertIs(profiling.disable(), profiler)
+        self.assertEqual([r.name for r in profiler.records], ["write"])
+
+
+if __name__ == "__main__":
+    unittest.main()
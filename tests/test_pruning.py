@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from lattice import interior_lattice, iter_multi_system_lattice
+from pruning import iter_pruned_face, iter_pruned_multi_system_lattice, region_bounds
+
+PROPERTIES = np.array([
+    [1.0, 5.0],
+    [3.0, 1.0],
+    [0.5, 2.0],
+    [4.0, 0.2],
+])
+LIMITS = np.array([2.0, 2.5])
+
+
+def passes(numerators, num_division):
+    return np.all((numerators / num_division) @ PROPERTIES < LIMITS, axis=1)
+
+
+class TestRegionBounds(unittest.TestCase):
+    def test_bounds_enclose_every_region_point(self):
+        prefix = np.array([2.0])
+        points = np.concatenate(
+            [np.full((len(interior_lattice(3, 8)), 1), 2), interior_lattice(3, 8)], axis=1
+        )
+        values = (points / 10) @ PROPERTIES
+        lower, upper = region_bounds(PROPERTIES, prefix, 8, 10)
+        np.testing.assert_allclose(lower, values.min(axis=0))
+        np.testing.assert_allclose(upper, values.max(axis=0))
+
+
+class TestIterPrunedFace(unittest.TestCase):
+    def test_keeps_every_passing_row_in_lattice_order(self):
+        full = interior_lattice(4, 30)
+        stats = {}
+        pruned = np.concatenate(list(iter_pruned_face(PROPERTIES, LIMITS, 30, leaf_size=8, stats=stats)))
+        expected = full[passes(full, 30)]
+        np.testing.assert_array_equal(pruned[passes(pruned, 30)], expected)
+        self.assertLess(len(pruned), len(full))
+        self.assertEqual(stats["enumerated"] + stats["pruned"], len(full))
+
+    def test_skips_face_that_fails_everywhere(self):
+        stats = {}
+        blocks = list(iter_pruned_face(PROPERTIES[:1], LIMITS, 10, stats=stats))
+        self.assertEqual(blocks, [])
+        self.assertEqual(stats["pruned"], 1)
+
+    def test_emits_passing_face_whole(self):
+        blocks = list(iter_pruned_face(PROPERTIES[[2]], LIMITS, 10, leaf_size=1))
+        self.assertEqual(len(blocks), 1)
+
+    def test_respects_max_rows(self):
+        limits = np.array([100.0, 100.0])
+        blocks = list(iter_pruned_face(PROPERTIES, limits, 20, max_rows=50))
+        self.assertTrue(all(len(block) <= 50 for block in blocks))
+        np.testing.assert_array_equal(np.concatenate(blocks), interior_lattice(4, 20))
+
+
+class TestIterPrunedMultiSystemLattice(unittest.TestCase):
+    def test_matches_masked_full_enumeration(self):
+        full = np.concatenate([chunk for _, chunk in iter_multi_system_lattice(4, 3, 20)])
+        pruned = np.concatenate([chunk for _, chunk in iter_pruned_multi_system_lattice(PROPERTIES, LIMITS, 3, 20)])
+        np.testing.assert_array_equal(pruned[passes(pruned, 20)], full[passes(full, 20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+
+from lattice import bounded_lattice, limit_bounds, row_keys, simplex_lattice, transfer_moves
+from refine import AdaptiveRefinement, boundary_mask, refine_cells, snap
+from screening import DATABASE, ScoreKernel
+
+ELEMENTS = ["V", "Cr", "Fe", "Nb", "Mo"]
+
+
+class TestCells(unittest.TestCase):
+    def test_snap_keeps_sums_and_is_exact_on_multiples(self):
+        numerators = simplex_lattice(4, 7).astype(np.int64)
+        snapped = snap(numerators, 7, 10)
+        np.testing.assert_array_equal(snapped.sum(axis=1), 10)
+        self.assertLessEqual(np.abs(snapped / 10 - numerators / 7).max(), 1 / 10)
+        np.testing.assert_array_equal(snap(numerators, 7, 21), numerators * 3)
+
+    def test_cells_partition_the_finer_lattice(self):
+        for coarse, fine in [(4, 8), (4, 10), (6, 15)]:
+            lower, upper = limit_bounds(fine, [[0, 1], [0.1, 1], [0, 0.8], [0, 1]])
+            cells = refine_cells(simplex_lattice(4, coarse), coarse, fine, lower, upper, chunksize=50)
+            expected = bounded_lattice(fine, lower, upper, dtype=np.int64)
+            self.assertEqual(len(cells), len(expected))
+            np.testing.assert_array_equal(np.sort(row_keys(cells)), np.sort(row_keys(expected)))
+
+    def test_boundary_mask_matches_neighbor_feasibility(self):
+        kernel = ScoreKernel.from_database(DATABASE, ELEMENTS)
+        numerators = simplex_lattice(5, 10).astype(np.int64)
+        feasible = kernel.feasible(kernel.properties(numerators / 10)).copy()
+        index = {row.tobytes(): i for i, row in enumerate(numerators)}
+        expected = [
+            any(feasible[index[(row + move).tobytes()]] != feasible[i]
+                for move in transfer_moves(5) if (row + move).min() >= 0)
+            for i, row in enumerate(numerators)
+        ]
+        mask = boundary_mask(kernel, numerators, 10, feasible, 0, 10, chunksize=100)
+        np.testing.assert_array_equal(mask, expected)
+        self.assertTrue(mask.any() and not mask.all())
+
+
+class TestAdaptiveRefinement(unittest.TestCase):
+    def setUp(self):
+        kernel = ScoreKernel.from_database(DATABASE, ELEMENTS)
+        numerators = simplex_lattice(5, 40).astype(np.int64)
+        self.properties = kernel.properties(numerators / 40).copy()
+        self.feasible = kernel.feasible(self.properties).copy()
+        self.boundary = boundary_mask(kernel, numerators, 40, self.feasible, 0, 40)
+        self.best_score = kernel.scores(self.properties)[self.feasible, -1].min()
+
+    def test_refinement_finds_the_finest_boundary_and_optimum(self):
+        refinement = AdaptiveRefinement(ELEMENTS)
+        stats = refinement.run((5, 10, 20, 40), top_k=20)
+        finest = stats["levels"][-1]
+        self.assertEqual(finest["boundary"], self.boundary.sum())
+        self.assertEqual(finest["feasible"], self.feasible.sum())
+        self.assertEqual(stats["best_score"], self.best_score)
+        self.assertEqual(stats["total"], len(self.feasible))
+        self.assertLess(stats["evaluated"], stats["total"] / 3)
+        self.assertTrue(all(level["reused"] > 0 for level in stats["levels"][1:]))
+        self.assertEqual(sum(level["evaluated"] for level in stats["levels"]), stats["evaluated"])
+
+        result = refinement.result()
+        self.assertEqual(len(result), stats["feasible"])
+        self.assertTrue(result["CombinedScore"].is_monotonic_increasing)
+        self.assertEqual(set(result["Divisions"]), {5, 10, 20, 40})
+        self.assertEqual(len(refinement.result(apply_filter=False)), stats["evaluated"])
+
+    def test_top_k_only_refinement_stays_small(self):
+        refinement = AdaptiveRefinement(ELEMENTS, limits=[[0, 0.5]] * 5)
+        stats = refinement.run((5, 10, 20, 40), top_k=5, boundary=False)
+        self.assertTrue(all(level["boundary"] == 0 for level in stats["levels"]))
+        self.assertLess(stats["evaluated"], stats["total"] / 10)
+        fractions = refinement.result(apply_filter=False)[ELEMENTS].to_numpy()
+        self.assertLessEqual(fractions.max(), 0.5)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            AdaptiveRefinement(ELEMENTS, limits=[[0, 1]] * 4)
+        with self.assertRaises(ValueError):
+            AdaptiveRefinement(ELEMENTS).run((10, 5))
+        refinement = AdaptiveRefinement(ELEMENTS)
+        refinement.run((5, 10))
+        with self.assertRaises(ValueError):
+            refinement.run((5, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from compositions import Compositions
+from graph import NeighborGraph, connected_components, write_space
+from lattice import simplex_lattice
+from regions import label_regions, region_summary
+from search import GraphSpace, LatticeSpace
+
+ELEMENTS = ["Ti", "V", "Cr", "W", "Fe"]
+
+
+def lattice_space(num_division: int) -> GraphSpace:
+    lattice = LatticeSpace(ELEMENTS, num_division)
+    numerators = simplex_lattice(len(ELEMENTS), num_division)
+    index = {row.tobytes(): i for i, row in enumerate(numerators.astype(lattice.dtype))}
+    neighbor_lists = [sorted(index[n] for n in lattice.neighbors(lattice.node(row))) for row in numerators]
+    return GraphSpace(Compositions(numerators, num_division, ELEMENTS), NeighborGraph.from_lists(neighbor_lists))
+
+
+def bfs_labels(neighbor_lists: list, mask: np.ndarray) -> np.ndarray:
+    labels = np.full(len(neighbor_lists), -1)
+    region = 0
+    for start in range(len(neighbor_lists)):
+        if mask[start] and labels[start] < 0:
+            labels[start] = region
+            stack = [start]
+            while stack:
+                for neighbor in neighbor_lists[stack.pop()]:
+                    if mask[neighbor] and labels[neighbor] < 0:
+                        labels[neighbor] = region
+                        stack.append(neighbor)
+            region += 1
+    return labels
+
+
+class TestConnectedComponents(unittest.TestCase):
+    def test_matches_breadth_first_search(self):
+        rng = np.random.default_rng(0)
+        neighbor_lists = [set() for _ in range(500)]
+        for a, b in rng.integers(0, 500, (400, 2)):
+            if a != b:
+                neighbor_lists[a].add(b)
+                neighbor_lists[b].add(a)
+        neighbor_lists = [sorted(n) for n in neighbor_lists]
+        graph = NeighborGraph.from_lists(neighbor_lists)
+        mask = rng.random(500) < 0.8
+        for chunksize in (7, 500):
+            labels = connected_components(graph, mask, chunksize)
+            np.testing.assert_array_equal(labels, bfs_labels(neighbor_lists, mask))
+        self.assertTrue((connected_components(graph)[[0, 1]] >= 0).all())
+        with self.assertRaises(ValueError):
+            connected_components(graph, mask[:10])
+
+    def test_long_chain_scales_linearly(self):
+        def chain(nodes):
+            indices = np.stack([np.arange(nodes) - 1, np.arange(nodes) + 1], axis=1).ravel()[1:-1]
+            offsets = np.concatenate([[0], np.arange(1, 2 * nodes - 1, 2), [2 * nodes - 2]])
+            return NeighborGraph(offsets, indices)
+
+        seconds = []
+        for nodes in (25_000, 200_000):
+            graph = chain(nodes)
+            tic = time.perf_counter()
+            labels = connected_components(graph, chunksize=1000)
+            seconds.append(time.perf_counter() - tic)
+            self.assertTrue((labels == 0).all())
+        # 8 times the nodes and chunks; a pass over every node per chunk would take about 64 times longer
+        self.assertLess(seconds[1], 20 * seconds[0] + 0.05)
+
+    def test_cut_lattice_has_two_regions(self):
+        space = lattice_space(6)
+        mask = space.compositions.numerators[:, 0] != 2
+        labels = connected_components(space.graph, mask)
+        self.assertEqual(labels.max(), 1)
+        np.testing.assert_array_equal(labels[mask] == 0, space.compositions.numerators[mask, 0] < 2)
+
+
+class TestLabelRegions(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_region_summary(self):
+        space = lattice_space(2)
+        labels = np.full(len(space), -1)
+        labels[[0, 1]] = 1
+        labels[4] = 0
+        scores = np.arange(len(space), dtype=float)[::-1]
+        summary = region_summary(labels, space, scores, chunksize=3)
+        self.assertEqual(summary["Region"].tolist(), [1, 0])
+        self.assertEqual(summary["Size"].tolist(), [2, 1])
+        self.assertEqual(summary["BestNode"].tolist(), [1, 4])
+        self.assertEqual(summary["BestScore"].tolist(), [scores[1], scores[4]])
+        fractions = space.compositions.fractions()
+        np.testing.assert_allclose(summary.loc[0, ELEMENTS].to_numpy(dtype=float), fractions[[0, 1]].mean(axis=0))
+
+    def test_label_regions_of_saved_space(self):
+        space = lattice_space(8)
+        path = os.path.join(self.tmpdir.name, "space.npy")
+        write_space(path, space.compositions.fractions().tolist(), space.graph.to_lists(), ELEMENTS, 8)
+        output_file = os.path.join(self.tmpdir.name, "regions.csv")
+        labels, summary = label_regions(GraphSpace.load(path), output_file, chunksize=50)
+
+        df = pd.read_csv(output_file)
+        np.testing.assert_array_equal(df["Node ID"], np.flatnonzero(labels >= 0))
+        np.testing.assert_array_equal(df["Region"], labels[labels >= 0])
+        self.assertEqual(summary["Size"].sum(), len(df))
+        self.assertAlmostEqual(summary["BestScore"].min(), df["CombinedScore"].min())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from compositions import Compositions
+from lattice import multi_system_lattice
+from nuclear_data import load_database
+from rescoring import FEASIBLE_COLUMN, database_changes, rescore_file
+from screening import PROPERTY_COLUMNS, SCORE_COLUMNS, ScoreKernel, screen_compositions
+from table_io import read_table, write_table
+
+ELEMENTS = ["Ti", "V", "Ta", "Nb", "W"]
+
+
+class TestRescoring(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.database = load_database("unified")
+        self.compositions = Compositions(multi_system_lattice(5, 3, 10), 10, ELEMENTS)
+        self.basis = self.database.basis(ELEMENTS)
+        self.limits = np.array(self.database.limits)
+        self.results = self.path("results.csv")
+        write_table(self.screen(self.basis, self.limits), self.results)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def screen(self, basis, limits):
+        return screen_compositions(self.compositions, ELEMENTS, ScoreKernel(basis, limits), apply_filter=False)
+
+    def test_changed_limits_rescore_stored_properties(self):
+        limits = self.limits.copy()
+        limits[5] *= 0.01
+        stats = rescore_file(self.results, self.path("patch.csv"), limits, verbose=False)
+        patch = read_table(self.path("patch.csv"))
+        expected = self.screen(self.basis, limits)
+        self.assertEqual(patch.columns.tolist(), [FEASIBLE_COLUMN] + SCORE_COLUMNS)
+        # CSV keeps 15-16 significant digits
+        np.testing.assert_allclose(patch[SCORE_COLUMNS], expected[SCORE_COLUMNS], rtol=1e-13)
+        feasible = ScoreKernel(self.basis, limits).feasible(expected[PROPERTY_COLUMNS].to_numpy())
+        np.testing.assert_array_equal(patch[FEASIBLE_COLUMN], feasible)
+        self.assertEqual(stats["feasible"], feasible.sum())
+        self.assertLess(stats["feasible"], stats["rows"])
+
+    def test_changed_element_row_is_a_rank_one_update(self):
+        delta = self.basis[ELEMENTS.index("W")] * 0.5
+        basis = self.basis.copy()
+        basis[ELEMENTS.index("W")] += delta
+        rescore_file(self.results, self.path("patch.csv"), self.limits, {"W": delta}, chunksize=100, verbose=False)
+        patch = read_table(self.path("patch.csv"))
+        expected = self.screen(basis, self.limits)
+        self.assertEqual(patch.columns.tolist(), PROPERTY_COLUMNS + [FEASIBLE_COLUMN] + SCORE_COLUMNS)
+        np.testing.assert_allclose(patch[PROPERTY_COLUMNS], expected[PROPERTY_COLUMNS], rtol=1e-12)
+        np.testing.assert_allclose(patch[SCORE_COLUMNS], expected[SCORE_COLUMNS], rtol=1e-12)
+
+    def test_database_changes(self):
+        old = self.database
+        new = type(old)(old.elements, old.basis_matrix * np.where(np.arange(len(old.elements)) == 0, 2, 1)[:, None],
+                        old.limits, old.columns, old.groups)
+        element_deltas, limits = database_changes(old, new, ELEMENTS)
+        self.assertEqual(list(element_deltas), [old.elements[0]])
+        np.testing.assert_array_equal(element_deltas[old.elements[0]], old.basis([old.elements[0]])[0])
+        self.assertIsNone(limits)
+
+    def test_requires_raw_property_columns(self):
+        write_table(self.compositions.to_frame(), self.path("space.csv"))
+        with self.assertRaises(ValueError):
+            rescore_file(self.path("space.csv"), self.path("patch.csv"), self.limits, verbose=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
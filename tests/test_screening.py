@@ -0,0 +1,199 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from lattice import multi_system_lattice
+from screening import DATABASE, PROPERTY_COLUMNS, SCORE_COLUMNS, ScoreKernel, screen_and_select, screen_file
+from table_io import write_compositions
+
+MASTER_ELEMENTS = ["Ti", "V", "Ta", "Nb"]
+ACTIVATION_DATA = np.array([
+    [7.621e+11, 1.145e+10, 4.598e+03],
+    [2.038e+13, 1.324e+09, 4.020e+04],
+    [4.867e+14, 6.389e+12, 6.116e+04],
+    [8.733e+12, 8.864e+10, 1.616e+09],
+])
+GAMMA_DATA = np.array([
+    [1.16e+03, 5.43e-07],
+    [1.75e+02, 6.22e-12],
+    [9.89e+04, 5.09e-07],
+    [2.14e+03, 1.20e+00],
+])
+HEAT_DATA = np.array([
+    [1.112e-01, 1.250e-10],
+    [8.045e+00, 3.678e-11],
+    [1.589e+01, 2.226e-10],
+    [2.276e-01, 8.548e-05],
+])
+ACTIVATION_LIMIT = np.array([8.238e+13, 4.670e+11, 1.272e+05])
+GAMMA_LIMIT = np.array([10000, 0.00001])
+HEAT_LIMIT = np.array([3.423e+02, 0.001])
+
+
+def reference_screen(df):
+    """Single-pass screening as originally done in unifiedAct.py."""
+    compositions = df[MASTER_ELEMENTS].to_numpy()
+    activation = compositions @ ACTIVATION_DATA
+    gamma = compositions @ GAMMA_DATA
+    heat = compositions @ HEAT_DATA
+    mask = (
+        (activation[:, 0] < ACTIVATION_LIMIT[0]) & (activation[:, 1] < ACTIVATION_LIMIT[1]) &
+        (activation[:, 2] < ACTIVATION_LIMIT[2]) & (gamma[:, 0] < GAMMA_LIMIT[0]) &
+        (gamma[:, 1] < GAMMA_LIMIT[1]) & (heat[:, 0] < HEAT_LIMIT[0]) & (heat[:, 1] < HEAT_LIMIT[1])
+    )
+    filtered_df = df[mask].copy()
+    properties = np.concatenate([activation, gamma, heat], axis=1)[mask]
+    for j, column in enumerate(PROPERTY_COLUMNS):
+        filtered_df[column] = properties[:, j]
+    filtered_df["Normalize_Activation"] = (activation[mask] / ACTIVATION_LIMIT).mean(axis=1)
+    filtered_df["Normalize_Gamma"] = (gamma[mask] / GAMMA_LIMIT).mean(axis=1)
+    filtered_df["Normalize_Heat"] = (heat[mask] / HEAT_LIMIT).mean(axis=1)
+    filtered_df["CombinedScore"] = filtered_df[SCORE_COLUMNS[:3]].mean(axis=1)
+    return filtered_df.reset_index(drop=True)
+
+
+class TestScoreKernel(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(multi_system_lattice(4, 4, 10) / 10, columns=MASTER_ELEMENTS)
+        self.kernel = ScoreKernel.from_tables(
+            ACTIVATION_DATA, GAMMA_DATA, HEAT_DATA, ACTIVATION_LIMIT, GAMMA_LIMIT, HEAT_LIMIT
+        )
+
+    def test_bit_identical_to_reference(self):
+        expected = reference_screen(self.df)
+        mask, properties, scores = self.kernel(self.df.to_numpy())
+        self.assertEqual(mask.sum(), len(expected))
+        np.testing.assert_array_equal(properties, expected[PROPERTY_COLUMNS].to_numpy())
+        np.testing.assert_array_equal(scores, expected[SCORE_COLUMNS].to_numpy())
+
+    def test_buffers_are_reused_across_chunk_sizes(self):
+        fractions = self.df.to_numpy()
+        _, whole, _ = self.kernel(fractions, apply_filter=False)
+        whole = whole.copy()
+        for size in (len(fractions), 7, 40):
+            for start in range(0, len(fractions), size):
+                mask, properties, _ = self.kernel(fractions[start:start + size], apply_filter=False)
+                self.assertIsNone(mask)
+                np.testing.assert_array_equal(properties, whole[start:start + size])
+
+    def test_from_database_uses_the_cached_basis(self):
+        kernel = ScoreKernel.from_database(DATABASE, MASTER_ELEMENTS)
+        self.assertIs(kernel.basis, DATABASE.basis(MASTER_ELEMENTS))
+        reference = ScoreKernel.from_tables(*DATABASE.tables(MASTER_ELEMENTS), *DATABASE.limit_tables())
+        for result, expected in zip(kernel(self.df.to_numpy()), reference(self.df.to_numpy())):
+            np.testing.assert_array_equal(result, expected)
+
+    def test_rejects_mismatched_limits(self):
+        with self.assertRaises(ValueError):
+            ScoreKernel(np.ones((4, 7)), np.ones(6))
+
+
+class TestScreenFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmpdir.name, "compositions.csv")
+        self.output_file = os.path.join(self.tmpdir.name, "filtered.csv")
+        self.df = pd.DataFrame(multi_system_lattice(4, 4, 10) / 10, columns=MASTER_ELEMENTS)
+        self.df.to_csv(self.input_file, index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def screen(self, **kwargs):
+        return screen_file(
+            self.input_file, self.output_file, MASTER_ELEMENTS,
+            ACTIVATION_DATA, GAMMA_DATA, HEAT_DATA,
+            ACTIVATION_LIMIT, GAMMA_LIMIT, HEAT_LIMIT,
+            verbose=False, **kwargs,
+        )
+
+    def test_chunked_output_matches_single_pass(self):
+        expected = reference_screen(pd.read_csv(self.input_file))
+        stats = self.screen(chunksize=17)
+        result = pd.read_csv(self.output_file)
+        self.assertEqual(stats["rows_in"], len(self.df))
+        self.assertEqual(stats["rows_out"], len(expected))
+        self.assertGreater(len(expected), 0)
+        self.assertLess(len(expected), len(self.df))
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_chunksize_does_not_change_output(self):
+        self.screen(chunksize=None)
+        whole = pd.read_csv(self.output_file)
+        self.screen(chunksize=5)
+        pd.testing.assert_frame_equal(pd.read_csv(self.output_file), whole)
+
+    def test_npy_input_matches_csv_input(self):
+        self.screen(chunksize=23)
+        from_csv = pd.read_csv(self.output_file)
+        npy_file = os.path.join(self.tmpdir.name, "compositions.npy")
+        write_compositions(npy_file, multi_system_lattice(4, 4, 10), MASTER_ELEMENTS, 10)
+        self.input_file = npy_file
+        self.screen(chunksize=23)
+        pd.testing.assert_frame_equal(pd.read_csv(self.output_file), from_csv)
+
+    def test_without_filter_keeps_every_row(self):
+        stats = self.screen(chunksize=50, apply_filter=False)
+        result = pd.read_csv(self.output_file)
+        self.assertEqual(stats["rows_out"], len(self.df))
+        self.assertEqual(list(result.columns), MASTER_ELEMENTS + PROPERTY_COLUMNS + SCORE_COLUMNS)
+
+    def test_profiled_stages(self):
+        profiler = profiling.enable(report=False)
+        try:
+            stats = self.screen(chunksize=50)
+        finally:
+            profiling.disable()
+        summary = {row["stage"]: row for row in profiler.summary()}
+        self.assertEqual(summary["score"]["rows_in"], stats["rows_in"])
+        self.assertEqual(summary["score"]["rows_out"], stats["rows_out"])
+        self.assertEqual(summary["read"]["rows_out"], stats["rows_in"])
+        self.assertEqual(summary["screen_file"]["bytes"], os.path.getsize(self.output_file))
+
+    def test_raises_error_for_missing_element_columns(self):
+        pd.DataFrame({"Co": [1.0]}).to_csv(self.input_file, index=False)
+        with self.assertRaises(ValueError):
+            self.screen()
+
+    def test_raises_error_for_invalid_chunksize(self):
+        with self.assertRaises(ValueError):
+            self.screen(chunksize=0)
+
+
+class TestScreenAndSelect(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmpdir.name, "compositions.npy")
+        self.output_file = os.path.join(self.tmpdir.name, "filtered.csv")
+        write_compositions(self.input_file, multi_system_lattice(4, 4, 10), MASTER_ELEMENTS, 10)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_limits_override_the_dataset_limits(self):
+        limits = tuple(limit / 4 for limit in DATABASE.limit_tables())
+        stats = screen_and_select(self.input_file, self.output_file, chunksize=50, verbose=False, limits=limits)
+        result = pd.read_csv(self.output_file)
+        expected_file = os.path.join(self.tmpdir.name, "expected.csv")
+        screen_file(self.input_file, expected_file, DATABASE.elements, *DATABASE.tables(), *limits,
+                    chunksize=50, verbose=False)
+        pd.testing.assert_frame_equal(result, pd.read_csv(expected_file))
+        self.assertLess(stats["rows_out"], screen_and_select(self.input_file, self.output_file, verbose=False)["rows_out"])
+
+    def test_sorted_output_is_best_first(self):
+        unsorted_file = os.path.join(self.tmpdir.name, "unsorted.csv")
+        screen_and_select(self.input_file, unsorted_file, chunksize=50, verbose=False)
+        stats = screen_and_select(self.input_file, self.output_file, chunksize=50, verbose=False,
+                                  top_k=5, sort_output=True)
+        result = pd.read_csv(self.output_file)
+        expected = pd.read_csv(unsorted_file).sort_values("CombinedScore", kind="stable").reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected)
+        pd.testing.assert_frame_equal(stats["best"], result.head(5), check_exact=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from compositions import Compositions
+from graph import NeighborGraph
+from lattice import simplex_lattice
+from screening import DATABASE, ScoreKernel
+from search import GraphSpace, LatticeSpace, LocalSearch
+
+ELEMENTS = ["Ti", "V", "Cr", "W", "Fe"]
+
+
+class TestSpaces(unittest.TestCase):
+    def test_lattice_space_matches_explicit_graph(self):
+        lattice = LatticeSpace(ELEMENTS, 6)
+        numerators = simplex_lattice(5, 6)
+        self.assertEqual(len(lattice), len(numerators))
+        index = {row.tobytes(): i for i, row in enumerate(numerators.astype(lattice.dtype))}
+        neighbor_lists = [sorted(index[n] for n in lattice.neighbors(lattice.node(row))) for row in numerators]
+        space = GraphSpace(Compositions(numerators, 6, ELEMENTS), NeighborGraph.from_lists(neighbor_lists))
+        self.assertEqual(space.neighbors(0), neighbor_lists[0])
+        np.testing.assert_array_equal(lattice.numerators([lattice.node(numerators[3])]), numerators[3:4])
+        stats = LocalSearch(space).run("best", seeds=[0], max_nodes=len(space))
+        self.assertEqual(stats["visited"], len(space))
+
+    def test_lattice_space_limits(self):
+        lattice = LatticeSpace(ELEMENTS, 10, [[0, 0.5]] * 5)
+        nodes = lattice.random_nodes(20, np.random.default_rng(0))
+        self.assertEqual(len(nodes), 20)
+        for node in nodes + lattice.neighbors(nodes[0]):
+            self.assertLessEqual(lattice.numerators([node]).max(), 5)
+        with self.assertRaises(ValueError):
+            lattice.node([10, 0, 0, 0, 0])
+        with self.assertRaises(ValueError):
+            LatticeSpace(ELEMENTS, 10, [[0, 0.1]] * 5)
+
+    def test_limited_lattice_space_size(self):
+        limits = [[0, 0.5], [0.1, 0.4], [0, 1], [0, 1], [0, 0.2]]
+        lattice = LatticeSpace(ELEMENTS, 10, limits)
+        numerators = simplex_lattice(5, 10)
+        inside = ((numerators >= [0, 1, 0, 0, 0]) & (numerators <= [5, 4, 10, 10, 2])).all(axis=1)
+        self.assertEqual(len(lattice), int(inside.sum()))
+        search = LocalSearch(lattice)
+        stats = search.run("best", starts=1, max_nodes=10_000)
+        self.assertEqual(stats["visited"], stats["total"])
+        self.assertEqual(stats["visited_fraction"], 1)
+
+
+class TestLocalSearch(unittest.TestCase):
+    def setUp(self):
+        self.space = LatticeSpace(ELEMENTS, 8)
+        numerators = simplex_lattice(5, 8)
+        kernel = ScoreKernel.from_database(DATABASE, ELEMENTS)
+        mask, _, scores = kernel(numerators / 8)
+        self.best_score = scores[:, -1].min()
+        self.feasible = int(mask.sum())
+
+    def test_best_first_with_full_budget_finds_global_optimum(self):
+        search = LocalSearch(self.space)
+        stats = search.run("best", starts=1, max_nodes=len(self.space))
+        self.assertEqual(stats["visited"], stats["total"])
+        self.assertEqual(stats["feasible"], self.feasible)
+        self.assertEqual(stats["best_score"], self.best_score)
+        result = search.result()
+        self.assertEqual(len(result), self.feasible)
+        self.assertTrue(result["CombinedScore"].is_monotonic_increasing)
+
+    def test_hill_climb_ends_in_local_optima(self):
+        search = LocalSearch(self.space)
+        seeds = self.space.random_nodes(5, np.random.default_rng(1))
+        optima = search.hill_climb(seeds)
+        self.assertEqual(len(optima), 5)
+        for node in optima:
+            ranks = search.evaluate(self.space.neighbors(node))
+            self.assertLessEqual(search.rank(node), min(ranks))
+        stats = search.stats()
+        self.assertLess(stats["visited"], stats["total"])
+        self.assertEqual(stats["visited"], len(search.result(apply_filter=False)))
+
+    def test_rejects_unknown_method(self):
+        with self.assertRaises(ValueError):
+            LocalSearch(self.space).run("annealing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from selection import TopK, smallest, subsystem_keys
+
+
+class TestSmallest(unittest.TestCase):
+    def test_matches_stable_sort_with_ties(self):
+        rng = np.random.default_rng(0)
+        scores = rng.integers(0, 20, 500).astype(float)
+        order = np.arange(500)
+        for k in (1, 7, 100, 500, 600):
+            expected = np.argsort(scores, kind="stable")[:k]
+            np.testing.assert_array_equal(smallest(scores, order, k), expected)
+
+    def test_nan_scores_rank_last(self):
+        scores = np.array([np.nan, 2.0, 1.0, np.nan])
+        np.testing.assert_array_equal(smallest(scores, np.arange(4), 3), [2, 1, 0])
+
+
+class TestTopK(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.df = pd.DataFrame({
+            "Ti": rng.integers(0, 3, 1000) / 2,
+            "V": rng.integers(0, 2, 1000) / 2,
+            "CombinedScore": rng.integers(0, 50, 1000) / 10,
+            "Normalize_Heat": rng.random(1000),
+        })
+
+    def stream(self, selector, chunksize=77):
+        for start in range(0, len(self.df), chunksize):
+            selector.update(self.df.iloc[start:start + chunksize])
+        return selector
+
+    def test_streamed_selection_matches_full_sort(self):
+        selector = self.stream(TopK(10, ["CombinedScore", "Normalize_Heat"]))
+        for column in ("CombinedScore", "Normalize_Heat"):
+            expected = self.df.sort_values(column, kind="stable").head(10).reset_index(drop=True)
+            pd.testing.assert_frame_equal(selector.result(column), expected)
+
+    def test_largest(self):
+        selector = self.stream(TopK(5, largest=True))
+        expected = self.df.sort_values("CombinedScore", ascending=False, kind="stable").head(5)
+        np.testing.assert_array_equal(selector.result()["CombinedScore"], expected["CombinedScore"])
+
+    def test_per_subsystem(self):
+        selector = self.stream(TopK(4, subsystem_columns=["Ti", "V"]))
+        result = selector.result()
+        keys = subsystem_keys(self.df[["Ti", "V"]].to_numpy())
+        expected = self.df.assign(key=keys).sort_values("CombinedScore", kind="stable").groupby("key").head(4)
+        self.assertEqual(len(result), 16)
+        self.assertEqual(
+            sorted(map(tuple, result.to_numpy().tolist())),
+            sorted(map(tuple, expected.drop(columns="key").to_numpy().tolist())),
+        )
+
+    def test_merge_equals_single_stream(self):
+        first, second = TopK(10), TopK(10)
+        first.update(self.df.iloc[:400])
+        second.update(self.df.iloc[400:])
+        first.merge(second)
+        pd.testing.assert_frame_equal(first.result(), self.stream(TopK(10)).result())
+
+    def test_empty_and_invalid(self):
+        selector = TopK(3)
+        selector.update(self.df.iloc[:0])
+        self.assertEqual(len(selector.result()), 0)
+        self.assertEqual(selector.result().columns.tolist(), self.df.columns.tolist())
+        with self.assertRaises(ValueError):
+            TopK(0)
+        with self.assertRaises(ValueError):
+            selector.result("Normalize_Gamma")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from constraints import LinearConstraints
+from lattice import multi_system_lattice, simplex_lattice
+from space_cache import SpaceCache, cached_multi_system_lattice, space_key
+
+ELEMENTS = ["Ti", "V", "Ta", "Nb", "Mo"]
+
+
+class TestSpaceKey(unittest.TestCase):
+    def test_key_depends_on_every_parameter(self):
+        key = space_key("nimplex", ELEMENTS, 10, [[0, 1]] * 5)
+        self.assertEqual(key, space_key("nimplex", list(ELEMENTS), 10, [[0.0, 1.0]] * 5))
+        self.assertNotEqual(key, space_key("nimplex", ELEMENTS[::-1], 10, [[0, 1]] * 5))
+        self.assertNotEqual(key, space_key("nimplex", ELEMENTS, 12, [[0, 1]] * 5))
+        self.assertNotEqual(key, space_key("nimplex", ELEMENTS, 10, [[0, 0.5]] * 5))
+        self.assertNotEqual(key, space_key("multi_system", ELEMENTS, 10, order=3))
+
+
+class TestSpaceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = SpaceCache(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hit_is_memory_mapped_and_never_enumerates(self):
+        compositions = cached_multi_system_lattice(ELEMENTS, 3, 10, self.cache)
+        np.testing.assert_array_equal(compositions.numerators, multi_system_lattice(5, 3, 10))
+        with mock.patch("space_cache.multi_system_lattice") as enumerate_lattice:
+            cached = cached_multi_system_lattice(ELEMENTS, 3, 10, self.cache)
+            enumerate_lattice.assert_not_called()
+        self.assertIsInstance(cached.numerators.base, np.memmap)
+        self.assertEqual(cached.elements, ELEMENTS)
+        np.testing.assert_array_equal(cached.numerators, compositions.numerators)
+
+    def test_constrained_space_is_cached_under_its_own_key(self):
+        constraints = LinearConstraints(ELEMENTS, ["Ta + Nb >= 0.5", "Mo <= 0.2"])
+        full = cached_multi_system_lattice(ELEMENTS, 3, 10, self.cache).numerators
+        compositions = cached_multi_system_lattice(ELEMENTS, 3, 10, self.cache, constraints=constraints)
+        np.testing.assert_array_equal(compositions.numerators, full[constraints.mask(full, 10)])
+        self.assertEqual(len(self.cache.entries()), 2)
+        with mock.patch("space_cache.multi_system_lattice") as enumerate_lattice:
+            cached_multi_system_lattice(ELEMENTS, 3, 10, self.cache, constraints=constraints)
+            cached_multi_system_lattice(ELEMENTS, 3, 10, self.cache, constraints=LinearConstraints(ELEMENTS))
+            enumerate_lattice.assert_not_called()
+
+    def test_put_and_get_with_graph(self):
+        numerators = simplex_lattice(3, 2)
+        neighbor_lists = [[1], [0, 2], [1], [], [5], [4]]
+        self.assertIsNone(self.cache.get("space"))
+        self.cache.put("space", numerators, ELEMENTS[:3], 2, neighbor_lists)
+        self.assertIn("space", self.cache)
+        compositions, graph = self.cache.get("space")
+        np.testing.assert_array_equal(compositions.numerators, numerators)
+        self.assertEqual(graph.to_lists(), neighbor_lists)
+        self.assertFalse(any(f.startswith(".staging") for f in os.listdir(self.tmpdir.name)))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        numerators = multi_system_lattice(5, 3, 10)
+        for i, key in enumerate(["a", "b", "c"]):
+            self.cache.put(key, numerators, ELEMENTS, 10)
+            for filename in os.listdir(self.tmpdir.name):
+                if filename.startswith(key):
+                    os.utime(os.path.join(self.tmpdir.name, filename), (1000 + i, 1000 + i))
+        entry_size = self.cache.size() // 3
+        self.cache.get("a")
+        self.cache.max_bytes = 2 * entry_size
+        self.assertEqual(self.cache.evict(), ["b"])
+        self.assertEqual([key for key, _, _ in self.cache.entries()], ["c", "a"])
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_rejects_non_positive_cap(self):
+        with self.assertRaises(ValueError):
+            SpaceCache(self.tmpdir.name, max_bytes=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from compositions import Compositions
+from lattice import multi_system_lattice
+from table_io import (
+    CompositionWriter,
+    TableWriter,
+    file_format,
+    iter_compositions,
+    iter_table,
+    load_numerators,
+    read_columns,
+    read_header,
+    read_table,
+    write_compositions,
+    write_table,
+)
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ELEMENTS = ["Ti", "V", "Ta", "Nb", "Mo"]
+
+
+class TestTableIO(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.numerators = multi_system_lattice(5, 3, 10)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_file_format_from_extension(self):
+        self.assertEqual(file_format("a.csv"), "csv")
+        self.assertEqual(file_format("a.PARQUET"), "parquet")
+        self.assertEqual(file_format("a.npy"), "npy")
+        with self.assertRaises(ValueError):
+            file_format("a.txt")
+
+    def test_npy_round_trip_keeps_integer_numerators(self):
+        path = self.path("space.npy")
+        write_compositions(path, self.numerators, ELEMENTS, 10)
+        numerators, header = load_numerators(path)
+        self.assertIsInstance(numerators, np.memmap)
+        self.assertEqual(numerators.dtype, np.uint8)
+        np.testing.assert_array_equal(numerators, self.numerators)
+        self.assertEqual(header, {"elements": ELEMENTS, "num_division": 10})
+        self.assertEqual(read_header(path)["elements"], read_columns(path))
+
+    def test_npy_chunks_match_csv_chunks(self):
+        write_compositions(self.path("space.npy"), self.numerators, ELEMENTS, 10)
+        write_compositions(self.path("space.csv"), self.numerators, ELEMENTS, 10)
+        npy_chunks = list(iter_table(self.path("space.npy"), chunksize=40))
+        csv_chunks = list(iter_table(self.path("space.csv"), chunksize=40))
+        self.assertEqual(len(npy_chunks), len(csv_chunks))
+        for a, b in zip(npy_chunks, csv_chunks):
+            pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+
+    def test_composition_writer_streams_blocks(self):
+        path = self.path("space.npy")
+        with CompositionWriter(path, ELEMENTS, 10) as writer:
+            for start in range(0, len(self.numerators), 33):
+                writer.write(self.numerators[start:start + 33])
+        np.testing.assert_array_equal(load_numerators(path, mmap=False)[0], self.numerators)
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    def test_iter_compositions_round_trips_writer(self):
+        path = self.path("space.npy")
+        with CompositionWriter(path, ELEMENTS, 10) as writer:
+            writer.write(Compositions(self.numerators, 10, ELEMENTS))
+        blocks = list(iter_compositions(path, chunksize=40))
+        self.assertTrue(all(block.num_division == 10 and block.elements == ELEMENTS for block in blocks))
+        np.testing.assert_array_equal(np.concatenate([b.numerators for b in blocks]), self.numerators)
+
+    def test_table_writer_creates_empty_csv_with_header(self):
+        path = self.path("empty.csv")
+        with TableWriter(path, ["a", "b"]):
+            pass
+        self.assertEqual(read_columns(path), ["a", "b"])
+        self.assertEqual(len(read_table(path)), 0)
+
+    def test_table_writer_rejects_npy(self):
+        with self.assertRaises(ValueError):
+            TableWriter(self.path("results.npy"), ["a"])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_parquet_round_trip(self):
+        df = pd.DataFrame(self.numerators / 10, columns=ELEMENTS)
+        df["CombinedScore"] = np.linspace(0, 1, len(df))
+        path = self.path("results.parquet")
+        with TableWriter(path, df.columns) as writer:
+            writer.write(df.iloc[:50])
+            writer.write(df.iloc[50:])
+        pd.testing.assert_frame_equal(read_table(path), df)
+        chunks = list(iter_table(path, chunksize=25))
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+        write_table(df.iloc[:0], self.path("empty.parquet"))
+        self.assertEqual(read_columns(self.path("empty.parquet")), df.columns.tolist())
+
+    def test_iter_table_reads_selected_columns(self):
+        df = pd.DataFrame(self.numerators / 10, columns=ELEMENTS)
+        write_table(df, self.path("results.csv"))
+        write_compositions(self.path("space.npy"), self.numerators, ELEMENTS, 10)
+        paths = [self.path("results.csv"), self.path("space.npy")]
+        if HAS_PYARROW:
+            write_table(df, self.path("results.parquet"))
+            paths.append(self.path("results.parquet"))
+        for path in paths:
+            chunks = list(iter_table(path, chunksize=40, columns=["Nb", "Ti"]))
+            pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df[["Nb", "Ti"]])
+        with self.assertRaises(ValueError):
+            next(iter_table(self.path("results.csv"), columns=["W"]))
+
+
+if __name__ == "__main__":
+    unittest.main()